@@ -1,6 +1,7 @@
 # --- Imports ---
 # Core
 import os
+import requests
 import streamlit as st
 import polars as pl
 
@@ -46,8 +47,11 @@ with st.sidebar:
                             to_date=end_date_input)
                         
                         st.session_state["Stock_Dataframe"] = data_call
+                        st.session_state["Stock_Query"] = {"symbol": stock_symbol_input,
+                                                           "from_date": start_date_input,
+                                                           "to_date": end_date_input}
                         st.session_state.data_loaded = 1
-                    except KeyError as StockDataCallError:
+                    except (KeyError, ValueError) as StockDataCallError:
                         st.error("**You have entered stock data that does not exist**. Please enter a ticker symbol for stocks traded in the US, with a realistic set of settings.\n\nAlso please refer to the question mark symbols for example data that can be entered.")
 
         if st.session_state.data_loaded == 1:
@@ -64,7 +68,18 @@ else:
     st.markdown("**Successfully retrieved the stock data!**")
     st.markdown(f"### 📊 Chart")
     st.markdown("The open, high, low, and close (OHLC) data for the specified stock in a **candlestick chart**. You can zoom in on specific periods, and hover to see the data in detail.")
-    st.plotly_chart(figure_or_data=Transformation_Functions.candlestick_plotly_graph(st.session_state["Stock_Dataframe"]),
+    st.markdown("Long periods are drawn with larger candles. Narrow down the visible period to see the bars in finer detail.")
+    first_timestamp = st.session_state["Stock_Dataframe"]["timestamp"].min()
+    last_timestamp = st.session_state["Stock_Dataframe"]["timestamp"].max()
+    visible_range = (first_timestamp, last_timestamp)
+    if first_timestamp < last_timestamp:
+        visible_range = st.slider("Visible Period",
+                                  min_value=first_timestamp,
+                                  max_value=last_timestamp,
+                                  value=(first_timestamp, last_timestamp),
+                                  key="Stock_Candlestick_Visible_Period")
+    st.plotly_chart(figure_or_data=Transformation_Functions.candlestick_plotly_graph(st.session_state["Stock_Dataframe"],
+                                                                                     visible_range=visible_range),
                     theme="streamlit",
                     key="Stock_Candlestick_Chart")
     st.markdown("***")
@@ -85,9 +100,15 @@ else:
     # --- News ---
     st.markdown(f"### 📰 News")
     st.markdown("Here are some of the most interesting, and recent news articles in descending order using the end date related to the stock that you queried.")
-    stock_news_dataframe = Transformation_Functions.transform_ticker_news_json_to_dataframe(symbol=stock_symbol_input,
-                                                                                            from_date=start_date_input,
-                                                                                            to_date=end_date_input)
+    # Served from the local news store, so that reruns of the page do not call the API
+    try:
+        stock_news_dataframe = Transformation_Functions.transform_ticker_news_json_to_dataframe(symbol=st.session_state["Stock_Query"]["symbol"],
+                                                                                                from_date=st.session_state["Stock_Query"]["from_date"],
+                                                                                                to_date=st.session_state["Stock_Query"]["to_date"])
+    # An error status, a response that is not valid JSON, or a request that failed on every retry
+    except (KeyError, ValueError, requests.RequestException):
+        st.warning("The news articles could not be retrieved at the moment. Please try again later.")
+        stock_news_dataframe = pl.DataFrame()
     for article in range(len(stock_news_dataframe)):
         with st.container(border=True):
             st.markdown(f"**[{stock_news_dataframe.item(article, "title")}]({stock_news_dataframe.item(article, "article_url")})**")
@@ -1,7 +1,20 @@
 # --- Imports ---
 # Core
 import os
+import io
+import json
+import math
+import time
+import random
+import asyncio
+import logging
+import datetime
+import threading
+import email.utils
+import concurrent.futures
 import requests
+import httpx
+import polars as pl
 import streamlit as st
 
 from langchain_core.prompts import ChatPromptTemplate
@@ -9,8 +22,558 @@ from langchain_core.runnables import RunnablePassthrough
 from langchain_core.output_parsers import StrOutputParser
 from langchain_groq import ChatGroq
 
+# Functions
+import LLM_Functions
+
+# --- Logging ---
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
 
 # --- Polygon.io ---
+# --- Polygon - Schema - Datatypes for the base columns of the Aggregate (Bars) API ---
+POLYGON_AGGREGATE_BARS_SCHEMA = {"t":pl.UInt64,
+                                 "o":pl.Float64,
+                                 "h":pl.Float64,
+                                 "l":pl.Float64,
+                                 "c":pl.Float64,
+                                 "n":pl.Int64,
+                                 "v":pl.UInt64,
+                                 "vw":pl.UInt64}
+
+# --- Polygon - Schema - Datatypes for decoding the raw bars of an Aggregate (Bars) API response straight into Polars ---
+# Volumes and prices are decoded as floats, as the API sends fractional values for adjusted volumes
+POLYGON_AGGREGATE_BARS_DECODING_SCHEMA = {"t":pl.Int64,
+                                          "o":pl.Float64,
+                                          "h":pl.Float64,
+                                          "l":pl.Float64,
+                                          "c":pl.Float64,
+                                          "n":pl.Int64,
+                                          "v":pl.Float64,
+                                          "vw":pl.Float64}
+
+# --- Polygon - Configs - Pagination and concurrency settings for the Aggregate (Bars) API ---
+# Default base URL of the API, can be overridden through the POLYGON_API_BASE_URL environment variable, e.g., to point at the Mock_Server_Functions.py server
+POLYGON_API_BASE_URL = "https://api.polygon.io"
+
+# Upper bound of concurrent requests for a single aggregate bars retrieval
+AGGREGATE_BARS_MAX_WORKERS = 8
+
+# Approximate amount of bars within a single day for the intraday and daily timespans, including the extended trading hours
+# Used for splitting a large date range into chunks that fit within a single API call
+AGGREGATE_BARS_PER_DAY = {"second": 57600,
+                          "minute": 960,
+                          "hour": 16,
+                          "day": 1}
+
+# --- Polygon - Configs - Rate limiting and retry settings shared by every request ---
+# Requests-per-minute budget of the API key, e.g., 5 for the free tier, can be set through the POLYGON_REQUESTS_PER_MINUTE environment variable. Unlimited if not set
+POLYGON_REQUESTS_PER_MINUTE = float(os.environ["POLYGON_REQUESTS_PER_MINUTE"]) if os.environ.get("POLYGON_REQUESTS_PER_MINUTE") else None
+
+# Retries of a request that timed out, or received a 429 or 5xx response, with exponential backoff between the attempts
+POLYGON_MAX_RETRIES = 5
+POLYGON_BACKOFF_SECONDS = 0.5
+POLYGON_MAX_BACKOFF_SECONDS = 30
+
+# Connect and read timeouts of a single request, in seconds
+POLYGON_REQUEST_TIMEOUT = (5, 30)
+
+# Status codes that are retried, every other status is returned to the caller as is
+POLYGON_RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# --- Polygon - Decoding - Raw Aggregate (Bars) API response bytes to Polars columns ---
+def decode_aggregate_bars_response(content: bytes) -> dict:
+    """
+    Decodes the raw bytes of an Aggregate (Bars) API response with the Polars NDJSON reader.
+    The bars are parsed straight into Arrow columns, skipping the Python dictionary per bar that the requests json() function would build.
+
+    Args:
+        content: The raw body of the API response
+
+    Returns:
+        The response metadata in a dictionary, with the bars stored within a Polars DataFrame called "results" in the POLYGON_AGGREGATE_BARS_SCHEMA datatypes
+        Similar to the API, the "results" object is missing when the response does not contain any bars
+    """
+    # The bars are flat JSON objects of numbers, so the first closing bracket after the "results" key closes the array
+    results_key_index = content.find(b'"results"')
+    if results_key_index == -1:
+        return json.loads(content)
+
+    results_start_index = content.index(b"[", results_key_index)
+    results_end_index = content.index(b"]", results_start_index)
+
+    # Only the small metadata wrapper is parsed into Python objects
+    data = json.loads(content[:results_start_index] + b"null" + content[results_end_index + 1:])
+    del data["results"]
+
+    # Split the array into newline-delimited JSON, which the Polars reader parses into columns in parallel
+    # Whitespace of pretty-printed responses can be dropped altogether, as the bars do not hold any string values
+    bars_json = content[results_start_index + 1:results_end_index]
+    if b" " in bars_json or b"\n" in bars_json:
+        bars_json = bars_json.translate(None, b" \t\r\n")
+    bars_ndjson = bars_json.replace(b"},{", b"}\n{")
+    if bars_ndjson.strip():
+        data["results"] = pl.read_ndjson(io.BytesIO(bars_ndjson), schema=POLYGON_AGGREGATE_BARS_DECODING_SCHEMA) \
+                            .cast(POLYGON_AGGREGATE_BARS_SCHEMA)
+
+    return data
+
+# --- Polygon - Configs - Base URL and API key resolution ---
+def polygon_api_base_url() -> str:
+    """
+    Resolves the base URL of the Polygon API, which is read on every call so that it can be switched without a restart.
+
+    Args:
+        -
+    Returns:
+        The POLYGON_API_BASE_URL environment variable if set, otherwise the POLYGON_API_BASE_URL default, without a trailing slash
+    """
+    return os.environ.get("POLYGON_API_BASE_URL", POLYGON_API_BASE_URL).rstrip("/")
+
+def polygon_api_key() -> str:
+    """
+    Resolves the Polygon API key.
+
+    Args:
+        -
+    Returns:
+        The POLYGON_API_KEY environment variable if set, otherwise the key within the Streamlit secrets
+    """
+    return os.environ.get("POLYGON_API_KEY") or st.secrets.api_keys.POLYGON_API_KEY
+
+# --- Polygon - HTTP - Pooled keep-alive session shared between the concurrent requests ---
+@st.cache_resource
+def polygon_http_session() -> requests.Session:
+    """
+    Creates a requests Session with a connection pool sized for the concurrent aggregate bars retrieval.
+    Reusing the session keeps the HTTP connections to Polygon alive between requests.
+
+    Args:
+        -
+    Returns:
+        A requests Session object
+    """
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=AGGREGATE_BARS_MAX_WORKERS,
+                                            pool_maxsize=AGGREGATE_BARS_MAX_WORKERS)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+    return session
+
+# --- Polygon - Scheduling - Token bucket for the requests-per-minute budget shared between threads ---
+class RateLimiter:
+    """
+    Token bucket rate limiter for the threads and coroutines sharing a single API key.
+    Allows short bursts up to the bucket size, and otherwise spaces the requests evenly across the minute.
+    A token is reserved under the lock and waited for outside of it, so that the waiting callers are served in order.
+    """
+    def __init__(self, requests_per_minute: float, burst: int = 1):
+        self.rate = requests_per_minute / 60
+        self.capacity = burst
+        self.tokens = burst
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """ Consumes a token, and returns the time in seconds until it becomes available """
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+            self.tokens -= 1
+            return -self.tokens / self.rate if self.tokens < 0 else 0
+
+    def acquire(self):
+        """ Waits until a token is available, and consumes it """
+        wait_seconds = self.reserve()
+        if wait_seconds > 0:
+            time.sleep(wait_seconds)
+
+    async def acquire_async(self):
+        """ Waits until a token is available without blocking the event loop, and consumes it """
+        wait_seconds = self.reserve()
+        if wait_seconds > 0:
+            await asyncio.sleep(wait_seconds)
+
+# --- Polygon - Scheduling - Delay before retrying a request ---
+def retry_delay_seconds(attempt: int,
+                        retry_after: str = None) -> float:
+    """
+    Computes the delay before the next attempt of a failed request.
+    The Retry-After header of a 429 or 503 response takes precedence, otherwise the delay doubles with every attempt, with jitter so that concurrent retries spread out.
+
+    Args:
+        attempt: The number of the failed attempt, starting at 0
+        retry_after: The Retry-After header of the response, in seconds or as an HTTP date, if any
+
+    Returns:
+        The delay in seconds
+    """
+    if retry_after:
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            try:
+                return max(0.0, (email.utils.parsedate_to_datetime(retry_after) - datetime.datetime.now(datetime.timezone.utc)).total_seconds())
+            except (TypeError, ValueError):
+                pass
+
+    backoff_seconds = min(POLYGON_MAX_BACKOFF_SECONDS, POLYGON_BACKOFF_SECONDS * 2 ** attempt)
+    return backoff_seconds / 2 + random.uniform(0, backoff_seconds / 2)
+
+# --- Polygon - Scheduling - Rate-limited, retried, and coalesced GET requests ---
+class PolygonRequestScheduler:
+    """
+    Sends every GET request to the Polygon API through a shared token bucket, and retries timeouts and 429 or 5xx responses with backoff.
+    Identical requests that are in flight at the same time are coalesced into a single upstream call, whose response body is shared by every caller.
+    Threads call get, and coroutines call get_async with their own httpx AsyncClient, while sharing the same token bucket and in-flight requests.
+
+    Args:
+        session: The requests Session the requests are sent through
+        requests_per_minute: The rate-limit budget of the API key. Unlimited if not specified
+        burst: The amount of requests that may be sent at once when the bucket is full
+        max_retries: The amount of retries of a failed request
+        timeout: The connect and read timeouts of a single request, in seconds
+    """
+    def __init__(self,
+                 session: requests.Session,
+                 requests_per_minute: float = None,
+                 burst: int = 1,
+                 max_retries: int = POLYGON_MAX_RETRIES,
+                 timeout: tuple = POLYGON_REQUEST_TIMEOUT):
+        self.session = session
+        self.rate_limiter = RateLimiter(requests_per_minute, burst) if requests_per_minute is not None else None
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.in_flight_requests = {}
+        self.lock = threading.Lock()
+
+    def get_with_retries(self, url: str) -> bytes:
+        """
+        Sends a GET request, retrying timeouts and retryable status codes until max_retries is exhausted.
+
+        Args:
+            url: The URL of the request, including the API key
+
+        Returns:
+            The body of the response. After the last retry, the body of a 429 or 5xx response is returned as is, so that the caller surfaces the API error
+
+        Raises:
+            requests.RequestException: If the last attempt timed out, or failed to connect
+        """
+        for attempt in range(self.max_retries + 1):
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+
+            try:
+                response = self.session.get(url, timeout=self.timeout)
+            except (requests.Timeout, requests.ConnectionError) as error:
+                if attempt == self.max_retries:
+                    raise
+                delay_seconds = retry_delay_seconds(attempt)
+                logger.warning("Polygon request failed with %s, retrying in %.2fs", type(error).__name__, delay_seconds)
+            else:
+                if response.status_code not in POLYGON_RETRY_STATUS_CODES or attempt == self.max_retries:
+                    return response.content
+                delay_seconds = retry_delay_seconds(attempt, response.headers.get("Retry-After"))
+                logger.warning("Polygon request received a %d response, retrying in %.2fs", response.status_code, delay_seconds)
+
+            time.sleep(delay_seconds)
+
+    def get(self, url: str) -> bytes:
+        """
+        Sends a GET request through get_with_retries, or waits for the identical request that is already in flight.
+
+        Args:
+            url: The URL of the request, including the API key
+
+        Returns:
+            The body of the response, shared with every coalesced caller
+        """
+        with self.lock:
+            future = self.in_flight_requests.get(url)
+            is_leader = future is None
+            if is_leader:
+                future = concurrent.futures.Future()
+                self.in_flight_requests[url] = future
+
+        if is_leader:
+            try:
+                future.set_result(self.get_with_retries(url))
+            except BaseException as error:
+                future.set_exception(error)
+            finally:
+                with self.lock:
+                    del self.in_flight_requests[url]
+
+        return future.result()
+
+    async def get_with_retries_async(self,
+                                     client: httpx.AsyncClient,
+                                     url: str) -> bytes:
+        """
+        Asyncio counterpart of get_with_retries, which sends the GET request through an httpx AsyncClient.
+
+        Args:
+            client: The httpx AsyncClient the request is sent through
+            url: The URL of the request, including the API key
+
+        Returns:
+            The body of the response. After the last retry, the body of a 429 or 5xx response is returned as is, so that the caller surfaces the API error
+
+        Raises:
+            httpx.TransportError: If the last attempt timed out, or failed to connect
+        """
+        for attempt in range(self.max_retries + 1):
+            if self.rate_limiter is not None:
+                await self.rate_limiter.acquire_async()
+
+            try:
+                response = await client.get(url)
+            except httpx.TransportError as error:
+                if attempt == self.max_retries:
+                    raise
+                delay_seconds = retry_delay_seconds(attempt)
+                logger.warning("Polygon request failed with %s, retrying in %.2fs", type(error).__name__, delay_seconds)
+            else:
+                if response.status_code not in POLYGON_RETRY_STATUS_CODES or attempt == self.max_retries:
+                    return response.content
+                delay_seconds = retry_delay_seconds(attempt, response.headers.get("Retry-After"))
+                logger.warning("Polygon request received a %d response, retrying in %.2fs", response.status_code, delay_seconds)
+
+            await asyncio.sleep(delay_seconds)
+
+    async def get_async(self,
+                        client: httpx.AsyncClient,
+                        url: str) -> bytes:
+        """
+        Asyncio counterpart of get, which sends a GET request through get_with_retries_async, or waits for the identical request that is already in flight in any thread or coroutine.
+
+        Args:
+            client: The httpx AsyncClient the request is sent through if it is not in flight yet
+            url: The URL of the request, including the API key
+
+        Returns:
+            The body of the response, shared with every coalesced caller
+        """
+        with self.lock:
+            future = self.in_flight_requests.get(url)
+            is_leader = future is None
+            if is_leader:
+                future = concurrent.futures.Future()
+                self.in_flight_requests[url] = future
+
+        if is_leader:
+            try:
+                future.set_result(await self.get_with_retries_async(client, url))
+            except BaseException as error:
+                future.set_exception(error)
+            finally:
+                with self.lock:
+                    del self.in_flight_requests[url]
+
+        return await asyncio.wrap_future(future)
+
+@st.cache_resource
+def polygon_request_scheduler() -> PolygonRequestScheduler:
+    """
+    Creates the PolygonRequestScheduler shared by every Streamlit session, on top of the pooled keep-alive session.
+
+    Args:
+        -
+    Returns:
+        A PolygonRequestScheduler object
+    """
+    return PolygonRequestScheduler(polygon_http_session(), POLYGON_REQUESTS_PER_MINUTE)
+
+# --- Polygon - Pagination - Whether an aggregate window stays within a single day ---
+def aggregate_window_fits_within_day(timespan: str,
+                                     timespan_multiplier: str) -> bool:
+    """
+    Checks whether every aggregate window of a timespan starts and ends within a single day.
+    Only such bars can be retrieved piecewise by date, as the windows of larger timespans are anchored to the start of the requested range.
+
+    Args:
+        timespan: The size of the aggregate time window, e.g., day, minute, quarter, year
+        timespan_multiplier: The size of the aggregate timespan multiplier
+
+    Returns:
+        True if the bars can be retrieved and stored piecewise by date, otherwise False
+    """
+    return timespan in AGGREGATE_BARS_PER_DAY and (timespan != "day" or str(timespan_multiplier) == "1")
+
+# --- Polygon - Pagination - Date range chunking for the Aggregate (Bars) API ---
+def split_date_range_into_chunks(timespan: str,
+                                 timespan_multiplier: str,
+                                 from_date: str,
+                                 to_date: str,
+                                 limit: str) -> list:
+    """
+    Splits a date range into consecutive chunks that are each expected to fit within a single API call.
+    Timespans larger than a day, and multi-day bars, are never split as a chunk boundary would cut through an aggregate window.
+
+    Args:
+        timespan: The size of the aggregate time window, e.g., day, minute, quarter, year
+        timespan_multiplier: The size of the aggregate timespan multiplier
+        from_date: The start date of the range in YYYY-MM-DD format, inclusive
+        to_date: The end date of the range in YYYY-MM-DD format, inclusive
+        limit: The maximum amount of base aggregates queried per API call
+
+    Returns:
+        A list of inclusive (from_date, to_date) tuples in YYYY-MM-DD format, in ascending order
+    """
+    if not aggregate_window_fits_within_day(timespan, timespan_multiplier):
+        return [(from_date, to_date)]
+
+    try:
+        start = datetime.date.fromisoformat(from_date)
+        end = datetime.date.fromisoformat(to_date)
+    except ValueError:
+        # Leave the validation of non-date inputs, e.g., millisecond timestamps, to the API
+        return [(from_date, to_date)]
+
+    # The limit counts the base aggregates before they are combined by the multiplier, so the multiplier does not widen a chunk
+    chunk_days = max(1, math.floor(int(limit) / AGGREGATE_BARS_PER_DAY[timespan]))
+
+    date_range_chunks = []
+    while start <= end:
+        chunk_end = min(end, start + datetime.timedelta(days=chunk_days - 1))
+        date_range_chunks.append((start.isoformat(), chunk_end.isoformat()))
+        start = chunk_end + datetime.timedelta(days=1)
+
+    return date_range_chunks
+
+# --- Polygon - Pagination - Following the next_url of the Aggregate (Bars) API ---
+def retrieve_aggregate_pages(url: str,
+                             api_key: str) -> list:
+    """
+    Calls the Polygon Aggregate (Bars) API and follows the next_url of every response until the date range is exhausted.
+    Every page is sent through the shared PolygonRequestScheduler, so that it is rate-limited, retried, and coalesced with identical requests of other sessions.
+
+    Args:
+        url: The URL of the first page, including the API key
+        api_key: The Polygon API key, which is not included in the next_url of a response
+
+    Returns:
+        A list of the decoded responses of every page, in the order they were retrieved
+    """
+    scheduler = polygon_request_scheduler()
+
+    pages = []
+    while url is not None:
+        data = decode_aggregate_bars_response(scheduler.get(url))
+        pages.append(data)
+
+        url = data.get("next_url")
+        if url is not None:
+            url = f"{url}&apiKey={api_key}"
+
+    return pages
+
+# --- Polygon - Pagination - URL generation for every chunk of the Aggregate (Bars) API ---
+def build_aggregate_chunk_urls(symbol: str,
+                               timespan: str,
+                               timespan_multiplier: str,
+                               from_date: str,
+                               to_date: str,
+                               adjusted: str,
+                               limit: str,
+                               api_key: str) -> list:
+    """
+    Generates the URL of the first page for every date range chunk of an aggregate bars retrieval.
+    Every chunk is retrieved in ascending order, so that the chunks can be stitched together in order.
+
+    Args:
+        symbol: The ticker symbol of the stock to download
+        timespan: The size of the aggregate time window, e.g., day, minute, quarter, year
+        timespan_multiplier: The size of the aggregate timespan multiplier
+        from_date: The start date for the stock data that will be retrieved
+        to_date: The end date for the stock data that will be retrieved
+        adjusted: Setting for whether the stock data will be adjusted for splits
+        limit: The maximum amount of base aggregates queried per API call
+        api_key: The Polygon API key
+
+    Returns:
+        A list of URLs, one per chunk, in ascending order of the chunks
+    """
+    return [f"{polygon_api_base_url()}/v2/aggs/ticker/{symbol}/range/{timespan_multiplier}/{timespan}/{chunk_from_date}/{chunk_to_date}?adjusted={adjusted}&sort=asc&limit={limit}&apiKey={api_key}"
+            for chunk_from_date, chunk_to_date in split_date_range_into_chunks(timespan, timespan_multiplier, from_date, to_date, limit)]
+
+# --- Polygon - Pagination - Stitching the pages of the Aggregate (Bars) API into a single response ---
+def stitch_aggregate_pages(symbol: str,
+                           pages: list,
+                           sort_order: str) -> dict:
+    """
+    Stitches the decoded responses of every page of an aggregate bars retrieval into a single response.
+    The first failed page is surfaced as is, similar to a single API call.
+
+    Args:
+        symbol: The ticker symbol of the retrieved stock
+        pages: A list of the decoded responses of every page, in ascending order of time
+        sort_order: The sorting order of the stitched bars, can be ascending or descending based on time
+
+    Returns:
+        The stock data with the bars being stored within a Polars DataFrame called "results"
+    """
+    for page in pages:
+        if page.get("status") not in ("OK", "DELAYED"):
+            return page
+
+    results = pl.concat([pl.DataFrame(schema=POLYGON_AGGREGATE_BARS_SCHEMA)] + [page["results"] for page in pages if "results" in page],
+                        how="vertical")
+    if sort_order == "desc":
+        results = results.reverse()
+
+    data = {"ticker": pages[0].get("ticker", symbol),
+            "adjusted": pages[0].get("adjusted"),
+            "queryCount": sum(page.get("queryCount", 0) for page in pages),
+            "resultsCount": results.height,
+            "status": pages[-1].get("status")}
+
+    # Keep the shape of an empty API response, where the "results" object is missing
+    if results.height > 0:
+        data["results"] = results
+
+    return data
+
+# --- Polygon - API - Uncached Data Retrieval ---
+def fetch_aggregate_data_for_stock(symbol: str,
+                                   timespan: str,
+                                   timespan_multiplier: str,
+                                   from_date: str,
+                                   to_date: str,
+                                   adjusted: str,
+                                   sort_order: str,
+                                   limit: str):
+    """
+    Retrieves aggregated bars from the Polygon Aggregate (Bars) API without the in-process cache of retrieve_aggregate_data_for_stock.
+    Used by the bar store, which decides by itself when a range has to be retrieved again, e.g., the bars of the current trading day.
+
+    Args:
+        symbol: The ticker symbol of the stock to download
+        timespan: The size of the aggregate time window, e.g., day, minute, quarter, year
+        timespan_multiplier: The size of the aggregate timespan multiplier
+        from_date: The start date for the stock data that will be retrieved
+        to_date: The end date for the stock data that will be retrieved
+        adjusted: Setting for whether the stock data will be adjusted for splits
+        sort_order: The sorting order for the stock data will be retrieved can be ascending or descending based on time
+        limit: The total amount (in rows) of data before aggregation that a single API call will be limited to
+
+    Returns:
+        The stock data with the bars being stored within a Polars DataFrame called "results"
+        Metadata and status code is also sent as part of the API call
+    """
+    api_key = polygon_api_key()
+
+    # Call the Polygon Aggregate Data API to retrieve the data
+    # Default to pre-defined if not selected by the user
+    urls = build_aggregate_chunk_urls(symbol, timespan, timespan_multiplier, from_date, to_date, adjusted, limit, api_key)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=min(len(urls), AGGREGATE_BARS_MAX_WORKERS)) as executor:
+        pages = [page for chunk_pages in executor.map(retrieve_aggregate_pages, urls, [api_key] * len(urls)) for page in chunk_pages]
+
+    return stitch_aggregate_pages(symbol, pages, sort_order)
+
 # --- Polygon - API - Function Data Retrieval ---
 @st.cache_data
 def retrieve_aggregate_data_for_stock(symbol: str,
@@ -23,6 +586,8 @@ def retrieve_aggregate_data_for_stock(symbol: str,
                                       limit: str):
     """
     Calls the Polygon Aggregate (Bars) API to retrieve aggregated bars for a user-specified stock based on a set of user-specified settings.
+    Large date ranges are split into chunks that are retrieved concurrently, and every page of a chunk is followed through its next_url.
+    The pages are stitched back into a single response so that no bars are truncated by the limit.
 
     Args:
         stock: The ticker symbol of the stock to download
@@ -32,21 +597,95 @@ def retrieve_aggregate_data_for_stock(symbol: str,
         to_date: The end date for the stock data that will be retrieved
         adjusted: Setting for whether the stock data will be adjusted for splits
         sort_order: The sorting order for the stock data will be retrieved can be ascending or descending based on time
-        limit: The total amount (in rows) of data before aggregation that the data will be limited to
+        limit: The total amount (in rows) of data before aggregation that a single API call will be limited to
 
     Returns:
-        The stock data in JSON format with the data being stored within a JSON object called "results"
+        The stock data with the bars being stored within a Polars DataFrame called "results", decoded straight from the raw response bytes
         Metadata and status code is also sent as part of the API call
     """
-    api_key = st.secrets.api_keys.POLYGON_API_KEY
+    return fetch_aggregate_data_for_stock(symbol, timespan, timespan_multiplier, from_date, to_date, adjusted, sort_order, limit)
 
-    # Call the Polygon Aggregate Data API to retrieve the data
-    # Default to pre-defined if not selected by the user
-    url_generator = f"https://api.polygon.io/v2/aggs/ticker/{symbol}/range/{timespan_multiplier}/{timespan}/{from_date}/{to_date}?adjusted={adjusted}&sort={sort_order}&limit={limit}&apiKey={api_key}"
-    data_request = requests.get(url_generator)
-    data = data_request.json()
+# --- Polygon - Asyncio - Following the next_url of a single chunk ---
+async def retrieve_aggregate_pages_async(client: httpx.AsyncClient,
+                                         url: str,
+                                         api_key: str,
+                                         semaphore: asyncio.Semaphore,
+                                         scheduler: PolygonRequestScheduler) -> list:
+    """
+    Asyncio counterpart of retrieve_aggregate_pages, which follows the next_url of every response until the date range is exhausted.
+    Every page waits for the concurrency semaphore, and is sent through the get_async method of the scheduler, so that it is rate-limited, retried, and coalesced.
 
-    return data
+    Args:
+        client: The httpx AsyncClient shared by the batch retrieval
+        url: The URL of the first page, including the API key
+        api_key: The Polygon API key, which is not included in the next_url of a response
+        semaphore: The semaphore bounding the amount of in-flight requests
+        scheduler: The PolygonRequestScheduler the requests are sent through
+
+    Returns:
+        A list of the decoded responses of every page, in the order they were retrieved
+    """
+    pages = []
+    while url is not None:
+        async with semaphore:
+            content = await scheduler.get_async(client, url)
+        data = decode_aggregate_bars_response(content)
+        pages.append(data)
+
+        url = data.get("next_url")
+        if url is not None:
+            url = f"{url}&apiKey={api_key}"
+
+    return pages
+
+# --- Polygon - Asyncio - Batch retrieval of aggregate bars for multiple stocks ---
+async def retrieve_aggregate_data_for_stocks_async(symbols: list,
+                                                   timespan: str,
+                                                   timespan_multiplier: str,
+                                                   from_date: str,
+                                                   to_date: str,
+                                                   adjusted: str,
+                                                   sort_order: str,
+                                                   limit: str,
+                                                   max_concurrency: int = 16,
+                                                   requests_per_minute: float = None) -> dict:
+    """
+    Calls the Polygon Aggregate (Bars) API for every stock in a list concurrently, with every chunk and page fanned out onto a single event loop.
+    Waits roughly as long as the slowest stock, instead of the sum of all of the stocks.
+
+    Args:
+        symbols: A list of the ticker symbols of the stocks to download
+        timespan: The size of the aggregate time window, e.g., day, minute, quarter, year
+        timespan_multiplier: The size of the aggregate timespan multiplier
+        from_date: The start date for the stock data that will be retrieved
+        to_date: The end date for the stock data that will be retrieved
+        adjusted: Setting for whether the stock data will be adjusted for splits
+        sort_order: The sorting order for the stock data will be retrieved can be ascending or descending based on time
+        limit: The total amount (in rows) of data before aggregation that a single API call will be limited to
+        max_concurrency: The maximum amount of in-flight requests at any single point in time
+        requests_per_minute: A separate rate-limit budget for this retrieval only, e.g., for a different API key.
+                             The requests share the budget and the in-flight requests of the polygon_request_scheduler with every other session if not specified
+
+    Returns:
+        A dictionary of the ticker symbol to its stitched stock data, similar to retrieve_aggregate_data_for_stock
+    """
+    api_key = polygon_api_key()
+
+    semaphore = asyncio.Semaphore(max_concurrency)
+    scheduler = polygon_request_scheduler() if requests_per_minute is None else PolygonRequestScheduler(polygon_http_session(), requests_per_minute)
+    limits = httpx.Limits(max_connections=max_concurrency, max_keepalive_connections=max_concurrency)
+    timeout = httpx.Timeout(POLYGON_REQUEST_TIMEOUT[1], connect=POLYGON_REQUEST_TIMEOUT[0])
+
+    async with httpx.AsyncClient(limits=limits, timeout=timeout) as client:
+        async def retrieve_stock(symbol: str) -> dict:
+            urls = build_aggregate_chunk_urls(symbol, timespan, timespan_multiplier, from_date, to_date, adjusted, limit, api_key)
+            chunk_pages = await asyncio.gather(*[retrieve_aggregate_pages_async(client, url, api_key, semaphore, scheduler) for url in urls])
+
+            return stitch_aggregate_pages(symbol, [page for pages in chunk_pages for page in pages], sort_order)
+
+        stock_data = await asyncio.gather(*[retrieve_stock(symbol) for symbol in symbols])
+
+    return dict(zip(symbols, stock_data))
 
 # --- Polygon - API - News Data Retrieval ---
 @st.cache_data
@@ -58,6 +697,7 @@ def retrieve_news_for_stock(symbol: str,
                             article_limit: str = 10):
     """
     Calls the Polygon Ticker News API to retrieve relevant news articles for a user-specified stock based on a set of user-specified settings.
+    The request is sent through the shared PolygonRequestScheduler, so that it is rate-limited, retried, and coalesced with identical requests of other sessions.
 
     Args:
         symbol: The ticker symbol of the stock news articles that will be retrieved
@@ -71,36 +711,99 @@ def retrieve_news_for_stock(symbol: str,
         The news articles for the queried stock data between the from_date and to_date in JSON format with the data being stored within a JSON object called "results"
         Metadata and status code is also sent as part of the API call
     """
-    api_key = st.secrets.api_keys.POLYGON_API_KEY
+    api_key = polygon_api_key()
 
     # Call the Polygon Ticker News API with the user-specified settings
     # No pre-defined state, should be defined based on the sent stock data settings form in the sidebar
-    url_generator = f"https://api.polygon.io/v2/reference/news?ticker={symbol}&order={sort_order}&limit={article_limit}&sort={sort_column}&published_utc.gte={from_date}&published_utc.lte={to_date}&apiKey={api_key}"
-    data_request = requests.get(url_generator)
-    data = data_request.json()
+    url_generator = f"{polygon_api_base_url()}/v2/reference/news?ticker={symbol}&order={sort_order}&limit={article_limit}&sort={sort_column}&published_utc.gte={from_date}&published_utc.lte={to_date}&apiKey={api_key}"
+    data = json.loads(polygon_request_scheduler().get(url_generator))
 
     return data
 
+# --- Polygon - API - Incremental News Data Retrieval ---
+def retrieve_news_pages_for_stock(symbol: str,
+                                  published_utc_gte: str = None,
+                                  published_utc_lt: str = None,
+                                  page_limit: int = 1000) -> list:
+    """
+    Calls the Polygon Ticker News API for every article of a stock within a published_utc range, following the next_url of every response.
+    Not cached by Streamlit, as it serves the incremental ingestion of the news store of the Storage_Functions.py file, which only asks for articles it does not hold yet.
+
+    Args:
+        symbol: The ticker symbol of the stock news articles that will be retrieved
+        published_utc_gte: The earliest published_utc of the articles, inclusive, as a date or an ISO timestamp. Unbounded if not specified
+        published_utc_lt: The latest published_utc of the articles, exclusive, as a date or an ISO timestamp. Unbounded if not specified
+        page_limit: The amount of articles per page, up to the maximum of 1000 of the API
+
+    Returns:
+        A list of the articles in the nested JSON format of the API, in ascending order of the "published_utc" value
+
+    Raises:
+        KeyError: If the API responds with an error, similar to a missing "results" object
+    """
+    api_key = polygon_api_key()
+    scheduler = polygon_request_scheduler()
+
+    url = f"{polygon_api_base_url()}/v2/reference/news?ticker={symbol}&order=asc&sort=published_utc&limit={page_limit}"
+    if published_utc_gte is not None:
+        url += f"&published_utc.gte={published_utc_gte}"
+    if published_utc_lt is not None:
+        url += f"&published_utc.lt={published_utc_lt}"
+    url += f"&apiKey={api_key}"
+
+    articles = []
+    while url is not None:
+        data = json.loads(scheduler.get(url))
+        if data.get("status") not in ("OK", "DELAYED"):
+            raise KeyError("results")
+        articles.extend(data.get("results", []))
+
+        url = data.get("next_url")
+        if url is not None:
+            url = f"{url}&apiKey={api_key}"
+
+    return articles
+
 # --- Langchain and LLM ---
+# --- Langchain - Configs - Backend of the chat model ---
+# Default backend of the chat model, can be overridden through the PROJECT_STONKS_LLM_BACKEND environment variable, e.g., "fake" for offline testing
+LLM_BACKEND = "groq"
+
+def create_groq_chat_model() -> ChatGroq:
+    """ Creates the remote ChatGroq model, with the GROQ_API_KEY environment variable taking precedence over the Streamlit secrets """
+    return ChatGroq(api_key=os.environ.get("GROQ_API_KEY") or st.secrets.api_keys.GROQ_API_KEY,
+                    model="mixtral-8x7b-32768")
+
+# Backend name: function creating the chat model, called with the backend settings
+LLM_BACKENDS = {"groq": create_groq_chat_model,
+                "fake": LLM_Functions.LocalFakeChatModel}
+
 # --- Langchain - API - Query a specific LLM with the data ---
 @st.cache_resource
-def query_llm_with_question():
+def query_llm_with_question(backend: str = None,
+                            **backend_settings):
     """
-    Queries the LLM (ChatGroq API with Mixtral) with a hardcoded prompt template.
+    Queries the LLM (ChatGroq API with Mixtral by default) with a hardcoded prompt template.
     Injects the variables in the prompt template throught the invoke() function call
+    The data_context and conversation_history variables are built within a token budget by the LLM_Functions.py file
+    The chain can be invoked for the full response, or streamed chunk by chunk through its stream() function
 
     Args:
-        -
+        backend: The key of the chat model within LLM_BACKENDS. The PROJECT_STONKS_LLM_BACKEND environment variable, or LLM_BACKEND, if not specified
+        backend_settings: Keyword arguments of the chat model, e.g., first_token_latency_seconds for the "fake" backend
     Returns:
         Parsed LLMResults into a readable string format easily processed by Streamlit
+
+    Raises:
+        KeyError: If the backend is not within LLM_BACKENDS
     """
     # Prompt engineering for the LLM to answer the user's question in the most appropriate manner
     prompt_template = """
     You are a certified financial analyst that is knowledged in investing, and all things stocks.
     You are interacting with a user who is asking you questions about a specific stock, and the stock market at large.
-    Based on the data below, write a response that bests answers the user's question. Take the conversation history into account.
+    Based on the compact summary of the stock data below, write a response that bests answers the user's question. Take the conversation history into account.
 
-    <DATA>{dataframe}</DATA>
+    <DATA>{data_context}</DATA>
     
     Conversation History: {conversation_history}
 
@@ -110,9 +813,7 @@ def query_llm_with_question():
 
     # Initialize the prompt template, and the LLM model in Chat
     prompt = ChatPromptTemplate.from_template(prompt_template)
-    llm = ChatGroq(
-        api_key=st.secrets.api_keys.GROQ_API_KEY,
-        model="mixtral-8x7b-32768")
+    llm = LLM_BACKENDS[backend or os.environ.get("PROJECT_STONKS_LLM_BACKEND", LLM_BACKEND)](**backend_settings)
     
     return (
         RunnablePassthrough.assign()
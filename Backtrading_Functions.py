@@ -4,63 +4,156 @@ import backtrader
 from backtrader_plotly.plotter import BacktraderPlotly
 from backtrader_plotly.scheme import PlotScheme
 import polars as pl
+import numpy as np
+import plotly.graph_objects as go
 import math
+import os
+import logging
+import tempfile
+import itertools
+import contextlib
+import multiprocessing
+import functools
+import concurrent.futures
+
+# Functions
+import Transformation_Functions
+
+# --- Backtrader - Logging - Module logger, silent unless configured by the application ---
+# e.g., logging.getLogger("Backtrading_Functions").setLevel(logging.DEBUG) with a handler shows every order and sizing decision
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+# --- Backtrader - Logging - Columnar buffer of log records, converted into a Polars DataFrame at the end of a run ---
+class ColumnarBuffer:
+    """
+    Preallocated NumPy column per field, filled row by row during a run without building a dictionary per record.
+    The capacity doubles when the buffer is full, so that appending stays amortized constant time.
+    """
+    def __init__(self, schema: dict, capacity: int = 256):
+        self.schema = schema
+        self.columns = {column_name: np.empty(capacity, dtype=dtype) for column_name, dtype in schema.items()}
+        self.capacity = capacity
+        self.length = 0
+
+    def append(self, *values):
+        if self.length == self.capacity:
+            self.capacity *= 2
+            for column_name, column in self.columns.items():
+                self.columns[column_name] = np.resize(column, self.capacity)
+
+        for column, value in zip(self.columns.values(), values):
+            column[self.length] = value
+        self.length += 1
+
+    def to_polars(self) -> pl.DataFrame:
+        """ Returns the filled rows as a Polars DataFrame, where the Backtrader datetime columns (ending with "datetime") are converted into Polars datetimes """
+        dataframe = pl.DataFrame({column_name: column[:self.length] for column_name, column in self.columns.items()})
+
+        # Float day numbers hold about 10 microseconds of precision, so the datetimes are rounded to the millisecond of the Polygon bars
+        return dataframe.with_columns([pl.from_epoch(((pl.col(column_name) - BACKTRADER_EPOCH_DAY_NUMBER) * 86400000).round().cast(pl.Int64), time_unit="ms")
+                                       for column_name in dataframe.columns if column_name.endswith("datetime")])
 
 # --- Backtrader - Analyzer - Analyzes the current position for any given time period ---
 class TradeLogger(backtrader.analyzers.Analyzer):
     """
     Analyzer
     Analyzes the current trading period for the key information such as bar open, bar close, etc. 
+    Records every closed trade and every finished order into a columnar buffer, which get_analysis returns as Polars DataFrames.
+    The records are also sent to the module logger at the log_level, which costs nothing while that level is disabled.
     """
+    params = (('log_level', logging.DEBUG),)
+
+    # Names of the Backtrader order status codes, e.g., "Completed" or "Margin"
+    ORDER_STATUS_NAMES = backtrader.Order.Status
+
     def start(self):
       super(TradeLogger, self).start()
 
     def log(self, txt):
         """ Logging Function """
-        dt = self.datas[0].datetime.date(0).isoformat()
-        print(f'{dt}, {txt}')
+        if logger.isEnabledFor(self.p.log_level):
+            dt = self.datas[0].datetime.date(0).isoformat()
+            logger.log(self.p.log_level, f'{dt}, {txt}')
 
     def create_analysis(self):
-      self.rets = []
-      self.vals = dict()
-      self.order = None
-      self.price = None
-      self.comm = None
+      self.trades = ColumnarBuffer({'datetime': np.float64,
+                                    'bar_open': np.int64,
+                                    'bar_close': np.int64,
+                                    'trade_price': np.float64,
+                                    'trade_duration_days': np.float64,
+                                    'trade_commission': np.float64,
+                                    'gross_profit_and_loss': np.float64,
+                                    'net_profit_and_loss': np.float64})
+      self.orders = ColumnarBuffer({'datetime': np.float64,
+                                    'is_buy': np.bool_,
+                                    'status': np.int8,
+                                    'size': np.float64,
+                                    'price': np.float64,
+                                    'value': np.float64,
+                                    'commission': np.float64})
 
     def notify_trade(self, trade):
       # Receives trade notifications before each next cycle
       if not trade.isclosed:
         return
-      
-      if trade.isclosed:
-        self.vals = {'Date': self.strategy.datetime.datetime(),
-                     'Bar Open': round(trade.baropen),
-                     'Bar Close': round(trade.barclose),
-                     'Trade Price': round(trade.price),
-                     'Trade Duration (in days)': (trade.dtclose - trade.dtopen),
-                     'Trade Commission': trade.commission,
-                     'Gross Profit and Loss': round(trade.pnl, 2),
-                     'Net Profit and Loss': round(trade.pnlcomm, 2),
-        }
-        self.rets.append(self.vals)
+
+      self.trades.append(self.strategy.datetime[0],
+                         trade.baropen,
+                         trade.barclose,
+                         trade.price,
+                         trade.dtclose - trade.dtopen,
+                         trade.commission,
+                         trade.pnl,
+                         trade.pnlcomm)
 
     def notify_order(self, order):
         if order.status in [order.Submitted, order.Accepted]:
             return
-        # Print the executed buy order
+
+        self.orders.append(self.strategy.datetime[0],
+                           order.isbuy(),
+                           order.status,
+                           order.executed.size,
+                           order.executed.price,
+                           order.executed.value,
+                           order.executed.comm)
+
+        # Log the executed order
         if order.status in [order.Completed]:
-            if order.isbuy():
-                self.log(f'Buy Executed ---- Price: {order.executed.price: .2f}, Cost: {order.executed.value: .2f}, Commission: {order.executed.comm: .2f}')
-                self.price = order.executed.price
-                self.comm = order.executed.comm
-            else:
-                self.log(f'Sell Executed ---- Price: {order.executed.price: .2f}, Cost: {order.executed.value: .2f}, Commission: {order.executed.comm: .2f}')
+            self.log(f'{"Buy" if order.isbuy() else "Sell"} Executed ---- Price: {order.executed.price: .2f}, Cost: {order.executed.value: .2f}, Commission: {order.executed.comm: .2f}')
         elif order.status in [order.Canceled, order.Margin, order.Rejected]:
             self.log('Order Failed')
-        self.order = None
 
     def get_analysis(self):
-      return self.rets
+      """ Returns a dictionary with the closed trades within "trades", and the finished orders within "orders", both as Polars DataFrames """
+      orders = self.orders.to_polars() \
+                   .with_columns(pl.col('status').replace_strict(dict(enumerate(self.ORDER_STATUS_NAMES)), return_dtype=pl.String))
+
+      return {'trades': self.trades.to_polars(),
+              'orders': orders}
+
+# --- Backtrader - Analyzer - Records the account balance and value at every bar ---
+class EquityCurve(backtrader.analyzers.Analyzer):
+  """
+  Analyzer
+  Records the cash and the account value of the broker at the close of every bar into a columnar buffer, which get_analysis returns as a Polars DataFrame.
+  """
+  def create_analysis(self):
+    # The data is preloaded before the analyzers are created, so the buffer is allocated once for every bar
+    self.equity = ColumnarBuffer({'datetime': np.float64,
+                                  'cash': np.float64,
+                                  'value': np.float64},
+                                 capacity=self.data.buflen() or 256)
+
+  def next(self):
+    self.equity.append(self.strategy.datetime[0],
+                       self.strategy.broker.getcash(),
+                       self.strategy.broker.getvalue())
+
+  def get_analysis(self):
+    """ Returns the "datetime", "cash", and "value" of every bar as a Polars DataFrame """
+    return self.equity.to_polars()
 
 # --- Backtrader - Trade Sizer - Sizer class for determining buy/sell decisions based on risk and other factors ---
 class variablesizer_max_risk(backtrader.Sizer):
@@ -72,7 +165,7 @@ class variablesizer_max_risk(backtrader.Sizer):
   Also accounts for the amount of commission associated with each trade
   """
   params = (('risk', 0.1),
-            ('debug', True))
+            ('debug', False))
 
   def _getsizing(self, comminfo, cash, data, isbuy):
     size = 0
@@ -111,13 +204,13 @@ class variablesizer_max_risk(backtrader.Sizer):
 
     comm_adj_size = math.floor(comm_adj_size)
 
-    if self.p.debug:
+    if self.p.debug and logger.isEnabledFor(logging.DEBUG):
       if isbuy:
         buysell = 'BUY'
       else:
         buysell = 'SELL'
     
-      print(f"""
+      logger.debug(f"""
             |---Staker Debug---|\n
             Action: {buysell}\n
             Price: {data[0]}\n
@@ -151,8 +244,9 @@ class buy_and_hold_strategy(backtrader.Strategy):
     self.size = None
 
   def log(self, text):
-    dt = self.datas[0].datetime.date(0).isoformat()
-    print(f'{dt}, {text}')
+    if logger.isEnabledFor(logging.DEBUG):
+      dt = self.datas[0].datetime.date(0).isoformat()
+      logger.debug(f'{dt}, {text}')
 
   def nextstart(self):
     if self.order:
@@ -162,79 +256,949 @@ class buy_and_hold_strategy(backtrader.Strategy):
     maximum_trade_stake = int(self.broker.get_cash() / self.data_close)
     self.buy(size=maximum_trade_stake)
 
+# --- Backtrader - Strategy - Periodically rebalanced portfolio over every data feed ---
+class portfolio_rebalance_strategy(backtrader.Strategy):
+  """
+  Portfolio Rebalancing Strategy
+  Holds every stock of the portfolio from a single account balance, and rebalances the positions every rebalance_period bars.
+  The target position of a stock is sized like the variablesizer_max_risk sizer, with a share of the portfolio value as its risk budget.
+  Stocks without any trading volume on a rebalancing bar (e.g., not listed yet) keep their current position.
+  """
+  params = (('rebalance_period', 20),
+            ('risk', 0.95),
+            ('risk_budgets', None))
+
+  def __init__(self):
+    # Equal risk budgets, unless a budget is given per ticker symbol
+    if self.p.risk_budgets is None:
+      self.risk_budgets = {data._name: self.p.risk / len(self.datas) for data in self.datas}
+    else:
+      self.risk_budgets = {data._name: self.p.risk_budgets.get(data._name, 0) for data in self.datas}
+
+  def next(self):
+    if (len(self) - 1) % self.p.rebalance_period:
+      return
+
+    portfolio_value = self.broker.getvalue()
+    order_sizes = []
+    for data in self.datas:
+      if data.volume[0] <= 0:
+        continue
+      commission = self.broker.getcommissioninfo(data).p.commission
+      target_size = variablesizer_max_risk_size(portfolio_value, data.close[0], commission, self.risk_budgets[data._name])
+      order_sizes.append((target_size - self.getposition(data).size, data, target_size))
+
+    # Sells are submitted before buys, so that the broker accounts for the cash they release
+    for order_size, data, target_size in sorted(order_sizes, key=lambda order: order[0]):
+      if order_size != 0:
+        self.order_target_size(data=data, target=target_size)
+
+# --- Backtrader - Feed - Data feed reading the lines straight from the buffers of a Polars Dataframe ---
+# Day number of 1970-01-01 in the datetime format of Backtrader (days since 0001-01-01, plus one)
+BACKTRADER_EPOCH_DAY_NUMBER = 719163
+
+class PolarsData(backtrader.feed.DataBase):
+  """
+  Data Feed reading the user-queried stock Polars Dataframe without a conversion to Pandas.
+  The columns are converted once into NumPy arrays when the feed starts. When Cerebro preloads the data, the arrays are copied into the line buffers in one step instead of bar by bar.
+  Use the backtrader_data_to_feed function to get a feed class with a line for every technical indicator column.
+  """
+  params = (('indicator_columns', ()),)
+
+  # Line of the feed for every column of the stock Polars Dataframe
+  column_lines = {'datetime': 'timestamp',
+                  'open': 'open',
+                  'high': 'high',
+                  'low': 'low',
+                  'close': 'close',
+                  'volume': 'trading_volume'}
+
+  def start(self):
+    super(PolarsData, self).start()
+
+    stock_dataframe = self.p.dataname
+    epoch_microseconds = pl.col('timestamp').dt.epoch(time_unit='us')
+    line_columns = stock_dataframe.select([((epoch_microseconds // 86400000000 + BACKTRADER_EPOCH_DAY_NUMBER)
+                                            + (epoch_microseconds % 86400000000) / 86400000000).alias('datetime')]
+                                          + [pl.col(column_name).cast(pl.Float64).alias(line_name) for line_name, column_name in self.column_lines.items() if line_name != 'datetime']
+                                          + [pl.col(column_name).cast(pl.Float64) for column_name in self.p.indicator_columns])
+
+    # Nulls (e.g., the warm-up of an indicator) become NaN, the empty value of a Backtrader line
+    self.line_arrays = [line_columns[line_name].to_numpy() if line_name in line_columns.columns else np.full(line_columns.height, np.nan)
+                        for line_name in self.lines.getlinealiases()]
+    self.datetime_array = line_columns['datetime'].to_numpy()
+    self.row = 0
+
+  def _load(self):
+    # Bar-by-bar loading, used when Cerebro does not preload the data
+    if self.row >= len(self.datetime_array):
+      return False
+
+    for line, line_array in zip(self.lines, self.line_arrays):
+      line[0] = line_array[self.row]
+    self.row += 1
+
+    return True
+
+  def preload(self):
+    # Filters, timezone localization and unbounded-memory settings need the bar-by-bar path
+    if self._filters or self._ffilters or self._tzinput or self.lines.datetime.mode != self.lines.datetime.UnBounded:
+      return super(PolarsData, self).preload()
+
+    within_dates = (self.datetime_array >= self.fromdate) & (self.datetime_array <= self.todate)
+    for line, line_array in zip(self.lines, self.line_arrays):
+      line.array.frombytes(np.ascontiguousarray(line_array[within_dates], dtype=np.float64).tobytes())
+
+    self._last()
+    self.home()
+
+@functools.cache
+def polars_feed_class(indicator_columns: tuple) -> type:
+  """
+  Builds a subclass of the PolarsData feed with an extra line for every technical indicator column, e.g., self.datas[0].ti_returns[0] within a strategy.
+  The classes are cached, so that the lines of a column set are only declared once.
+
+  Args:
+    indicator_columns: The names of the technical indicator columns
+  Returns:
+    The subclass of the PolarsData feed
+  """
+  return type(PolarsData)('PolarsData', (PolarsData,), {'lines': indicator_columns,
+                                                          'params': (('indicator_columns', indicator_columns),)})
+
 # --- Backtrader - Feed - Converts a Polars Dataframe into a data feed processable by Backtrader ---
 def backtrader_data_to_feed(stock_dataframe: pl.DataFrame):
   """
-  Converts a Polars DataFrame to a Pandas DataFrame and then to a Backtrader feed data where it can be processed by all the other Backtrader classes
+  Converts a Polars DataFrame to a Backtrader feed data where it can be processed by all the other Backtrader classes
+  Every "ti_" technical indicator column is exposed as an extra line of the feed, so that the strategies do not have to recompute it.
 
   Args:
     stock_dataframe: The user-queried stock Polars Dataframe to be converted
   Returns:
     The data converted into a Backtrader Feeds data stream
   """
-  stock_feed = backtrader.feeds.PandasData(dataname=stock_dataframe.to_pandas())
+  indicator_columns = tuple(column_name for column_name in stock_dataframe.columns if column_name.startswith("ti_"))
+  stock_feed = polars_feed_class(indicator_columns)(dataname=stock_dataframe)
 
   return stock_feed
 
-# --- Backtrader - Initialization - Runner class for the trading strategy ---
-def buy_and_hold_stock_trader_init(stock_dataframe: pl.DataFrame,
-                                   strategy: backtrader.Strategy = buy_and_hold_strategy, 
-                                   initial_account_balance: int = 1000, 
-                                   commission: float = 0, 
-                                   stake: int = 5):
+# --- Backtrader - Feed - Aligns the stocks of a long-format Polars Dataframe on a common timestamp index ---
+def align_stock_dataframes(stock_dataframe: pl.DataFrame) -> dict:
+  """
+  Splits a long-format Polars DataFrame of several stocks into one DataFrame per stock, all holding the same sorted timestamps.
+  A stock without a bar at a timestamp holds the close of its previous bar as its prices, and before its first bar the open of its first bar, with a trading volume of 0.
+
+  Args:
+    stock_dataframe: The transformed stock data of every stock in a long-format Polars DataFrame, e.g., of the transform_aggregate_multiple_stocks_json_to_dataframe function
+  Returns:
+    A dictionary of the ticker symbols and the aligned Polars DataFrame of each stock
+  """
+  bars = stock_dataframe.lazy().select(["stock_code", "timestamp", "open", "high", "low", "close", "trading_volume"])
+  timestamps = bars.select(pl.col("timestamp").unique())
+  symbols = bars.select(pl.col("stock_code").unique())
+
+  fill_price = pl.coalesce(pl.col("close").forward_fill().over("stock_code"),
+                           pl.col("open").backward_fill().over("stock_code"))
+  aligned_bars = symbols.join(timestamps, how="cross") \
+                        .join(bars, on=["stock_code", "timestamp"], how="left") \
+                        .sort(by=["stock_code", "timestamp"]) \
+                        .with_columns([pl.col("open").fill_null(fill_price),
+                                       pl.col("high").fill_null(fill_price),
+                                       pl.col("low").fill_null(fill_price),
+                                       pl.col("close").fill_null(fill_price),
+                                       pl.col("trading_volume").fill_null(0)]) \
+                        .collect()
+
+  return {symbol: aligned_stock_dataframe for (symbol,), aligned_stock_dataframe in aligned_bars.partition_by("stock_code", as_dict=True, maintain_order=True).items()}
+
+# --- Backtrader - Initialization - Cerebro engine with the strategy, broker settings, sizer, and analyzers ---
+def setup_cerebro(stock_dataframe: pl.DataFrame,
+                  strategy: backtrader.Strategy = buy_and_hold_strategy,
+                  strategy_params: dict | None = None,
+                  initial_account_balance: int = 1000,
+                  commission: float = 0,
+                  risk: float = 0.5,
+                  sizer_debug: bool = False,
+                  stdstats: bool = True) -> backtrader.Cerebro:
     """
-    Runner class for executing any trading strategy
+    Builds a Cerebro engine that is ready to run a single backtest configuration.
     Modify this with any changes to analyzers to gauge the metrics of the trade.
     Documentation @ https://www.backtrader.com/docu/analyzers/analyzers/
 
     Args:
         stock_dataframe: The user-queried stock Polars Dataframe
         strategy: A backtrader.Strategy class that outlines the strategy to be implemented by the trading algorithm
-        initial_account_balance: The amount of initial cash that the trader has access to in an integer datatype 
+        strategy_params: The keyword parameters passed to the strategy class
+        initial_account_balance: The amount of initial cash that the trader has access to in an integer datatype
         commission: The percentage commision charged for each performed trade represented in a float datatype
-        stake: The amount of trades that the trader can perform at any single point in time
+        risk: The maximum share of the account balance at risk in a single trade, used by the variablesizer_max_risk sizer
+        sizer_debug: Setting for whether the sizer logs the details of every sizing decision at the DEBUG level
+        stdstats: Setting for whether the standard observers (account value, trades, buy and sell markers) are added, which are only needed for plotting
     Returns:
-        A return code for the successful/fail run of the Cerebro engine.
-        The graph figure with all of the key information (trades executed, candlestick chart, and other metrics) outputted
+        The Cerebro engine, which is run by calling its run() method
     """
     # Initialize Cerebro engine, add the strategy and initial capital
-    cerebro = backtrader.Cerebro()
+    cerebro = backtrader.Cerebro(stdstats=stdstats)
 
     # Initialize the key information
-    cerebro.addstrategy(strategy=strategy)
+    cerebro.addstrategy(strategy, **(strategy_params or {}))
     cerebro.adddata(data=backtrader_data_to_feed(stock_dataframe))
     cerebro.broker.setcash(initial_account_balance)
-    
-    # Output the initial account balance separate to the other trading information
-    print(f"""
-          \nInitial Account Balance: {cerebro.broker.getvalue()}\n
-           """)
 
     # Broker commission that the trader has to pay
     cerebro.broker.setcommission(commission)
 
     # Number of shares that the trader can buy/sell
-    cerebro.addsizer(variablesizer_max_risk, risk=0.5, debug=True)
+    cerebro.addsizer(variablesizer_max_risk, risk=risk, debug=sizer_debug)
 
     # Evaluation metrics to determine the performance of the trader
+    add_backtest_analyzers(cerebro)
+
+    return cerebro
+
+def add_backtest_analyzers(cerebro: backtrader.Cerebro):
+    """
+    Adds the Returns, SharpeRatio, VWR, TradeLogger, and EquityCurve analyzers that are read by the extract_backtest_metrics function and the BacktestResults class.
+
+    Args:
+        cerebro: The Cerebro engine to add the analyzers to
+    """
     cerebro.addanalyzer(backtrader.analyzers.Returns, timeframe=backtrader.TimeFrame.Days, tann=365)
     cerebro.addanalyzer(backtrader.analyzers.SharpeRatio, timeframe=backtrader.TimeFrame.Days, compression=1, factor=365, annualize=True)
     cerebro.addanalyzer(backtrader.analyzers.VWR, timeframe=backtrader.TimeFrame.Days, tann=365)
     cerebro.addanalyzer(TradeLogger, _name="trade_logger")
+    cerebro.addanalyzer(EquityCurve, _name="equity_curve")
 
-    results = cerebro.run()
+# --- Backtrader - Metrics - Collects the analyzer outputs of a finished run ---
+def extract_backtest_metrics(strategy_result: backtrader.Strategy,
+                             cerebro: backtrader.Cerebro) -> dict:
+    """
+    Collects the outputs of the Returns, SharpeRatio, VWR, and TradeLogger analyzers of a finished Cerebro run into a flat dictionary.
+
+    Args:
+        strategy_result: The strategy instance returned by the run() method of the Cerebro engine
+        cerebro: The Cerebro engine that was run
+
+    Returns:
+        A dictionary with the "rtot", "ravg", "rnorm", "rnorm100", "sharperatio", "vwr", "final_value", "number_of_closed_trades", and "net_profit_and_loss" metrics
+    """
+    returns = strategy_result.analyzers.returns.get_analysis()
+    closed_trades = strategy_result.analyzers.trade_logger.get_analysis()["trades"]
+
+    return {"rtot": returns["rtot"],
+            "ravg": returns["ravg"],
+            "rnorm": returns["rnorm"],
+            "rnorm100": returns["rnorm100"],
+            "sharperatio": strategy_result.analyzers.sharperatio.get_analysis()["sharperatio"],
+            "vwr": strategy_result.analyzers.vwr.get_analysis()["vwr"],
+            "final_value": cerebro.broker.getvalue(),
+            "number_of_closed_trades": closed_trades.height,
+            "net_profit_and_loss": closed_trades["net_profit_and_loss"].sum()}
+
+# --- Backtrader - Results - Headless results of a run, plotted only on demand ---
+class BacktestResults:
+    """
+    Results of a Cerebro run: the analyzer metrics, the equity curve, and the trade and order tables.
+    Nothing is drawn during the run. The figures are only built when the plot or plot_backtrader methods are called.
+    """
+    def __init__(self,
+                 stock_dataframe: pl.DataFrame,
+                 cerebro: backtrader.Cerebro,
+                 strategy_result: backtrader.Strategy):
+        self.stock_dataframe = stock_dataframe
+        self.cerebro = cerebro
+        self.metrics = extract_backtest_metrics(strategy_result, cerebro)
+        self.equity_curve = strategy_result.analyzers.equity_curve.get_analysis()
+
+        trade_log = strategy_result.analyzers.trade_logger.get_analysis()
+        self.trades = trade_log["trades"]
+        self.orders = trade_log["orders"]
+
+    def plot(self,
+             max_candles: int = Transformation_Functions.CANDLESTICK_MAX_VISIBLE_CANDLES,
+             visible_range: tuple = None) -> go.Figure:
+        """
+        Builds the candlestick figure of the candlestick_plotly_graph function of the Transformation_Functions.py file,
+        overlaid with the executed buy and sell orders, and the account value on a secondary axis.
+
+        Args:
+            max_candles: The maximum amount of candles that will be drawn, also the maximum amount of points of the account value line
+            visible_range: An optional (start, end) tuple of datetimes, both inclusive, to which the chart is zoomed in
+
+        Returns:
+            A candlestick figure in Plotly Graph Object format
+        """
+        figure = Transformation_Functions.candlestick_plotly_graph(self.stock_dataframe, max_candles=max_candles, visible_range=visible_range)
+
+        executed_orders = self.orders.filter(pl.col("status") == "Completed")
+        equity_curve = self.equity_curve
+        if visible_range is not None:
+            executed_orders = executed_orders.filter(pl.col("datetime").is_between(visible_range[0], visible_range[1]))
+            equity_curve = equity_curve.filter(pl.col("datetime").is_between(visible_range[0], visible_range[1]))
+        if max_candles is not None and equity_curve.height > max_candles:
+            equity_curve = equity_curve.gather_every(math.ceil(equity_curve.height / max_candles))
+
+        for is_buy, name, marker_symbol, marker_color in ((True, "Buy", "triangle-up", "green"), (False, "Sell", "triangle-down", "red")):
+            side_orders = executed_orders.filter(pl.col("is_buy") == is_buy)
+            figure.add_trace(go.Scatter(x=side_orders["datetime"].to_numpy(),
+                                        y=side_orders["price"].to_numpy(),
+                                        mode="markers",
+                                        name=name,
+                                        marker=dict(symbol=marker_symbol, color=marker_color, size=10)))
+
+        figure.add_trace(go.Scatter(x=equity_curve["datetime"].to_numpy(),
+                                    y=equity_curve["value"].to_numpy(),
+                                    mode="lines",
+                                    name="Account Value",
+                                    yaxis="y2"))
+        figure.update_layout(yaxis2=dict(title=dict(text="Account Value ($)"),
+                                         overlaying="y",
+                                         side="right",
+                                         showgrid=False))
+
+        return figure
+
+    def plot_backtrader(self):
+        """
+        Plots the run with the Backtrader Plotly plotter, and opens the figures in the browser.
+        The broker, trade, and buy/sell observers are only part of the figures if the engine was set up with stdstats.
+
+        Returns:
+            The list of Plotly figures of the plotter
+        """
+        scheme = PlotScheme(decimal_places=3)
+        return self.cerebro.plot(BacktraderPlotly(show=True, scheme=scheme))
+
+# --- Backtrader - Initialization - Runner class for the trading strategy ---
+def buy_and_hold_stock_trader_init(stock_dataframe: pl.DataFrame,
+                                   strategy: backtrader.Strategy = buy_and_hold_strategy, 
+                                   initial_account_balance: int = 1000, 
+                                   commission: float = 0, 
+                                   risk: float = 0.5,
+                                   plot: bool = False) -> BacktestResults:
+    """
+    Runner class for executing any trading strategy
+    The engine is built by the setup_cerebro function, and the results are collected by the BacktestResults class.
+    Runs headless by default, so that batches of backtests do not spend any time on drawing figures.
+
+    Args:
+        stock_dataframe: The user-queried stock Polars Dataframe
+        strategy: A backtrader.Strategy class that outlines the strategy to be implemented by the trading algorithm
+        initial_account_balance: The amount of initial cash that the trader has access to in an integer datatype 
+        commission: The percentage commision charged for each performed trade represented in a float datatype
+        risk: The maximum share of the account balance at risk in a single trade, used by the variablesizer_max_risk sizer
+        plot: Setting for whether the candlestick figure with the trades and the account value is shown at the end of the run
+    Returns:
+        A BacktestResults object with the metrics, the equity curve, and the trade and order tables of the run.
+        Its plot method builds the graph figure with all of the key information (trades executed, candlestick chart, and account value)
+    """
+    # The standard observers are only recorded for the Backtrader plotter
+    cerebro = setup_cerebro(stock_dataframe, strategy, initial_account_balance=initial_account_balance, commission=commission, risk=risk, stdstats=plot)
+
+    # Output the initial account balance separate to the other trading information
+    # Lazy %-style arguments, so that the messages are only formatted if the logger is configured to output them
+    logger.info("""
+          \nInitial Account Balance: %s\n
+           """, cerebro.broker.getvalue())
+
+    results = BacktestResults(stock_dataframe, cerebro, cerebro.run()[0])
+    metrics = results.metrics
     
     # Outputting key information about any key points within the TraderLogs
-    print(f"""
+    logger.info("""
           \n|---|\n
-          Average Return for the Entire Period: {results[0].analyzers.returns.get_analysis()['ravg']}\n
-          Variability-Weighted Return (in %): {results[0].analyzers.vwr.get_analysis()['vwr']}\n
-          Sharpe Ratio: {results[0].analyzers.sharperatio.get_analysis()['sharperatio']}\n
-          Total Compound Return: {results[0].analyzers.returns.get_analysis()['rtot']}\n
+          Average Return for the Entire Period: %s\n
+          Variability-Weighted Return (in %%): %s\n
+          Sharpe Ratio: %s\n
+          Total Compound Return: %s\n
           |---|\n
-          Current Account Balance: {cerebro.broker.getvalue()}\n
-          """)
+          Current Account Balance: %s\n
+          """, metrics['ravg'], metrics['vwr'], metrics['sharperatio'], metrics['rtot'], metrics['final_value'])
     
-    # Plot the key information, trades, and other information
-    scheme = PlotScheme(decimal_places=3)
-    figs = cerebro.plot(BacktraderPlotly(show=True, scheme=scheme))
\ No newline at end of file
+    # Plot the key information, trades, and other information, only if requested
+    if plot:
+        results.plot().show()
+
+    return results
+
+# --- Backtrader - Initialization - Portfolio runner with a single account balance over several stocks ---
+def portfolio_stock_trader_init(stock_dataframe: pl.DataFrame,
+                                strategy: backtrader.Strategy = portfolio_rebalance_strategy,
+                                strategy_params: dict | None = None,
+                                initial_account_balance: int = 100000,
+                                commission: float = 0) -> dict:
+    """
+    Runner for a portfolio backtest, where every stock of a long-format Polars DataFrame is a data feed of one Cerebro engine with a single broker.
+    The feeds are aligned on a common timestamp index by the align_stock_dataframes function, and are named after their ticker symbols.
+
+    Args:
+        stock_dataframe: The transformed stock data of every stock in a long-format Polars DataFrame, e.g., of the transform_aggregate_multiple_stocks_json_to_dataframe function
+        strategy: A backtrader.Strategy class that trades over every data feed
+        strategy_params: The keyword parameters passed to the strategy class, e.g., the rebalance_period, risk, and risk_budgets of the portfolio_rebalance_strategy class
+        initial_account_balance: The amount of initial cash that the trader has access to in an integer datatype
+        commission: The percentage commision charged for each performed trade represented in a float datatype
+    Returns:
+        A dictionary with the metrics of the extract_backtest_metrics function for the whole portfolio
+    """
+    cerebro = backtrader.Cerebro(stdstats=False)
+
+    cerebro.addstrategy(strategy, **(strategy_params or {}))
+    for symbol, aligned_stock_dataframe in align_stock_dataframes(stock_dataframe).items():
+        cerebro.adddata(data=backtrader_data_to_feed(aligned_stock_dataframe), name=symbol)
+    cerebro.broker.setcash(initial_account_balance)
+    cerebro.broker.setcommission(commission)
+    add_backtest_analyzers(cerebro)
+
+    results = cerebro.run()
+
+    return extract_backtest_metrics(results[0], cerebro)
+
+# --- Backtrader - Parameter Sweep - Worker processes sharing the bars through a memory-mapped Arrow IPC file ---
+# Bars of the sweep within a worker process, read once by the pool initializer
+sweep_worker_stock_dataframe = None
+
+def initialize_sweep_worker(stock_ipc_path: str):
+    """
+    Pool initializer that memory-maps the bars of the sweep once per worker process, instead of pickling them with every task.
+
+    Args:
+        stock_ipc_path: The path of the Arrow IPC file holding the stock Polars DataFrame
+    """
+    global sweep_worker_stock_dataframe
+    # Uncompressed IPC files are memory-mapped by default, so the workers share the page cache of the file
+    sweep_worker_stock_dataframe = pl.read_ipc(stock_ipc_path)
+
+@contextlib.contextmanager
+def sweep_process_pool(stock_dataframe: pl.DataFrame,
+                       max_workers: int | None = None):
+    """
+    Context manager for a process pool whose workers hold the bars of the stock Polars DataFrame in sweep_worker_stock_dataframe.
+    The bars are written once to a temporary Arrow IPC file that every worker memory-maps, so that they are not pickled per task.
+
+    Args:
+        stock_dataframe: The user-queried stock Polars Dataframe
+        max_workers: The number of worker processes, defaults to the number of CPUs
+
+    Returns:
+        The concurrent.futures.ProcessPoolExecutor, which is shut down and has its IPC file removed on exit
+    """
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        stock_ipc_path = os.path.join(temporary_directory, "stock_dataframe.arrow")
+        stock_dataframe.write_ipc(stock_ipc_path)
+
+        # Forking a process with a running Polars thread pool can deadlock, so the workers are spawned
+        with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers or os.cpu_count() or 1,
+                                                    mp_context=multiprocessing.get_context("spawn"),
+                                                    initializer=initialize_sweep_worker,
+                                                    initargs=(stock_ipc_path,)) as executor:
+            yield executor
+
+def parameter_grid_configurations(strategy: backtrader.Strategy,
+                                  strategy_param_grid: dict | None,
+                                  risk_grid: list | None,
+                                  commission_grid: list | None,
+                                  initial_account_balance_grid: list | None) -> list:
+    """
+    Builds every combination of the strategy parameters, sizer risk, commission, and initial account balance.
+
+    Returns:
+        A list of dictionaries with the "strategy", "strategy_params", "initial_account_balance", "commission", and "risk" of a run
+    """
+    strategy_param_grid = strategy_param_grid or {}
+    risk_grid = risk_grid if risk_grid is not None else [0.5]
+    commission_grid = commission_grid if commission_grid is not None else [0]
+    initial_account_balance_grid = initial_account_balance_grid if initial_account_balance_grid is not None else [1000]
+
+    return [{"strategy": strategy,
+             "strategy_params": dict(zip(strategy_param_grid.keys(), strategy_param_values)),
+             "initial_account_balance": initial_account_balance,
+             "commission": commission,
+             "risk": risk}
+            for strategy_param_values in itertools.product(*strategy_param_grid.values())
+            for initial_account_balance in initial_account_balance_grid
+            for commission in commission_grid
+            for risk in risk_grid]
+
+def run_configuration(configuration: dict,
+                      stock_dataframe: pl.DataFrame) -> dict:
+    """
+    Runs a single backtest configuration on the given bars.
+
+    Args:
+        configuration: A dictionary with the "strategy", "strategy_params", "initial_account_balance", "commission", and "risk" of the run
+        stock_dataframe: The stock Polars Dataframe, or a slice of it
+
+    Returns:
+        A dictionary with the configuration values and the metrics of the extract_backtest_metrics function
+    """
+    cerebro = setup_cerebro(stock_dataframe,
+                            configuration["strategy"],
+                            configuration["strategy_params"],
+                            configuration["initial_account_balance"],
+                            configuration["commission"],
+                            configuration["risk"],
+                            sizer_debug=False,
+                            stdstats=False)
+    results = cerebro.run()
+
+    return {**configuration["strategy_params"],
+            "initial_account_balance": configuration["initial_account_balance"],
+            "commission": configuration["commission"],
+            "risk": configuration["risk"],
+            **extract_backtest_metrics(results[0], cerebro)}
+
+def run_sweep_configuration(configuration: dict) -> dict:
+    """ Runs a single configuration of a parameter sweep on the bars of the worker process """
+    return run_configuration(configuration, sweep_worker_stock_dataframe)
+
+# --- Backtrader - Parameter Sweep - Grid search over the strategy, sizer, and broker settings ---
+def parameter_sweep(stock_dataframe: pl.DataFrame,
+                    strategy: backtrader.Strategy = buy_and_hold_strategy,
+                    strategy_param_grid: dict | None = None,
+                    risk_grid: list | None = None,
+                    commission_grid: list | None = None,
+                    initial_account_balance_grid: list | None = None,
+                    max_workers: int | None = None) -> pl.DataFrame:
+    """
+    Backtests every combination of the strategy parameters, sizer risk, commission, and initial account balance within a process pool.
+
+    Args:
+        stock_dataframe: The user-queried stock Polars Dataframe
+        strategy: A backtrader.Strategy class that outlines the strategy to be implemented by the trading algorithm, defined at module level so that it can be pickled
+        strategy_param_grid: A dictionary of the strategy parameter names and the list of values to try for each of them
+        risk_grid: The values of the maximum share of the account balance at risk in a single trade, defaults to [0.5]
+        commission_grid: The values of the percentage commision charged for each performed trade, defaults to [0]
+        initial_account_balance_grid: The values of the amount of initial cash that the trader has access to, defaults to [1000]
+        max_workers: The number of worker processes, defaults to the number of CPUs
+
+    Returns:
+        A Polars DataFrame with a row per combination, holding the strategy parameters, broker settings, and the analyzer outputs
+    """
+    configurations = parameter_grid_configurations(strategy, strategy_param_grid, risk_grid, commission_grid, initial_account_balance_grid)
+
+    max_workers = max_workers or os.cpu_count() or 1
+    # Several configurations per task, as a single backtest on few bars is cheaper than the inter-process round trip
+    chunksize = max(1, len(configurations) // (max_workers * 4))
+
+    with sweep_process_pool(stock_dataframe, max_workers) as executor:
+        sweep_results = list(executor.map(run_sweep_configuration, configurations, chunksize=chunksize))
+
+    return pl.DataFrame(sweep_results, infer_schema_length=None)
+
+# --- Backtrader - Walk-Forward - Train and test windows over the bars ---
+def walk_forward_windows(number_of_bars: int,
+                         train_size: int,
+                         test_size: int,
+                         step: int | None = None,
+                         anchored: bool = False) -> list:
+    """
+    Splits the bars into consecutive train and test windows, where every test window directly follows its train window.
+
+    Args:
+        number_of_bars: The amount of bars within the stock Polars DataFrame
+        train_size: The amount of bars within a train window, or within the first train window if anchored
+        test_size: The amount of bars within a test window
+        step: The amount of bars between the starts of two consecutive windows, defaults to the test size so that the test windows do not overlap
+        anchored: Setting for whether every train window starts at the first bar and grows, instead of rolling forward with a fixed size
+
+    Returns:
+        A list of dictionaries with the "train_offset", "train_length", "test_offset", and "test_length" of every window
+    """
+    step = step or test_size
+    windows = []
+    window_start = 0
+    while window_start + train_size + test_size <= number_of_bars:
+        train_offset = 0 if anchored else window_start
+        windows.append({"train_offset": train_offset,
+                        "train_length": window_start + train_size - train_offset,
+                        "test_offset": window_start + train_size,
+                        "test_length": test_size})
+        window_start += step
+
+    return windows
+
+def run_walk_forward_window(window_task: dict) -> dict:
+    """
+    Optimizes the configurations on the train window of the worker bars, and backtests the best one on the test window.
+    The windows are zero-copy slices of the memory-mapped bars.
+
+    Args:
+        window_task: A dictionary with the window bounds of the walk_forward_windows function, the "configurations" to optimize over, and the "optimization_metric"
+
+    Returns:
+        A dictionary with the window bounds, the best configuration, its in-sample metric, and its out-of-sample metrics
+    """
+    train_dataframe = sweep_worker_stock_dataframe.slice(window_task["train_offset"], window_task["train_length"])
+    test_dataframe = sweep_worker_stock_dataframe.slice(window_task["test_offset"], window_task["test_length"])
+    optimization_metric = window_task["optimization_metric"]
+
+    # A metric without a value (e.g., a Sharpe Ratio without any variation in the returns) never wins the optimization
+    best_configuration, best_metric = None, None
+    for configuration in window_task["configurations"]:
+        in_sample_metric = run_configuration(configuration, train_dataframe)[optimization_metric]
+        if in_sample_metric is not None and (best_metric is None or in_sample_metric > best_metric):
+            best_configuration, best_metric = configuration, in_sample_metric
+
+    best_configuration = best_configuration or window_task["configurations"][0]
+    out_of_sample_results = run_configuration(best_configuration, test_dataframe)
+
+    return {"train_start": train_dataframe["timestamp"][0],
+            "train_end": train_dataframe["timestamp"][-1],
+            "test_start": test_dataframe["timestamp"][0],
+            "test_end": test_dataframe["timestamp"][-1],
+            "test_days": test_dataframe["timestamp"].dt.date().n_unique(),
+            f"in_sample_{optimization_metric}": best_metric,
+            **out_of_sample_results}
+
+# --- Backtrader - Walk-Forward - Out-of-sample evaluation of a parameter optimization ---
+def walk_forward_backtest(stock_dataframe: pl.DataFrame,
+                          train_size: int,
+                          test_size: int,
+                          strategy: backtrader.Strategy = buy_and_hold_strategy,
+                          strategy_param_grid: dict | None = None,
+                          risk_grid: list | None = None,
+                          step: int | None = None,
+                          anchored: bool = False,
+                          optimization_metric: str = "sharperatio",
+                          initial_account_balance: int = 1000,
+                          commission: float = 0,
+                          max_workers: int | None = None) -> dict:
+    """
+    Walk-forward backtest: for every window, the strategy parameters and sizer risk are optimized on the train bars, and the best configuration is backtested on the following test bars.
+    The windows run independently within the process pool of the sweep_process_pool function, on zero-copy slices of the memory-mapped bars.
+
+    Args:
+        stock_dataframe: The user-queried stock Polars Dataframe
+        train_size: The amount of bars within a train window, or within the first train window if anchored
+        test_size: The amount of bars within a test window
+        strategy: A backtrader.Strategy class that outlines the strategy to be implemented by the trading algorithm, defined at module level so that it can be pickled
+        strategy_param_grid: A dictionary of the strategy parameter names and the list of values to try for each of them
+        risk_grid: The values of the maximum share of the account balance at risk in a single trade, defaults to [0.5]
+        step: The amount of bars between the starts of two consecutive windows, defaults to the test size. At least the test size, so that the test windows do not overlap
+        anchored: Setting for whether every train window starts at the first bar and grows, instead of rolling forward with a fixed size
+        optimization_metric: The metric of the extract_backtest_metrics function that is maximized on the train bars
+        initial_account_balance: The amount of initial cash that the trader has access to at the start of every window
+        commission: The percentage commision charged for each performed trade represented in a float datatype
+        max_workers: The number of worker processes, defaults to the number of CPUs
+
+    Returns:
+        A dictionary with a Polars DataFrame of every window within "windows", and the aggregated out-of-sample metrics:
+        "rtot" as the sum of the log returns of the test windows, "ravg" per day over all test windows, and the mean "sharperatio" and "vwr" of the windows
+
+    Raises:
+        ValueError: If the step is smaller than the test size, as overlapping test windows would count the same bars more than once within "rtot",
+                    or if the stock data holds fewer bars than a single train and test window
+    """
+    if step is not None and step < test_size:
+        raise ValueError(f"The step of {step} bars is smaller than the test size of {test_size} bars, which overlaps the test windows")
+
+    configurations = parameter_grid_configurations(strategy, strategy_param_grid, risk_grid, [commission], [initial_account_balance])
+    window_tasks = [{**window, "configurations": configurations, "optimization_metric": optimization_metric}
+                    for window in walk_forward_windows(stock_dataframe.height, train_size, test_size, step, anchored)]
+    if len(window_tasks) == 0:
+        raise ValueError("The stock data holds fewer bars than a single train and test window")
+
+    with sweep_process_pool(stock_dataframe, max_workers) as executor:
+        window_results = pl.DataFrame(list(executor.map(run_walk_forward_window, window_tasks)), infer_schema_length=None)
+
+    # The test windows never overlap, so they chain into a single out-of-sample period
+    total_log_return = window_results["rtot"].sum()
+
+    return {"windows": window_results,
+            "rtot": total_log_return,
+            "ravg": total_log_return / window_results["test_days"].sum(),
+            "sharperatio": window_results["sharperatio"].mean(),
+            "vwr": window_results["vwr"].mean()}
+
+# --- Vectorized Backtest - Signals - Signal expressions for the strategies above ---
+def buy_and_hold_signal_expression() -> pl.Expr:
+    """
+    Signal of the buy_and_hold_strategy class: be in the market from the earliest possible time period onwards.
+
+    Returns:
+        A boolean Polars expression that is true for every bar
+    """
+    return pl.lit(True).alias("signal")
+
+# --- Vectorized Backtest - Sizers - Array versions of the stake sizing in the Backtrader classes above ---
+def maximum_trade_stake_size(cash: float,
+                             price: float,
+                             commission: float,
+                             risk: float) -> int:
+    """ Size of the buy_and_hold_strategy class: as much of the stock as the account balance can buy at the signal close """
+    return int(cash / price)
+
+def variablesizer_max_risk_size(cash: float,
+                                price: float,
+                                commission: float,
+                                risk: float) -> int:
+    """ Size of the variablesizer_max_risk class for a buy with a percentage commission, at the signal close """
+    maximum_risk_stake = math.floor(cash * risk)
+    com_adj_price = price * (1 + (commission * 2))
+
+    return max(math.floor(maximum_risk_stake / com_adj_price), 0)
+
+VECTORIZED_SIZERS = {"maximum_trade_stake": maximum_trade_stake_size,
+                     "variablesizer_max_risk": variablesizer_max_risk_size}
+
+# --- Vectorized Backtest - Engine - Positions, fills, and account value as array operations ---
+def vectorized_backtest_arrays(open_prices: np.ndarray,
+                               close_prices: np.ndarray,
+                               signals: np.ndarray,
+                               sizer: str = "maximum_trade_stake",
+                               initial_account_balance: float = 1000,
+                               commission: float = 0,
+                               risk: float = 0.5) -> dict:
+    """
+    Backtests a long-only signal on NumPy arrays, following the execution rules of the Backtrader broker:
+    an order is placed at the close of the bar where the signal switches, and is filled at the open of the next bar with a percentage commission.
+    A buy is rejected (a margin call) if its cost and commission exceed the account balance, either at the close of the signal bar or at the open of the fill bar.
+    Only the trades are iterated over, as the account balance at an entry depends on the previous trades. Every per-bar value is an array operation.
+
+    Args:
+        open_prices: The open price of every bar
+        close_prices: The close price of every bar
+        signals: A boolean array that is true for the bars where the strategy wants to hold the stock
+        sizer: The key of the stake sizing within VECTORIZED_SIZERS
+        initial_account_balance: The amount of initial cash that the trader has access to
+        commission: The percentage commision charged for each performed trade represented in a float datatype
+        risk: The maximum share of the account balance at risk in a single trade, used by the variablesizer_max_risk sizing
+
+    Returns:
+        A dictionary with the cash, position, and account value of every bar within "cash", "position", and "value",
+        and the filled trades within "trades", a dictionary of arrays with a value per trade
+    """
+    number_of_bars = len(close_prices)
+    signals = np.asarray(signals, dtype=bool)
+    previous_signals = np.concatenate(([False], signals[:-1]))
+    entry_signal_indices = np.flatnonzero(signals & ~previous_signals)
+    exit_signal_indices = np.flatnonzero(~signals & previous_signals)
+    size_stake = VECTORIZED_SIZERS[sizer]
+
+    # Account balance and position after every fill, applied from the fill bar onwards
+    fill_indices = []
+    cash_levels = [float(initial_account_balance)]
+    position_levels = [0]
+    trades = {"entry_index": [], "exit_index": [], "size": [], "entry_price": [], "exit_price": [], "commission": [], "pnl": [], "pnlcomm": []}
+    cash = float(initial_account_balance)
+    for trade_number, entry_signal_index in enumerate(entry_signal_indices):
+        entry_index = entry_signal_index + 1
+        if entry_index >= number_of_bars:
+            break
+
+        size = size_stake(cash, close_prices[entry_signal_index], commission, risk)
+        if size <= 0:
+            continue
+
+        # Margin checks - on submission at the signal close, and on execution at the fill open
+        entry_price = open_prices[entry_index]
+        if cash - size * close_prices[entry_signal_index] - size * commission * close_prices[entry_signal_index] < 0.0:
+            continue
+        if cash - size * entry_price - size * commission * entry_price < 0.0:
+            continue
+
+        entry_commission = size * commission * entry_price
+        cash = cash - size * entry_price - entry_commission
+        fill_indices.append(entry_index)
+        cash_levels.append(cash)
+        position_levels.append(size)
+
+        exit_index = exit_signal_indices[trade_number] + 1 if trade_number < len(exit_signal_indices) else number_of_bars
+        if exit_index >= number_of_bars:
+            # The position is still open at the last bar
+            trades["entry_index"].append(entry_index)
+            trades["exit_index"].append(-1)
+            trades["size"].append(size)
+            trades["entry_price"].append(entry_price)
+            trades["exit_price"].append(np.nan)
+            trades["commission"].append(entry_commission)
+            trades["pnl"].append(np.nan)
+            trades["pnlcomm"].append(np.nan)
+            break
+
+        exit_price = open_prices[exit_index]
+        pnl = size * (exit_price - entry_price)
+        exit_commission = size * commission * exit_price
+        cash = cash + size * entry_price + pnl - exit_commission
+        fill_indices.append(exit_index)
+        cash_levels.append(cash)
+        position_levels.append(0)
+
+        trades["entry_index"].append(entry_index)
+        trades["exit_index"].append(exit_index)
+        trades["size"].append(size)
+        trades["entry_price"].append(entry_price)
+        trades["exit_price"].append(exit_price)
+        trades["commission"].append(entry_commission + exit_commission)
+        trades["pnl"].append(pnl)
+        trades["pnlcomm"].append(pnl - entry_commission - exit_commission)
+
+    # Every bar takes the levels of the latest fill at or before it
+    level_indices = np.searchsorted(np.asarray(fill_indices, dtype=np.int64), np.arange(number_of_bars), side="right")
+    cash_per_bar = np.asarray(cash_levels)[level_indices]
+    position_per_bar = np.asarray(position_levels, dtype=np.int64)[level_indices]
+
+    return {"cash": cash_per_bar,
+            "position": position_per_bar,
+            "value": cash_per_bar + position_per_bar * close_prices,
+            "trades": trades}
+
+# --- Vectorized Backtest - Metrics - Array versions of the Returns, SharpeRatio, and VWR analyzers ---
+def vectorized_returns_metrics(values: np.ndarray,
+                               day_keys: np.ndarray,
+                               initial_account_balance: float,
+                               tann: float = 365) -> dict:
+    """
+    Computes the metrics of the backtrader.analyzers.Returns analyzer with a daily timeframe.
+
+    Args:
+        values: The account value at the close of every bar
+        day_keys: An integer key of the calendar day of every bar, in ascending order
+        initial_account_balance: The amount of initial cash that the trader has access to
+        tann: The number of periods used for the annualization of the average return
+
+    Returns:
+        A dictionary with the total compound return "rtot", the average daily return "ravg", and the annualized return "rnorm" and "rnorm100"
+    """
+    number_of_days = 1 + int(np.count_nonzero(day_keys[1:] > day_keys[:-1]))
+    total_return_ratio = values[-1] / initial_account_balance
+    rtot = math.log(total_return_ratio) if total_return_ratio >= 0.0 else float("-inf")
+    ravg = rtot / number_of_days
+    rnorm = math.expm1(ravg * tann) if ravg > float("-inf") else ravg
+
+    return {"rtot": rtot,
+            "ravg": ravg,
+            "rnorm": rnorm,
+            "rnorm100": rnorm * 100.0}
+
+def vectorized_sharpe_ratio(values: np.ndarray,
+                            day_keys: np.ndarray,
+                            initial_account_balance: float,
+                            riskfreerate: float = 0.01,
+                            factor: float = 365) -> float | None:
+    """
+    Computes the annualized ratio of the backtrader.analyzers.SharpeRatio analyzer with a daily timeframe.
+    The daily returns are taken between the account values at the last bar of consecutive days, and the annual risk free rate is converted to a daily rate.
+
+    Args:
+        values: The account value at the close of every bar
+        day_keys: An integer key of the calendar day of every bar, in ascending order
+        initial_account_balance: The amount of initial cash that the trader has access to
+        riskfreerate: The annual risk free rate
+        factor: The number of days within a year
+
+    Returns:
+        The annualized Sharpe Ratio, or None if the daily returns do not vary
+    """
+    last_bar_of_day = np.concatenate((day_keys[1:] != day_keys[:-1], [True]))
+    day_end_values = values[last_bar_of_day]
+    daily_returns = day_end_values / np.concatenate(([initial_account_balance], day_end_values[:-1])) - 1.0
+
+    daily_riskfreerate = pow(1.0 + riskfreerate, 1.0 / factor) - 1.0
+    excess_returns = daily_returns - daily_riskfreerate
+    if np.ptp(excess_returns) == 0.0:
+        return None
+
+    return float(math.sqrt(factor) * excess_returns.mean() / excess_returns.std())
+
+def vectorized_variability_weighted_return(values: np.ndarray,
+                                           day_keys: np.ndarray,
+                                           initial_account_balance: float,
+                                           ravg: float,
+                                           rnorm100: float,
+                                           tau: float = 0.20,
+                                           sdev_max: float = 2.0) -> float:
+    """
+    Computes the backtrader.analyzers.VWR analyzer with a daily timeframe.
+    Every day is a period that starts at the account value of its first bar, and ends at the account value of the first bar of the next day.
+
+    Args:
+        values: The account value at the close of every bar
+        day_keys: An integer key of the calendar day of every bar, in ascending order
+        initial_account_balance: The amount of initial cash that the trader has access to
+        ravg: The average daily return of the vectorized_returns_metrics function
+        rnorm100: The annualized return in percent of the vectorized_returns_metrics function
+        tau: The factor of the variability penalty
+        sdev_max: The maximum standard deviation of the deviations from the average return
+
+    Returns:
+        The Variability-Weighted Return (in %)
+    """
+    period_start_indices = np.concatenate(([0], np.flatnonzero(day_keys[1:] > day_keys[:-1]) + 1))
+    period_start_values = np.concatenate(([initial_account_balance], values[period_start_indices]))
+    period_end_values = np.concatenate((values[period_start_indices], [values[-1]]))
+
+    # A period whose first bar is the last bar has no end value yet
+    if period_start_indices[-1] == len(values) - 1:
+        period_start_values = period_start_values[:-1]
+        period_end_values = period_end_values[:-1]
+
+    deviations = period_end_values / (period_start_values * np.exp(ravg * np.arange(1, len(period_end_values) + 1))) - 1.0
+    sdev_p = deviations.std(ddof=1) if len(deviations) > 1 else 0.0
+
+    return float(rnorm100 * (1.0 - pow(sdev_p / sdev_max, tau)))
+
+# --- Vectorized Backtest - Runner - Signal backtest of a stock Polars DataFrame ---
+def vectorized_backtest(stock_dataframe: pl.DataFrame,
+                        signal_expression: pl.Expr = buy_and_hold_signal_expression(),
+                        sizer: str = "maximum_trade_stake",
+                        initial_account_balance: int = 1000,
+                        commission: float = 0,
+                        risk: float = 0.5,
+                        riskfreerate: float = 0.01,
+                        tann: float = 365) -> dict:
+    """
+    Vectorized counterpart of the buy_and_hold_stock_trader_init function, for simple long-only signal strategies.
+    Reproduces the fills, account value, and the Returns, SharpeRatio, and VWR analyzers of the Cerebro engine with a daily timeframe,
+    without iterating over the bars in Python. Fast enough to be used as the inner loop of a parameter optimizer.
+
+    Args:
+        stock_dataframe: The user-queried stock Polars Dataframe
+        signal_expression: A boolean Polars expression over the stock columns that is true for the bars where the strategy wants to hold the stock, nulls are read as false
+        sizer: The key of the stake sizing within VECTORIZED_SIZERS, "maximum_trade_stake" for the buy_and_hold_strategy, "variablesizer_max_risk" for the sizer
+        initial_account_balance: The amount of initial cash that the trader has access to in an integer datatype
+        commission: The percentage commision charged for each performed trade represented in a float datatype
+        risk: The maximum share of the account balance at risk in a single trade, used by the variablesizer_max_risk sizing
+        riskfreerate: The annual risk free rate of the Sharpe Ratio
+        tann: The number of days used for the annualization of the returns and the Sharpe Ratio
+
+    Returns:
+        A dictionary with the account value of every bar within "equity_curve", the filled trades within "trades", both as Polars DataFrames,
+        and the "rtot", "ravg", "rnorm", "rnorm100", "sharperatio", "vwr", and "final_value" metrics
+    """
+    backtest_columns = stock_dataframe.select([pl.col("timestamp"),
+                                               pl.col("timestamp").dt.date().cast(pl.Int32).alias("day_key"),
+                                               pl.col("open").cast(pl.Float64),
+                                               pl.col("close").cast(pl.Float64),
+                                               signal_expression.fill_null(False).cast(pl.Boolean).alias("signal")])
+    close_prices = backtest_columns["close"].to_numpy()
+    day_keys = backtest_columns["day_key"].to_numpy()
+
+    backtest = vectorized_backtest_arrays(backtest_columns["open"].to_numpy(),
+                                          close_prices,
+                                          backtest_columns["signal"].to_numpy(),
+                                          sizer,
+                                          initial_account_balance,
+                                          commission,
+                                          risk)
+
+    metrics = vectorized_returns_metrics(backtest["value"], day_keys, initial_account_balance, tann)
+    metrics["sharperatio"] = vectorized_sharpe_ratio(backtest["value"], day_keys, initial_account_balance, riskfreerate, tann)
+    metrics["vwr"] = vectorized_variability_weighted_return(backtest["value"], day_keys, initial_account_balance, metrics["ravg"], metrics["rnorm100"])
+    metrics["final_value"] = float(backtest["value"][-1])
+
+    timestamps = backtest_columns["timestamp"]
+    trades = pl.DataFrame(backtest["trades"], schema={"entry_index": pl.Int64, "exit_index": pl.Int64, "size": pl.Int64, "entry_price": pl.Float64,
+                                                      "exit_price": pl.Float64, "commission": pl.Float64, "pnl": pl.Float64, "pnlcomm": pl.Float64})
+    trades = trades.with_columns([timestamps.gather(trades["entry_index"]).alias("entry_timestamp"),
+                                  pl.when(pl.col("exit_index") >= 0)
+                                    .then(timestamps.gather(trades["exit_index"].clip(lower_bound=0)))
+                                    .alias("exit_timestamp")]) \
+                   .drop(["entry_index", "exit_index"])
+
+    return {"equity_curve": pl.DataFrame({"timestamp": timestamps,
+                                          "cash": backtest["cash"],
+                                          "position": backtest["position"],
+                                          "value": backtest["value"]}),
+            "trades": trades,
+            **metrics}
@@ -0,0 +1,594 @@
+# --- Imports ---
+# Core
+import os
+import sys
+import json
+import time
+import queue
+import argparse
+import datetime
+import resource
+import tempfile
+import subprocess
+import multiprocessing
+import concurrent.futures
+import numpy as np
+import polars as pl
+
+# Langchain
+from langchain_core.messages import AIMessage, HumanMessage
+
+# Functions
+import API_Functions, Transformation_Functions, Technical_Indicators_Functions, Backtrading_Functions, LLM_Functions
+
+# --- Synthetic Data - Generator - Polygon-shaped aggregate bars with Geometric Brownian Motion prices ---
+def generate_synthetic_aggregate_bars(timestamps: np.ndarray,
+                                      start_price: float = 100.0,
+                                      drift: float = 0.05,
+                                      volatility: float = 0.2,
+                                      bar_interval_ms: int = 60000,
+                                      seed: int = 42) -> pl.DataFrame:
+    """
+    Generates the bars of a synthetic stock in the raw Polygon aggregate bars columns.
+    The close prices follow a Geometric Brownian Motion, and the open, high, low, volume, and transaction values are derived from it.
+
+    Args:
+        timestamps: The millisecond timestamps of the bars, in ascending order
+        start_price: The price of the synthetic stock at the first bar
+        drift: The annualized drift of the Geometric Brownian Motion
+        volatility: The annualized volatility of the Geometric Brownian Motion
+        bar_interval_ms: The time between two consecutive bars in milliseconds
+        seed: The seed of the random number generator, for reproducible bars
+
+    Returns:
+        A Polars DataFrame with the "v", "vw", "o", "c", "h", "l", "t", and "n" columns, in the column order of the API
+    """
+    number_of_bars = len(timestamps)
+    random_generator = np.random.default_rng(seed)
+
+    # Time step as a fraction of a (trading) year, for the drift and volatility scaling
+    dt = bar_interval_ms / (252 * 6.5 * 3600 * 1000)
+    log_returns = (drift - 0.5 * volatility ** 2) * dt + volatility * np.sqrt(dt) * random_generator.standard_normal(number_of_bars)
+    close = start_price * np.exp(np.cumsum(log_returns))
+    open = np.concatenate([[start_price], close[:-1]])[:number_of_bars]
+    spread = np.abs(random_generator.standard_normal(number_of_bars)) * volatility * np.sqrt(dt) * close
+
+    return pl.DataFrame({"v": random_generator.integers(1000, 100000, number_of_bars).astype(np.float64),
+                         "vw": np.round((open + close) / 2, 4),
+                         "o": np.round(open, 4),
+                         "c": np.round(close, 4),
+                         "h": np.round(np.maximum(open, close) + spread, 4),
+                         "l": np.round(np.minimum(open, close) - spread, 4),
+                         "t": np.asarray(timestamps, dtype=np.int64),
+                         "n": random_generator.integers(10, 1000, number_of_bars)})
+
+def serialize_aggregate_bars_payload(bars_dataframe: pl.DataFrame,
+                                     metadata: dict) -> bytes:
+    """
+    Serializes bars into the raw bytes of an Aggregate (Bars) API response.
+    The bars are serialized by Polars, and only the small metadata wrapper by the json module.
+
+    Args:
+        bars_dataframe: A Polars DataFrame in the raw Polygon aggregate bars columns
+        metadata: The response metadata, e.g., ticker, status, and next_url
+
+    Returns:
+        The payload in JSON format as bytes, with the bars being stored within a JSON object called "results"
+    """
+    return json.dumps(metadata)[:-1].encode() + b', "results": ' + bars_dataframe.write_json().encode() + b"}"
+
+# --- Synthetic Data - Generator - Polygon-shaped Aggregate (Bars) API payload with Geometric Brownian Motion prices ---
+def generate_synthetic_aggregate_bars_payload(number_of_bars: int = 50000,
+                                              symbol: str = "SYNTH",
+                                              start_price: float = 100.0,
+                                              drift: float = 0.05,
+                                              volatility: float = 0.2,
+                                              bar_interval_ms: int = 60000,
+                                              seed: int = 42) -> bytes:
+    """
+    Generates the raw bytes of an Aggregate (Bars) API response for a synthetic stock, through the generate_synthetic_aggregate_bars function.
+
+    Args:
+        number_of_bars: The amount of bars within the payload
+        symbol: The ticker symbol of the synthetic stock
+        start_price: The price of the synthetic stock at the first bar
+        drift: The annualized drift of the Geometric Brownian Motion
+        volatility: The annualized volatility of the Geometric Brownian Motion
+        bar_interval_ms: The time between two consecutive bars in milliseconds
+        seed: The seed of the random number generator, for reproducible payloads
+
+    Returns:
+        The payload in JSON format as bytes, with the bars being stored within a JSON object called "results"
+    """
+    timestamps = 1704205800000 + np.arange(number_of_bars, dtype=np.int64) * bar_interval_ms
+    pl_synthetic_bars = generate_synthetic_aggregate_bars(timestamps, start_price, drift, volatility, bar_interval_ms, seed)
+
+    return serialize_aggregate_bars_payload(pl_synthetic_bars, {"ticker": symbol,
+                                                                "queryCount": number_of_bars,
+                                                                "resultsCount": number_of_bars,
+                                                                "adjusted": True,
+                                                                "status": "OK",
+                                                                "request_id": "synthetic"})
+
+# --- Benchmark - Decoding - Methods under comparison ---
+def decode_with_python_objects(content: bytes) -> pl.DataFrame:
+    """ Previous decoding path: the json module builds one dictionary per bar, which is then handed to the DataFrame constructor """
+    return pl.DataFrame(json.loads(content)["results"], schema=API_Functions.POLYGON_AGGREGATE_BARS_SCHEMA)
+
+def decode_with_polars_reader(content: bytes) -> pl.DataFrame:
+    """ Current decoding path: the Polars NDJSON reader parses the raw bytes straight into Arrow columns """
+    return API_Functions.decode_aggregate_bars_response(content)["results"]
+
+DECODING_METHODS = {"python_objects": decode_with_python_objects,
+                    "polars_reader": decode_with_polars_reader}
+
+# --- Benchmark - Measurement - Peak resident set size (RSS) of the current process ---
+def reset_peak_rss() -> bool:
+    """
+    Resets the peak RSS of the current process to its current RSS, so that memory freed after the imports is not hiding the peak of the measured code.
+    Only supported on Linux.
+
+    Returns:
+        Whether the peak RSS could be reset
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as clear_refs_file:
+            clear_refs_file.write("5")
+        return True
+    except OSError:
+        return False
+
+def read_peak_rss() -> int:
+    """
+    Reads the peak RSS of the current process in bytes.
+
+    Returns:
+        The peak RSS in bytes
+    """
+    if os.path.exists("/proc/self/status"):
+        with open("/proc/self/status", "r") as status_file:
+            for line in status_file:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+
+    # ru_maxrss is reported in kilobytes on Linux, and in bytes on macOS
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+
+# --- Benchmark - Measurement - Wall time and peak RSS of a single method in a fresh process ---
+def measure_in_subprocess(method_name: str,
+                          payload_path: str,
+                          repeats: int,
+                          results_queue: multiprocessing.Queue):
+    """
+    Runs a decoding method in a fresh process, so that the peak resident set size (RSS) of one method never hides the other.
+    The payload is read from disk as bytes before the baseline RSS is taken.
+
+    Args:
+        method_name: The key of the method within DECODING_METHODS
+        payload_path: The path of the file holding the payload bytes
+        repeats: The amount of times the method is timed, the fastest run is reported
+        results_queue: The queue receiving the measurements
+    """
+    with open(payload_path, "rb") as payload_file:
+        content = payload_file.read()
+
+    reset_peak_rss()
+    baseline_rss = read_peak_rss()
+
+    wall_times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        decoded_bars = DECODING_METHODS[method_name](content)
+        wall_times.append(time.perf_counter() - start)
+        del decoded_bars
+
+    peak_rss = read_peak_rss()
+    results_queue.put({"method": method_name,
+                       "wall_time_seconds": min(wall_times),
+                       "peak_rss_increase_mb": (peak_rss - baseline_rss) / 2 ** 20})
+
+def wait_for_subprocess_result(process: multiprocessing.Process,
+                               results_queue: multiprocessing.Queue,
+                               timeout_seconds: float) -> tuple:
+    """
+    Waits for the measurements of a measuring process, without blocking forever if the process dies before sending them, e.g., when it is killed for running out of memory.
+    The process is terminated once the timeout has passed, and joined in every case.
+
+    Args:
+        process: The started measuring process
+        results_queue: The queue the process sends its measurements to
+        timeout_seconds: The maximum time to wait for the measurements
+
+    Returns:
+        A tuple of the dictionary of measurements and None, or of None and the reason of the failure
+    """
+    deadline = time.monotonic() + timeout_seconds
+    result, error = None, None
+    while result is None and error is None:
+        try:
+            result = results_queue.get(timeout=1)
+        except queue.Empty:
+            if not process.is_alive():
+                # The measurements may have arrived right before the process exited
+                try:
+                    result = results_queue.get(timeout=1)
+                except queue.Empty:
+                    error = f"exited with code {process.exitcode}"
+            elif time.monotonic() >= deadline:
+                process.terminate()
+                error = f"timed out after {timeout_seconds:g}s"
+
+    process.join()
+    return result, error
+
+def benchmark_aggregate_bars_decoding(number_of_bars: int = 50000,
+                                      repeats: int = 5,
+                                      timeout_seconds: float = 3600) -> pl.DataFrame:
+    """
+    Compares the previous and the current decoding paths of an Aggregate (Bars) API response on a synthetic payload.
+
+    Args:
+        number_of_bars: The amount of bars within the synthetic payload
+        repeats: The amount of times every method is timed, the fastest run is reported
+        timeout_seconds: The maximum time of the measuring process of a single method
+
+    Returns:
+        A Polars DataFrame with the wall time and the peak RSS increase of every method, which are null alongside an error for a method whose process failed
+    """
+    content = generate_synthetic_aggregate_bars_payload(number_of_bars)
+
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        payload_path = os.path.join(temporary_directory, "payload.json")
+        with open(payload_path, "wb") as payload_file:
+            payload_file.write(content)
+
+        spawn_context = multiprocessing.get_context("spawn")
+        results_queue = spawn_context.Queue()
+        measurements = []
+        for method_name in DECODING_METHODS:
+            process = spawn_context.Process(target=measure_in_subprocess, args=(method_name, payload_path, repeats, results_queue))
+            process.start()
+            result, error = wait_for_subprocess_result(process, results_queue, timeout_seconds)
+            measurements.append({"method": method_name, "wall_time_seconds": None, "peak_rss_increase_mb": None, **(result or {}), "error": error})
+
+    return pl.DataFrame(measurements, schema={"method": pl.String,
+                                              "wall_time_seconds": pl.Float64,
+                                              "peak_rss_increase_mb": pl.Float64,
+                                              "error": pl.String}).with_columns(pl.lit(number_of_bars).alias("number_of_bars"),
+                                                   pl.lit(len(content) / 2 ** 20).alias("payload_mb"))
+
+# --- Benchmark - Suite - Stages of the hot paths, each timed on the output of the stage before it ---
+def run_decode_stage(payloads: list) -> list:
+    """ Decodes every Aggregate (Bars) API payload """
+    return [API_Functions.decode_aggregate_bars_response(payload) for payload in payloads]
+
+def run_transform_stage(json_data_per_ticker: list) -> list:
+    """ Transforms the decoded bars of every ticker, including the default technical indicators """
+    return [Transformation_Functions.transform_aggregate_bars_to_dataframe(json_data["ticker"], json_data["results"]) for json_data in json_data_per_ticker]
+
+def run_indicators_stage(stock_dataframes: list) -> list:
+    """ Computes the full modelling set of technical indicators for every ticker """
+    return [Technical_Indicators_Functions.compute_technical_indicators(stock_dataframe, Technical_Indicators_Functions.MODELLING_TECHNICAL_INDICATORS)
+            for stock_dataframe in stock_dataframes]
+
+def run_chart_stage(stock_dataframes: list) -> list:
+    """ Builds and serializes the candlestick figure of every ticker, as Streamlit does before sending it to the browser """
+    return [Transformation_Functions.candlestick_plotly_graph(stock_dataframe).to_json() for stock_dataframe in stock_dataframes]
+
+def run_vectorized_backtest_stage(stock_dataframes: list) -> list:
+    """ Backtests a moving average signal on every ticker with the vectorized engine """
+    return [Backtrading_Functions.vectorized_backtest(stock_dataframe, pl.col("close") > pl.col("ti_simple_moving_average_over_20_period"))
+            for stock_dataframe in stock_dataframes]
+
+def run_cerebro_backtest_stage(stock_dataframes: list) -> list:
+    """ Backtests the buy and hold strategy on every ticker with the Cerebro engine """
+    return [Backtrading_Functions.setup_cerebro(stock_dataframe, stdstats=False).run() for stock_dataframe in stock_dataframes]
+
+def run_portfolio_alignment_stage(stock_dataframes: list) -> dict:
+    """ Aligns every ticker on a common timestamp index for a portfolio backtest """
+    return Backtrading_Functions.align_stock_dataframes(pl.concat(stock_dataframes))
+
+# Stage name: (name of the stage whose output is the input, stage function)
+BENCHMARK_STAGES = {"decode": ("payloads", run_decode_stage),
+                    "transform": ("decode", run_transform_stage),
+                    "indicators": ("transform", run_indicators_stage),
+                    "chart": ("transform", run_chart_stage),
+                    "vectorized_backtest": ("transform", run_vectorized_backtest_stage),
+                    "cerebro_backtest": ("transform", run_cerebro_backtest_stage),
+                    "portfolio_alignment": ("transform", run_portfolio_alignment_stage)}
+
+def benchmark_stage_input(stage_name: str,
+                          payloads: list):
+    """
+    Builds the input of a stage by running the chain of stages before it, without timing them.
+
+    Args:
+        stage_name: The key of the stage within BENCHMARK_STAGES
+        payloads: The raw bytes of the payload of every ticker
+
+    Returns:
+        The output of the stage before it, or the payloads for the first stage
+    """
+    input_stage_name = BENCHMARK_STAGES[stage_name][0]
+    if input_stage_name == "payloads":
+        return payloads
+
+    return BENCHMARK_STAGES[input_stage_name][1](benchmark_stage_input(input_stage_name, payloads))
+
+def measure_stage_in_subprocess(stage_name: str,
+                                payload_paths: list,
+                                repeats: int,
+                                results_queue: multiprocessing.Queue):
+    """
+    Runs a stage of the suite in a fresh process, so that the peak resident set size (RSS) of one stage never hides another.
+    The input of the stage is built before the baseline RSS is taken, so only the memory of the stage itself is measured.
+
+    Args:
+        stage_name: The key of the stage within BENCHMARK_STAGES
+        payload_paths: The paths of the files holding the payload bytes of every ticker
+        repeats: The amount of times the stage is timed, the fastest run is reported
+        results_queue: The queue receiving the measurements
+    """
+    payloads = []
+    for payload_path in payload_paths:
+        with open(payload_path, "rb") as payload_file:
+            payloads.append(payload_file.read())
+    stage_input = benchmark_stage_input(stage_name, payloads)
+    del payloads
+
+    reset_peak_rss()
+    baseline_rss = read_peak_rss()
+
+    wall_times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        stage_output = BENCHMARK_STAGES[stage_name][1](stage_input)
+        wall_times.append(time.perf_counter() - start)
+        del stage_output
+
+    peak_rss = read_peak_rss()
+    results_queue.put({"stage": stage_name,
+                       "wall_time_seconds": min(wall_times),
+                       "peak_rss_increase_mb": (peak_rss - baseline_rss) / 2 ** 20})
+
+def current_git_commit() -> str | None:
+    """ Returns the short hash of the checked out commit, or None outside of a git repository """
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+# --- Benchmark - Suite - Every stage over synthetic tickers of several sizes, appended to a results file ---
+def benchmark_suite(number_of_bars_list: list = [1000, 100000, 1000000],
+                    number_of_tickers: int = 1,
+                    stages: list = None,
+                    repeats: int = 3,
+                    cerebro_max_bars: int = 200000,
+                    results_path: str = "benchmark_results.csv",
+                    stage_timeout_seconds: float = 3600) -> pl.DataFrame:
+    """
+    Times the decoding, transformation, indicator, chart, and backtest hot paths offline on synthetic Polygon-shaped payloads.
+    Every stage runs in a fresh process for every size, and its wall time and peak RSS increase are appended to the results file, so that runs of different commits can be compared.
+
+    Args:
+        number_of_bars_list: The amounts of bars per ticker to benchmark, e.g., from 1,000 to 10,000,000
+        number_of_tickers: The amount of synthetic tickers, each with its own seed
+        stages: The keys of the stages within BENCHMARK_STAGES to run, all stages if not specified
+        repeats: The amount of times every stage is timed, the fastest run is reported
+        cerebro_max_bars: The maximum amount of bars over all tickers for the cerebro_backtest stage, which iterates over the bars in Python
+        results_path: The path of the CSV results file, which is created if it does not exist. Nothing is written if set to None
+        stage_timeout_seconds: The maximum time of the process of a single stage and size, after which it is terminated
+
+    Returns:
+        A Polars DataFrame with the measurements of this run.
+        A stage whose process died or timed out, e.g., when killed for running out of memory at the largest sizes, is recorded with null measurements and the reason within the "error" column
+    """
+    stages = stages or list(BENCHMARK_STAGES)
+    run_timestamp = datetime.datetime.now().replace(microsecond=0)
+    git_commit = current_git_commit()
+    spawn_context = multiprocessing.get_context("spawn")
+
+    measurements = []
+    for number_of_bars in number_of_bars_list:
+        with tempfile.TemporaryDirectory() as temporary_directory:
+            payload_paths = []
+            for ticker_number in range(number_of_tickers):
+                payload_paths.append(os.path.join(temporary_directory, f"payload_{ticker_number}.json"))
+                with open(payload_paths[-1], "wb") as payload_file:
+                    payload_file.write(generate_synthetic_aggregate_bars_payload(number_of_bars, symbol=f"SYNTH{ticker_number:04d}", seed=ticker_number))
+
+            for stage_name in stages:
+                if stage_name == "cerebro_backtest" and number_of_bars * number_of_tickers > cerebro_max_bars:
+                    continue
+                if stage_name == "portfolio_alignment" and number_of_tickers < 2:
+                    continue
+
+                results_queue = spawn_context.Queue()
+                process = spawn_context.Process(target=measure_stage_in_subprocess, args=(stage_name, payload_paths, repeats, results_queue))
+                process.start()
+                result, error = wait_for_subprocess_result(process, results_queue, stage_timeout_seconds)
+                measurements.append({"run_timestamp": run_timestamp,
+                                     "git_commit": git_commit,
+                                     "number_of_bars": number_of_bars,
+                                     "number_of_tickers": number_of_tickers,
+                                     "stage": stage_name,
+                                     "wall_time_seconds": None,
+                                     "peak_rss_increase_mb": None,
+                                     **(result or {}),
+                                     "error": error})
+
+    pl_measurements = pl.DataFrame(measurements, schema={"run_timestamp": pl.Datetime("us"),
+                                                         "git_commit": pl.String,
+                                                         "number_of_bars": pl.Int64,
+                                                         "number_of_tickers": pl.Int64,
+                                                         "stage": pl.String,
+                                                         "wall_time_seconds": pl.Float64,
+                                                         "peak_rss_increase_mb": pl.Float64,
+                                                         "error": pl.String})
+
+    if results_path is not None:
+        if os.path.exists(results_path):
+            # Results files written before the "error" column existed are extended with it
+            previous_measurements = pl.read_csv(results_path, schema_overrides=pl_measurements.schema)
+            pl.concat([previous_measurements, pl_measurements], how="diagonal_relaxed").write_csv(results_path)
+        else:
+            pl_measurements.write_csv(results_path)
+
+    return pl_measurements
+
+# --- Benchmark - Chat - Questions asked by the simulated chat sessions ---
+CHAT_BENCHMARK_QUESTIONS = ["Is the stock volatile?",
+                            "What is the current trend?",
+                            "How did the stock perform over the whole period?",
+                            "Is the RSI signalling that the stock is overbought?",
+                            "What was the largest drawdown?",
+                            "How does the recent volume compare to the average?",
+                            "Where are the Bollinger Bands relative to the price?",
+                            "When did the volatility regime last change?",
+                            "Is the MACD bullish or bearish?",
+                            "Summarize the last few bars."]
+
+def percentile_summary(values: list) -> dict:
+    """ Summarizes measurements by their 50th and 99th percentiles, and their maximum """
+    return {"p50": float(np.percentile(values, 50)),
+            "p99": float(np.percentile(values, 99)),
+            "max": float(np.max(values))}
+
+# --- Benchmark - Chat - A single chat session through the prompt-building code of the chat page ---
+def run_chat_session(session_number: int,
+                     stock_dataframe: pl.DataFrame,
+                     chain,
+                     turns: int,
+                     response_cache: LLM_Functions.SemanticResponseCache = None) -> dict:
+    """
+    Drives a chat session the way the chat page does: the data context is built once, and every turn renders the memory, streams the response, and updates the memory.
+
+    Args:
+        session_number: The number of the session, which offsets the questions so that sessions do not ask in lockstep
+        stock_dataframe: The stock dataframe the session chats about
+        chain: The chain of the query_llm_with_question function of the API_Functions.py file
+        turns: The amount of questions asked
+        response_cache: An optional SemanticResponseCache shared between the sessions
+
+    Returns:
+        A dictionary of the measurements of the session, in seconds unless stated otherwise
+    """
+    start = time.perf_counter()
+    data_context = LLM_Functions.build_stock_data_context(stock_dataframe)
+    fingerprint = LLM_Functions.data_context_fingerprint(data_context)
+    measurements = {"context_build_seconds": time.perf_counter() - start,
+                    "memory_render_seconds": [],
+                    "turn_latency_seconds": [],
+                    "time_to_first_token_seconds": [],
+                    "prompt_tokens": [],
+                    "cache_hits": 0}
+
+    memory = LLM_Functions.ConversationMemory()
+    for turn in range(turns):
+        user_question = CHAT_BENCHMARK_QUESTIONS[(session_number + turn) % len(CHAT_BENCHMARK_QUESTIONS)]
+        turn_start = time.perf_counter()
+
+        conversation_history = memory.render()
+        measurements["memory_render_seconds"].append(time.perf_counter() - turn_start)
+
+        response = response_cache.get(fingerprint, user_question, conversation_history) if response_cache is not None else None
+        if response is not None:
+            measurements["cache_hits"] += 1
+            measurements["time_to_first_token_seconds"].append(time.perf_counter() - turn_start)
+        else:
+            stream_metrics = {}
+            for _ in LLM_Functions.stream_llm_response(chain,
+                                                       {"data_context": data_context,
+                                                        "conversation_history": conversation_history,
+                                                        "user_question": user_question},
+                                                       stream_metrics):
+                pass
+            response = stream_metrics["response"]
+            measurements["time_to_first_token_seconds"].append(time.perf_counter() - turn_start - stream_metrics["total_seconds"] + stream_metrics["time_to_first_token_seconds"])
+            if response_cache is not None:
+                response_cache.put(fingerprint, user_question, response, conversation_history)
+
+        memory.add(HumanMessage(content=user_question))
+        memory.add(AIMessage(content=response))
+        measurements["turn_latency_seconds"].append(time.perf_counter() - turn_start)
+        measurements["prompt_tokens"].append(LLM_Functions.estimate_token_count(data_context + conversation_history + user_question))
+
+    return measurements
+
+# --- Benchmark - Chat - Concurrent chat sessions against the local fake chat model ---
+def benchmark_chat_sessions(number_of_sessions: int = 16,
+                            turns_per_session: int = 20,
+                            number_of_bars: int = 5000,
+                            first_token_latency_seconds: float = 0.2,
+                            seconds_per_token: float = 0.01,
+                            response_tokens: int = 80,
+                            use_response_cache: bool = False) -> dict:
+    """
+    Drives concurrent chat sessions through the real prompt-building code against the "fake" backend of the API_Functions.py file, offline.
+    Every session runs on its own thread, similar to the Streamlit sessions of a server.
+
+    Args:
+        number_of_sessions: The amount of concurrent chat sessions
+        turns_per_session: The amount of questions asked by every session
+        number_of_bars: The amount of bars of the synthetic stock dataframe the sessions chat about
+        first_token_latency_seconds: The simulated time to first token of the fake chat model
+        seconds_per_token: The simulated time between two streamed tokens of the fake chat model
+        response_tokens: The amount of tokens of every response of the fake chat model
+        use_response_cache: Setting for whether the sessions share a SemanticResponseCache
+
+    Returns:
+        A dictionary with the p50, p99, and maximum of the turn latency, time to first token, context building, and memory rendering in seconds, and of the prompt size in estimated tokens,
+        alongside the amount of turns, the turns per second, and the cache hit rate
+    """
+    raw_bars = API_Functions.decode_aggregate_bars_response(generate_synthetic_aggregate_bars_payload(number_of_bars))["results"]
+    stock_dataframe = Transformation_Functions.transform_aggregate_bars_to_dataframe("SYNTH", raw_bars)
+    chain = API_Functions.query_llm_with_question(backend="fake",
+                                                  first_token_latency_seconds=first_token_latency_seconds,
+                                                  seconds_per_token=seconds_per_token,
+                                                  response_tokens=response_tokens)
+    response_cache = LLM_Functions.SemanticResponseCache() if use_response_cache else None
+
+    start = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=number_of_sessions) as executor:
+        sessions = list(executor.map(run_chat_session,
+                                     range(number_of_sessions),
+                                     [stock_dataframe] * number_of_sessions,
+                                     [chain] * number_of_sessions,
+                                     [turns_per_session] * number_of_sessions,
+                                     [response_cache] * number_of_sessions))
+    wall_time_seconds = time.perf_counter() - start
+
+    number_of_turns = number_of_sessions * turns_per_session
+    return {"turns": number_of_turns,
+            "turns_per_second": number_of_turns / wall_time_seconds,
+            "turn_latency_seconds": percentile_summary([value for session in sessions for value in session["turn_latency_seconds"]]),
+            "time_to_first_token_seconds": percentile_summary([value for session in sessions for value in session["time_to_first_token_seconds"]]),
+            "context_build_seconds": percentile_summary([session["context_build_seconds"] for session in sessions]),
+            "memory_render_seconds": percentile_summary([value for session in sessions for value in session["memory_render_seconds"]]),
+            "prompt_tokens": percentile_summary([value for session in sessions for value in session["prompt_tokens"]]),
+            "cache_hit_rate": sum(session["cache_hits"] for session in sessions) / number_of_turns}
+
+if __name__ == "__main__":
+    argument_parser = argparse.ArgumentParser(description="Benchmarks the hot paths of Project Stonks on synthetic market data")
+    argument_parser.add_argument("--bars", type=int, nargs="+", default=[1000, 100000, 1000000], help="Amounts of bars per ticker")
+    argument_parser.add_argument("--tickers", type=int, default=1, help="Amount of synthetic tickers")
+    argument_parser.add_argument("--stages", nargs="+", choices=list(BENCHMARK_STAGES), default=None, help="Stages to run, all stages by default")
+    argument_parser.add_argument("--repeats", type=int, default=3, help="Timed runs per stage, the fastest is reported")
+    argument_parser.add_argument("--results-file", default="benchmark_results.csv", help="CSV file the measurements are appended to")
+    argument_parser.add_argument("--stage-timeout", type=float, default=3600, help="Seconds after which the process of a single stage is terminated")
+    argument_parser.add_argument("--decoding-comparison", action="store_true", help="Compare the previous and the current decoding paths instead")
+    argument_parser.add_argument("--chat-sessions", type=int, default=None, help="Benchmark this amount of concurrent chat sessions against the local fake chat model instead")
+    argument_parser.add_argument("--chat-turns", type=int, default=20, help="Questions asked by every chat session")
+    argument_parser.add_argument("--response-cache", action="store_true", help="Share a semantic response cache between the chat sessions")
+    arguments = argument_parser.parse_args()
+
+    if arguments.chat_sessions is not None:
+        print(json.dumps(benchmark_chat_sessions(arguments.chat_sessions, arguments.chat_turns, use_response_cache=arguments.response_cache), indent=2))
+    elif arguments.decoding_comparison:
+        for number_of_bars in arguments.bars:
+            print(benchmark_aggregate_bars_decoding(number_of_bars, arguments.repeats))
+    else:
+        with pl.Config(tbl_rows=-1):
+            print(benchmark_suite(arguments.bars, arguments.tickers, arguments.stages, arguments.repeats,
+                                  results_path=arguments.results_file, stage_timeout_seconds=arguments.stage_timeout))
@@ -0,0 +1,665 @@
+# --- Imports ---
+# Core
+import re
+import math
+import time
+import random
+import zlib
+import hashlib
+import threading
+import collections
+import numpy as np
+import polars as pl
+import streamlit as st
+
+# Langchain
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+# Functions
+import Technical_Indicators_Functions
+
+# --- LLM Context - Configs ---
+# Rough amount of characters per token of English text and numbers, used to estimate the size of a prompt without a tokenizer
+LLM_CHARACTERS_PER_TOKEN = 4
+
+# Token budgets of the data context and of the conversation memory within a single prompt
+LLM_DATA_CONTEXT_TOKEN_BUDGET = 1200
+LLM_MEMORY_TOKEN_BUDGET = 600
+
+# Amount of the most recent messages that are kept verbatim, older messages are folded into the summary
+LLM_MEMORY_RECENT_MESSAGES = 6
+
+# Upper bounds of the recent bars and regime changes within the data context
+LLM_CONTEXT_RECENT_BARS = 20
+LLM_CONTEXT_MAX_REGIME_CHANGES = 6
+
+# Indicators of the snapshot, computed on top of the columns of the stock dataframe
+LLM_CONTEXT_INDICATORS = [("rsi", {"time_period": 14}),
+                          ("macd", {}),
+                          ("bollinger_bands", {"time_period": 20}),
+                          ("atr", {"time_period": 14}),
+                          ("adx", {"time_period": 14}),
+                          ("sma", {"time_period": 50})]
+
+# --- LLM Cache - Configs ---
+# Maximum amount of cached responses, the least recently used response is evicted first
+LLM_RESPONSE_CACHE_CAPACITY = 512
+
+# Time after which a cached response is no longer served
+LLM_RESPONSE_CACHE_TTL_SECONDS = 3600
+
+# Minimum cosine similarity between the embedded questions for a near-duplicate question to be served from the cache
+LLM_RESPONSE_CACHE_SIMILARITY_THRESHOLD = 0.8
+
+# Dimension of the hashed bag-of-features embedding of a question
+LLM_QUESTION_EMBEDDING_DIMENSION = 1024
+
+# Words that do not change the meaning of a question about a stock, negations are deliberately kept
+LLM_QUESTION_STOPWORDS = {"a", "an", "the", "is", "are", "was", "were", "be", "been", "do", "does", "did", "can", "could", "would", "should", "will",
+                          "has", "have", "had", "i", "me", "my", "you", "your", "it", "its", "this", "that", "these", "those", "of", "for", "to", "in", "on", "at", "by",
+                          "with", "about", "please", "tell", "what", "whats", "how", "hows", "stock", "share", "shares", "currently", "right", "now",
+                          "very", "really", "quite", "so", "much", "pretty"}
+
+# Numbers and these words flip the meaning of otherwise similar questions, so near-duplicate questions are only served if they share them exactly
+LLM_QUESTION_DIRECTIONAL_WORDS = {"up", "down", "upward", "downward", "above", "below", "over", "under", "high", "higher", "highest", "low", "lower", "lowest",
+                                  "rise", "fall", "gain", "loss", "bullish", "bearish", "overbought", "oversold", "buy", "sell", "long", "short",
+                                  "increase", "decrease", "positive", "negative", "best", "worst", "top", "bottom", "max", "maximum", "min", "minimum",
+                                  "first", "last", "more", "less", "most", "least", "before", "after", "not", "no", "never"}
+
+# Prefixes of the words that name what a question is about, a question without any of them, or without a ticker, depends on the earlier turns
+LLM_QUESTION_SUBJECT_TERMS = ("stock", "share", "price", "volatil", "trend", "rsi", "macd", "bollinger", "band", "sma", "ema", "moving", "average",
+                              "atr", "adx", "volume", "drawdown", "return", "perform", "bar", "candle", "close", "open", "high", "low", "momentum",
+                              "support", "resistance", "overbought", "oversold", "bull", "bear", "indicator", "dividend")
+
+# Uppercase words of up to five letters name a ticker, except for the pronoun "I" and the article "A"
+LLM_QUESTION_TICKER_PATTERN = re.compile(r"\b(?!I\b|A\b)[A-Z]{1,5}\b")
+
+# Words that refer back to an earlier turn, a question with any of them depends on the conversation it is asked in
+LLM_QUESTION_REFERRING_WORDS = {"it", "its", "they", "them", "their", "those", "these", "he", "she", "previous", "earlier", "again", "instead",
+                                "else", "former", "latter", "same"}
+
+# --- LLM Backend - Configs ---
+# Words of the deterministic responses of the LocalFakeChatModel
+LOCAL_FAKE_MODEL_VOCABULARY = ["the", "stock", "price", "trend", "volatility", "returns", "moving", "average", "support", "resistance",
+                               "momentum", "volume", "period", "risk", "investors", "market", "signal", "higher", "lower", "recent"]
+
+# --- LLM Context - Tokens - Estimating the size of a prompt ---
+def estimate_token_count(text: str) -> int:
+    """
+    Estimates the amount of tokens of a text from its length.
+
+    Args:
+        text: The text to estimate
+
+    Returns:
+        The estimated amount of tokens
+    """
+    return math.ceil(len(text) / LLM_CHARACTERS_PER_TOKEN)
+
+def format_number(value: float | None) -> str:
+    """ Formats a number compactly for a prompt, with two decimals for prices and four significant digits for small ratios """
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return "n/a"
+    if abs(value) >= 1 or value == 0:
+        return f"{value:,.2f}"
+
+    return f"{value:.4g}"
+
+# --- LLM Context - Sections - Summary statistics of the whole period ---
+def summarize_stock_statistics(stock_dataframe: pl.DataFrame) -> str:
+    """
+    Summarizes the whole period of a stock dataframe in a few lines, computed in a single Polars select.
+
+    Args:
+        stock_dataframe: The stock dataframe of the Transformation_Functions.py file, sorted in ascending order for the timestamp column
+
+    Returns:
+        The summary section of the data context
+    """
+    statistics = stock_dataframe.select(pl.col("stock_code").first(),
+                                        pl.len().alias("number_of_bars"),
+                                        pl.col("timestamp").first().alias("first_timestamp"),
+                                        pl.col("timestamp").last().alias("last_timestamp"),
+                                        pl.col("timestamp").diff().median().alias("bar_interval"),
+                                        pl.col("close").first().alias("first_close"),
+                                        pl.col("close").last().alias("last_close"),
+                                        pl.col("high").max().alias("highest_high"),
+                                        pl.col("timestamp").get(pl.col("high").arg_max()).alias("highest_high_timestamp"),
+                                        pl.col("low").min().alias("lowest_low"),
+                                        pl.col("timestamp").get(pl.col("low").arg_min()).alias("lowest_low_timestamp"),
+                                        pl.col("close").mean().alias("mean_close"),
+                                        (pl.col("close").last() / pl.col("close").first() - 1).alias("total_return"),
+                                        pl.col("close").pct_change().mean().alias("mean_bar_return"),
+                                        pl.col("close").pct_change().std().alias("bar_return_standard_deviation"),
+                                        (pl.col("close") / pl.col("close").cum_max() - 1).min().alias("maximum_drawdown"),
+                                        pl.col("trading_volume").cast(pl.Float64).mean().alias("mean_volume"),
+                                        pl.col("trading_volume").cast(pl.Float64).last().alias("last_volume")) \
+                                .row(0, named=True)
+
+    return "\n".join([f"SUMMARY of {statistics['stock_code']}: {statistics['number_of_bars']} bars from {statistics['first_timestamp']} to {statistics['last_timestamp']}, one bar every {statistics['bar_interval']}",
+                      f"close: first {format_number(statistics['first_close'])}, last {format_number(statistics['last_close'])}, mean {format_number(statistics['mean_close'])}, total return {format_number(100 * statistics['total_return'])}%",
+                      f"range: highest high {format_number(statistics['highest_high'])} on {statistics['highest_high_timestamp']}, lowest low {format_number(statistics['lowest_low'])} on {statistics['lowest_low_timestamp']}",
+                      f"risk: per-bar return mean {format_number(statistics['mean_bar_return'])}, standard deviation {format_number(statistics['bar_return_standard_deviation'])}, maximum drawdown {format_number(100 * statistics['maximum_drawdown'])}%",
+                      f"volume: mean {format_number(statistics['mean_volume'])}, last bar {format_number(statistics['last_volume'])}"])
+
+# --- LLM Context - Sections - Latest values of the technical indicators ---
+def snapshot_technical_indicators(stock_dataframe: pl.DataFrame) -> str:
+    """
+    Lists the latest value of every technical indicator column of the stock dataframe, alongside the LLM_CONTEXT_INDICATORS.
+
+    Args:
+        stock_dataframe: The stock dataframe of the Transformation_Functions.py file, sorted in ascending order for the timestamp column
+
+    Returns:
+        The indicator snapshot section of the data context
+    """
+    latest_indicators = Technical_Indicators_Functions.compute_technical_indicators(stock_dataframe, LLM_CONTEXT_INDICATORS) \
+                                                      .select(pl.col("^ti_.*$").last()) \
+                                                      .row(0, named=True)
+
+    return "INDICATORS at the last bar:\n" + ", ".join(f"{column.removeprefix('ti_')} {format_number(value)}" for column, value in latest_indicators.items())
+
+# --- LLM Context - Sections - Trend and volatility regime changes ---
+def detect_regime_changes(stock_dataframe: pl.DataFrame,
+                          fast_time_period: int = 20,
+                          slow_time_period: int = 50,
+                          volatility_time_period: int = 20,
+                          minimum_regime_bars: int = 5) -> pl.DataFrame:
+    """
+    Detects the changes of the trend regime, the sign of the fast minus the slow simple moving average, and of the volatility regime, the rolling standard deviation of the returns against its 20th and 80th percentiles.
+    Regimes that last fewer than minimum_regime_bars bars are ignored, so that a noisy crossover is not reported as a change.
+
+    Args:
+        stock_dataframe: The stock dataframe of the Transformation_Functions.py file, sorted in ascending order for the timestamp column
+        fast_time_period: The window of the fast simple moving average
+        slow_time_period: The window of the slow simple moving average
+        volatility_time_period: The window of the rolling standard deviation of the returns
+        minimum_regime_bars: The minimum amount of bars of a regime
+
+    Returns:
+        A Polars DataFrame with the "timestamp", "close", "kind", and "regime" of every regime, in ascending order of time
+        The first regime of every kind is the starting regime rather than a change
+    """
+    volatility = pl.col("close").pct_change().rolling_std(window_size=volatility_time_period)
+    regime_dataframe = stock_dataframe.select(pl.col("timestamp"),
+                                              pl.col("close"),
+                                              pl.when(pl.col("close").rolling_mean(fast_time_period) > pl.col("close").rolling_mean(slow_time_period)).then(pl.lit("uptrend"))
+                                                .when(pl.col("close").rolling_mean(slow_time_period).is_not_null()).then(pl.lit("downtrend"))
+                                                .alias("trend"),
+                                              pl.when(volatility > volatility.quantile(0.8)).then(pl.lit("high volatility"))
+                                                .when(volatility < volatility.quantile(0.2)).then(pl.lit("low volatility"))
+                                                .when(volatility.is_not_null()).then(pl.lit("normal volatility"))
+                                                .alias("volatility"))
+
+    regime_runs = []
+    for kind in ("trend", "volatility"):
+        regime_runs.append(regime_dataframe.drop_nulls(kind)
+                                           .group_by(pl.col(kind).rle_id().alias("run"), maintain_order=True)
+                                           .agg(pl.col("timestamp").first(),
+                                                pl.col("close").first(),
+                                                pl.col(kind).first().alias("regime"),
+                                                pl.len().alias("number_of_bars"))
+                                           .filter(pl.col("number_of_bars") >= minimum_regime_bars)
+                                           .filter(pl.col("regime") != pl.col("regime").shift(1).fill_null(""))
+                                           .select(pl.col("timestamp"), pl.col("close"), pl.lit(kind).alias("kind"), pl.col("regime")))
+
+    return pl.concat(regime_runs).sort(by="timestamp")
+
+def format_regime_changes(stock_dataframe: pl.DataFrame,
+                          max_regime_changes: int = LLM_CONTEXT_MAX_REGIME_CHANGES) -> str:
+    """
+    Describes the current regimes, and the most recent regime changes of the detect_regime_changes function.
+
+    Args:
+        stock_dataframe: The stock dataframe of the Transformation_Functions.py file, sorted in ascending order for the timestamp column
+        max_regime_changes: The maximum amount of regime changes listed
+
+    Returns:
+        The regime section of the data context
+    """
+    regimes = detect_regime_changes(stock_dataframe)
+    if regimes.height == 0:
+        return "REGIMES: not enough bars to detect the trend and volatility regimes"
+
+    current_regimes = regimes.group_by("kind", maintain_order=True).last()
+    # The first regime of every kind is the starting regime, every later one is a change
+    regime_changes = regimes.filter(pl.int_range(pl.len()).over("kind") > 0) \
+                            .tail(max_regime_changes)
+
+    lines = ["REGIMES: currently " + ", ".join(f"{row['regime']} since {row['timestamp']}" for row in current_regimes.iter_rows(named=True))]
+    lines.extend(f"- {row['timestamp']}: changed to {row['regime']} at close {format_number(row['close'])}" for row in regime_changes.iter_rows(named=True))
+
+    return "\n".join(lines)
+
+# --- LLM Context - Sections - The most recent bars ---
+def format_recent_bars(stock_dataframe: pl.DataFrame,
+                       number_of_bars: int) -> str:
+    """
+    Lists the most recent OHLCV bars as compact CSV rows.
+
+    Args:
+        stock_dataframe: The stock dataframe of the Transformation_Functions.py file, sorted in ascending order for the timestamp column
+        number_of_bars: The amount of bars listed
+
+    Returns:
+        The recent bars section of the data context
+    """
+    recent_bars = stock_dataframe.tail(number_of_bars) \
+                                 .select(pl.col("timestamp").dt.strftime("%Y-%m-%d %H:%M"),
+                                         pl.col("open", "high", "low", "close").round(2),
+                                         pl.col("trading_volume").cast(pl.Int64).alias("volume"))
+
+    return f"RECENT {recent_bars.height} BARS:\n" + recent_bars.write_csv().strip()
+
+# --- LLM Context - Builder - Compact data context within a token budget ---
+def build_stock_data_context(stock_dataframe: pl.DataFrame,
+                             token_budget: int = LLM_DATA_CONTEXT_TOKEN_BUDGET,
+                             max_recent_bars: int = LLM_CONTEXT_RECENT_BARS) -> str:
+    """
+    Builds a compact statistical description of a stock dataframe for the prompt of the LLM, instead of its truncated representation.
+    The sections are added in order of priority: summary statistics, indicator snapshot, and regime changes.
+    The remaining budget is filled with as many of the most recent bars as fit.
+
+    Args:
+        stock_dataframe: The stock dataframe of the Transformation_Functions.py file, sorted in ascending order for the timestamp column
+        token_budget: The maximum estimated amount of tokens of the data context
+        max_recent_bars: The maximum amount of recent bars listed
+
+    Returns:
+        The data context as plain text
+    """
+    sections = [summarize_stock_statistics(stock_dataframe)]
+    for build_section in (snapshot_technical_indicators, format_regime_changes):
+        section = build_section(stock_dataframe)
+        if estimate_token_count("\n\n".join(sections + [section])) <= token_budget:
+            sections.append(section)
+
+    number_of_bars = min(max_recent_bars, stock_dataframe.height)
+    while number_of_bars > 0:
+        section = format_recent_bars(stock_dataframe, number_of_bars)
+        if estimate_token_count("\n\n".join(sections + [section])) <= token_budget:
+            sections.append(section)
+            break
+        number_of_bars //= 2
+
+    return "\n\n".join(sections)
+
+# --- LLM Memory - Summary - Folding old messages into a bounded summary ---
+def extractive_conversation_summary(summary: str,
+                                    messages: list,
+                                    token_budget: int) -> str:
+    """
+    Folds messages into a running summary by keeping the opening of every message, without calling the LLM.
+    The oldest lines are dropped once the summary exceeds its token budget.
+
+    Args:
+        summary: The running summary, one line per folded message
+        messages: The Langchain messages that are folded into the summary, oldest first
+        token_budget: The maximum estimated amount of tokens of the summary
+
+    Returns:
+        The updated summary
+    """
+    lines = summary.splitlines()
+    for message in messages:
+        role = "User asked" if message.type == "human" else "Assistant answered"
+        content = " ".join(str(message.content).split())
+        lines.append(f"{role}: {content[:200]}{'...' if len(content) > 200 else ''}")
+
+    while len(lines) > 1 and estimate_token_count("\n".join(lines)) > token_budget:
+        lines.pop(0)
+
+    return "\n".join(lines)
+
+# --- LLM Memory - Rolling conversation memory of a chat session ---
+class ConversationMemory:
+    """
+    Rolling Conversation Memory
+    Keeps the most recent messages verbatim, and folds the older messages into a running summary.
+    The rendered memory stays within a token budget however long the session grows, so the prompt size, and with it the turn latency, stays flat.
+    """
+    def __init__(self,
+                 recent_messages: int = LLM_MEMORY_RECENT_MESSAGES,
+                 token_budget: int = LLM_MEMORY_TOKEN_BUDGET,
+                 summarizer=extractive_conversation_summary):
+        self.recent_messages = recent_messages
+        self.token_budget = token_budget
+        self.summarizer = summarizer
+        self.summary = ""
+        self.messages = collections.deque()
+
+    def add(self, message):
+        """ Appends a Langchain message, and folds the messages beyond recent_messages into the summary """
+        self.messages.append(message)
+        if len(self.messages) > self.recent_messages:
+            folded_messages = [self.messages.popleft() for _ in range(len(self.messages) - self.recent_messages)]
+            self.summary = self.summarizer(self.summary, folded_messages, self.token_budget // 3)
+
+    def render(self) -> str:
+        """
+        Renders the summary and the recent messages for the prompt, dropping the oldest recent messages if they exceed the token budget.
+
+        Returns:
+            The conversation history as plain text
+        """
+        summary_section = "Summary of the earlier conversation:\n" + self.summary if self.summary else ""
+        remaining_tokens = self.token_budget - estimate_token_count(summary_section + "\n\nRecent messages:\n")
+
+        # Every message is capped, so that a single long answer does not push the latest question out of the memory
+        recent_lines = []
+        for message in reversed(self.messages):
+            role = "User" if message.type == "human" else "Assistant"
+            line = f"{role}: {' '.join(str(message.content).split())}"
+            maximum_characters = min(self.token_budget // 4, remaining_tokens) * LLM_CHARACTERS_PER_TOKEN
+            if len(line) > maximum_characters:
+                line = line[:max(0, maximum_characters - 3)] + "..."
+            remaining_tokens -= estimate_token_count(line) + 1
+            if remaining_tokens < 0:
+                break
+            recent_lines.insert(0, line)
+
+        sections = []
+        if summary_section:
+            sections.append(summary_section)
+        if recent_lines:
+            sections.append("Recent messages:\n" + "\n".join(recent_lines))
+
+        return "\n\n".join(sections) if sections else "(no previous messages)"
+
+# --- LLM Streaming - Rendering the chunks of a chain as they arrive, with latency metrics ---
+def stream_llm_response(chain,
+                        chain_input: dict,
+                        stream_metrics: dict):
+    """
+    Streams the string chunks of a Langchain chain, e.g., the query_llm_with_question chain of the API_Functions.py file, for st.write_stream.
+    Groq streams roughly one token per chunk, so the non-empty chunks are counted as tokens.
+
+    Args:
+        chain: A Langchain runnable ending in a StrOutputParser
+        chain_input: The input variables of the chain
+        stream_metrics: A dictionary that is filled once the stream is exhausted with the "time_to_first_token_seconds", "total_seconds", "number_of_tokens",
+                        and "tokens_per_second" after the first token, alongside the full "response"
+
+    Yields:
+        The string chunks of the response, in order
+    """
+    start = time.perf_counter()
+    first_token_time = None
+    chunks = []
+    for chunk in chain.stream(chain_input):
+        if not chunk:
+            continue
+        if first_token_time is None:
+            first_token_time = time.perf_counter()
+        chunks.append(chunk)
+        yield chunk
+
+    end = time.perf_counter()
+    stream_metrics["response"] = "".join(chunks)
+    stream_metrics["number_of_tokens"] = len(chunks)
+    stream_metrics["total_seconds"] = end - start
+    stream_metrics["time_to_first_token_seconds"] = first_token_time - start if first_token_time is not None else None
+    stream_metrics["tokens_per_second"] = (len(chunks) - 1) / (end - first_token_time) if len(chunks) > 1 and end > first_token_time else None
+
+# --- LLM Cache - Keys - Fingerprint of the data context, and normalized and embedded form of a question ---
+def data_context_fingerprint(data_context: str) -> str:
+    """ Hashes the data context, which holds the ticker, period, and statistics of the loaded stock dataframe """
+    return hashlib.sha256(data_context.encode()).hexdigest()[:16]
+
+def conversation_fingerprint(conversation_history: str) -> str:
+    """ Hashes the rendered conversation memory, so that the same follow-up question within different conversations gets different cache keys """
+    return hashlib.sha256(conversation_history.encode()).hexdigest()[:16]
+
+def stem_question_word(word: str) -> str:
+    """ Strips the plural and common verb suffixes of a lowercase word """
+    for suffix in ("ing", "ed", "es", "s"):
+        if len(word) > len(suffix) + 2 and word.endswith(suffix):
+            return word[:-len(suffix)]
+    return word
+
+def normalize_question(question: str) -> str:
+    """
+    Normalizes a question so that trivially different phrasings share the same cache key.
+    Lowercases it, drops punctuation and stopwords, and strips plural and common verb suffixes.
+
+    Args:
+        question: The question of the user
+
+    Returns:
+        The normalized question as space-separated words
+    """
+    return " ".join(stem_question_word(word) for word in re.findall(r"[a-z0-9]+", question.lower().replace("'", "")) if word not in LLM_QUESTION_STOPWORDS)
+
+def question_depends_on_conversation(question: str) -> bool:
+    """
+    Checks whether the meaning of a question depends on the earlier turns of its conversation.
+    That is the case if it refers back with a word like "it" or "they", or if it names neither a ticker nor a subject like the price, the trend, or an indicator, e.g., "Why?" or "What about last week?".
+
+    Args:
+        question: The question of the user
+
+    Returns:
+        A boolean of whether the question is a follow-up question
+    """
+    words = re.findall(r"[a-z0-9]+", question.lower())
+    if any(word in LLM_QUESTION_REFERRING_WORDS for word in words):
+        return True
+
+    names_a_ticker = LLM_QUESTION_TICKER_PATTERN.search(question) is not None
+    return not names_a_ticker and not any(word.startswith(LLM_QUESTION_SUBJECT_TERMS) for word in words)
+
+def question_guard_words(question: str,
+                         normalized_question: str) -> frozenset:
+    """ Returns the tickers, numbers, and directional words of a question, which a near-duplicate question has to share exactly """
+    return frozenset(LLM_QUESTION_TICKER_PATTERN.findall(question)) | \
+           frozenset(word for word in normalized_question.split() if word in LLM_QUESTION_NORMALIZED_DIRECTIONAL_WORDS or any(character.isdigit() for character in word))
+
+def words_differ_by_typo(word: str,
+                         other_word: str) -> bool:
+    """ Checks whether two words of at least four characters differ by a single inserted, deleted, substituted, or transposed character """
+    if min(len(word), len(other_word)) < 4 or abs(len(word) - len(other_word)) > 1:
+        return False
+
+    prefix_length = 0
+    while prefix_length < min(len(word), len(other_word)) and word[prefix_length] == other_word[prefix_length]:
+        prefix_length += 1
+    word, other_word = word[prefix_length:], other_word[prefix_length:]
+
+    return word[1:] == other_word[1:] or word[1:] == other_word or word == other_word[1:] or \
+           (len(word) >= 2 and word[1] + word[0] + word[2:] == other_word)
+
+def questions_share_content_words(normalized_question: str,
+                                  other_normalized_question: str) -> bool:
+    """
+    Checks whether two normalized questions have the same set of content words.
+    Inflections are already stripped by the normalize_question function, so the words may only differ by a typo.
+    A near-duplicate question with an extra word, e.g., "exponential" or "euros", thereby never shares the response of the question without it.
+
+    Args:
+        normalized_question: The question of the normalize_question function
+        other_normalized_question: The other question of the normalize_question function
+
+    Returns:
+        A boolean of whether every word of either question has a counterpart within the other question
+    """
+    words = set(normalized_question.split())
+    other_words = set(other_normalized_question.split())
+
+    return all(any(word == other_word or words_differ_by_typo(word, other_word) for other_word in other_words) for word in words) and \
+           all(any(other_word == word or words_differ_by_typo(other_word, word) for word in words) for other_word in other_words)
+
+LLM_QUESTION_NORMALIZED_DIRECTIONAL_WORDS = {stem_question_word(word) for word in LLM_QUESTION_DIRECTIONAL_WORDS}
+
+def embed_question(normalized_question: str) -> np.ndarray:
+    """
+    Embeds a normalized question as an L2-normalized hashed bag of its words and of the character trigrams of its words.
+    The trigrams give partial credit to inflections and small typos, without an embedding model.
+
+    Args:
+        normalized_question: The question of the normalize_question function
+
+    Returns:
+        A float32 numpy array of LLM_QUESTION_EMBEDDING_DIMENSION values
+    """
+    embedding = np.zeros(LLM_QUESTION_EMBEDDING_DIMENSION, dtype=np.float32)
+    for word in normalized_question.split():
+        embedding[zlib.crc32(word.encode()) % LLM_QUESTION_EMBEDDING_DIMENSION] += 2.0
+        padded_word = f"#{word}#"
+        for index in range(len(padded_word) - 2):
+            embedding[zlib.crc32(padded_word[index:index + 3].encode()) % LLM_QUESTION_EMBEDDING_DIMENSION] += 1.0
+
+    norm = np.linalg.norm(embedding)
+    return embedding / norm if norm > 0 else embedding
+
+# --- LLM Cache - Semantic response cache shared between the chat sessions ---
+class SemanticResponseCache:
+    """
+    Semantic Response Cache
+    Caches the responses of the LLM by the fingerprint of the data context and the normalized question, and also by the fingerprint of the conversation for follow-up questions.
+    A standalone question is thereby shared between every conversation on the same data, while a follow-up question is only served within its own conversation.
+    A question with the same normalized form is served in O(1), otherwise the most similar question under the same key is served if its embedding is close enough, it has the same tickers, numbers, and directional words, and its content words only differ by typos.
+    Responses expire after the TTL, and the least recently used response is evicted once the cache is full.
+    """
+    def __init__(self,
+                 capacity: int = LLM_RESPONSE_CACHE_CAPACITY,
+                 ttl_seconds: float = LLM_RESPONSE_CACHE_TTL_SECONDS,
+                 similarity_threshold: float = LLM_RESPONSE_CACHE_SIMILARITY_THRESHOLD):
+        self.capacity = capacity
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        # (data context fingerprint, conversation fingerprint or "" for standalone questions, normalized question): (response, embedding, guard words, created_at),
+        # in least to most recently used order
+        self.entries = collections.OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def question_scope(fingerprint: str,
+                       question: str,
+                       conversation_history: str) -> tuple:
+        """ Returns the data context fingerprint, alongside the conversation fingerprint if the question is a follow-up question """
+        return (fingerprint, conversation_fingerprint(conversation_history) if question_depends_on_conversation(question) else "")
+
+    def get(self,
+            fingerprint: str,
+            question: str,
+            conversation_history: str = "") -> str | None:
+        """
+        Looks up the response of a question on a data context.
+        A near-duplicate question is only served if it has the same tickers, numbers, and directional words, so that e.g. a question about the upside is never served the response about the downside.
+        Its content words also have to be the same up to typos, so that e.g. a question about the exponential moving average is never served the response about the simple one.
+
+        Args:
+            fingerprint: The data_context_fingerprint of the data context
+            question: The question of the user
+            conversation_history: The rendered ConversationMemory the question is asked in, so that a follow-up question is only served within the same conversation
+
+        Returns:
+            The cached response, or None if no fresh response of the same or a near-duplicate question is held, or if the question has no content words
+        """
+        normalized_question = normalize_question(question)
+        if not normalized_question:
+            return None
+
+        scope = self.question_scope(fingerprint, question, conversation_history)
+        now = time.monotonic()
+        with self.lock:
+            key = (*scope, normalized_question)
+            if key not in self.entries:
+                # Similarity lookup over the fresh responses of the same scope, with the same tickers, numbers, directional words, and content words
+                guard_words = question_guard_words(question, normalized_question)
+                candidates = [(candidate_key, embedding) for candidate_key, (_, embedding, candidate_guard_words, created_at) in self.entries.items()
+                              if candidate_key[:2] == scope and now - created_at < self.ttl_seconds and candidate_guard_words == guard_words and
+                              questions_share_content_words(normalized_question, candidate_key[2])]
+                key = None
+                if candidates:
+                    similarities = np.stack([embedding for _, embedding in candidates]) @ embed_question(normalized_question)
+                    if similarities.max() >= self.similarity_threshold:
+                        key = candidates[int(similarities.argmax())][0]
+
+            if key is None or now - self.entries[key][3] >= self.ttl_seconds:
+                self.entries.pop(key, None)
+                self.misses += 1
+                return None
+
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.entries[key][0]
+
+    def put(self,
+            fingerprint: str,
+            question: str,
+            response: str,
+            conversation_history: str = ""):
+        """
+        Stores the response of a question on a data context, evicting the least recently used response if the cache is full.
+        Questions without content words, e.g., "What is it?", are never stored, as their meaning depends entirely on the conversation.
+
+        Args:
+            fingerprint: The data_context_fingerprint of the data context
+            question: The question of the user
+            response: The full response of the LLM
+            conversation_history: The rendered ConversationMemory the question was asked in
+        """
+        normalized_question = normalize_question(question)
+        if not normalized_question:
+            return
+
+        key = (*self.question_scope(fingerprint, question, conversation_history), normalized_question)
+        with self.lock:
+            self.entries[key] = (response, embed_question(normalized_question), question_guard_words(question, normalized_question), time.monotonic())
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.capacity:
+                self.entries.popitem(last=False)
+
+@st.cache_resource
+def llm_response_cache() -> SemanticResponseCache:
+    """
+    Creates the SemanticResponseCache shared by every Streamlit session.
+
+    Args:
+        -
+    Returns:
+        A SemanticResponseCache object
+    """
+    return SemanticResponseCache()
+
+# --- LLM Backend - Deterministic local stand-in for a remote chat model ---
+class LocalFakeChatModel(BaseChatModel):
+    """
+    Local Fake Chat Model
+    Deterministic stand-in for the remote chat model, for testing and benchmarking the chat path offline.
+    The response is seeded by the prompt, so the same prompt always gets the same response, and it streams one token at a time after a simulated time to first token.
+    """
+    first_token_latency_seconds: float = 0.2
+    seconds_per_token: float = 0.02
+    response_tokens: int = 60
+
+    @property
+    def _llm_type(self) -> str:
+        return "local-fake"
+
+    def response_token_sequence(self, messages: list) -> list:
+        """ Builds the tokens of the response to a prompt, opening with the question so that responses are recognizable """
+        prompt = "\n".join(str(message.content) for message in messages)
+        random_generator = random.Random(hashlib.sha256(prompt.encode()).hexdigest())
+        question = prompt.rsplit("Question:", 1)[-1].split("Response:", 1)[0].strip()
+
+        return [f"Regarding \"{question}\":"] + [f" {random_generator.choice(LOCAL_FAKE_MODEL_VOCABULARY)}" for _ in range(self.response_tokens - 1)]
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        time.sleep(self.first_token_latency_seconds)
+        for index, token in enumerate(self.response_token_sequence(messages)):
+            if index > 0:
+                time.sleep(self.seconds_per_token)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token))
+            if run_manager is not None:
+                run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        response = "".join(chunk.message.content for chunk in self._stream(messages, stop, run_manager, **kwargs))
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=response))])
@@ -0,0 +1,535 @@
+# --- Imports ---
+# Core
+import os
+import sys
+import json
+import math
+import time
+import zlib
+import random
+import logging
+import argparse
+import datetime
+import threading
+import functools
+import contextlib
+import collections
+import http.server
+import urllib.parse
+from zoneinfo import ZoneInfo
+import polars as pl
+
+# Functions
+import Storage_Functions, Benchmark_Functions
+
+# --- Logging ---
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+# --- Mock Server - Configs ---
+# Polygon aggregates interpret the from/to dates in the exchange timezone
+EXCHANGE_TIMEZONE = "America/New_York"
+
+# Polars interval of a single timespan, and the trading time it spans in milliseconds for the price volatility scaling
+MOCK_TIMESPAN_INTERVALS = {"second": ("s", 1000),
+                           "minute": ("m", 60000),
+                           "hour": ("h", 3600000),
+                           "day": ("d", 23400000),
+                           "week": ("w", 117000000),
+                           "month": ("mo", 491400000),
+                           "quarter": ("q", 1474200000),
+                           "year": ("y", 5896800000)}
+
+# Intraday bars are only served within the extended trading hours, 04:00 to 20:00 in the exchange timezone
+MOCK_EXTENDED_HOURS = (4, 20)
+
+# Maximum page sizes of the Aggregate (Bars) and Ticker News APIs
+MOCK_AGGREGATE_BARS_MAX_LIMIT = 50000
+MOCK_NEWS_MAX_LIMIT = 1000
+
+# --- Mock Server - Data - Parsing the from/to values of an Aggregate (Bars) API path ---
+def parse_mock_range_bound(value: str,
+                           is_end: bool) -> int:
+    """
+    Converts a from/to value of an Aggregate (Bars) API path into a millisecond timestamp.
+
+    Args:
+        value: A date in YYYY-MM-DD format, interpreted in the exchange timezone, or a millisecond timestamp
+        is_end: Setting for whether the value is the end of the range, where a date covers the whole day
+
+    Returns:
+        A millisecond timestamp, exclusive for the end of the range
+    """
+    if value.isdigit():
+        return int(value) + int(is_end)
+
+    date = datetime.date.fromisoformat(value) + datetime.timedelta(days=int(is_end))
+    return int(datetime.datetime.combine(date, datetime.time(), ZoneInfo(EXCHANGE_TIMEZONE)).timestamp() * 1000)
+
+# --- Mock Server - Data - Deterministic synthetic bars of a request ---
+@functools.lru_cache(maxsize=64)
+def generate_mock_aggregate_bars(symbol: str,
+                                 timespan_multiplier: int,
+                                 timespan: str,
+                                 start_ms: int,
+                                 end_ms: int) -> pl.DataFrame:
+    """
+    Generates the synthetic bars of an Aggregate (Bars) API request through the generate_synthetic_aggregate_bars function of the Benchmark_Functions.py file.
+    The bars are seeded by the symbol and range, so that every page of a paginated request is cut from the same bars.
+
+    Args:
+        symbol: The ticker symbol of the stock
+        timespan_multiplier: The size of the aggregate timespan multiplier
+        timespan: The size of the aggregate time window, e.g., day, minute, quarter, year
+        start_ms: The start of the range as a millisecond timestamp, inclusive
+        end_ms: The end of the range as a millisecond timestamp, exclusive
+
+    Returns:
+        A Polars DataFrame in the raw Polygon aggregate bars columns, sorted in ascending order for the "t" column
+    """
+    interval_unit, trading_ms = MOCK_TIMESPAN_INTERVALS[timespan]
+    bar_datetimes = pl.datetime_range(pl.from_epoch(pl.lit(start_ms), time_unit="ms").dt.replace_time_zone("UTC").dt.convert_time_zone(EXCHANGE_TIMEZONE),
+                                      pl.from_epoch(pl.lit(end_ms), time_unit="ms").dt.replace_time_zone("UTC").dt.convert_time_zone(EXCHANGE_TIMEZONE),
+                                      interval=f"{timespan_multiplier}{interval_unit}",
+                                      closed="left",
+                                      time_unit="ms")
+
+    # Markets are closed over the weekend, and intraday bars only exist within the extended trading hours
+    bar_filter = pl.lit(True)
+    if timespan in ("second", "minute", "hour", "day"):
+        bar_filter = bar_datetimes.dt.weekday() <= 5
+    if timespan in ("second", "minute", "hour"):
+        bar_filter = bar_filter & bar_datetimes.dt.hour().is_between(MOCK_EXTENDED_HOURS[0], MOCK_EXTENDED_HOURS[1], closed="left")
+    timestamps = pl.select(bar_datetimes.filter(bar_filter)).to_series()
+
+    symbol_seed = zlib.crc32(symbol.upper().encode())
+    return Benchmark_Functions.generate_synthetic_aggregate_bars(timestamps.dt.epoch(time_unit="ms").to_numpy(),
+                                                                  start_price=50.0 + symbol_seed % 400,
+                                                                  bar_interval_ms=trading_ms * timespan_multiplier,
+                                                                  seed=symbol_seed + start_ms)
+
+# --- Mock Server - Data - Recorded bars from the local Parquet bar store ---
+def load_recorded_aggregate_bars(symbol: str,
+                                 timespan_multiplier: int,
+                                 timespan: str,
+                                 adjusted: str,
+                                 start_ms: int,
+                                 end_ms: int) -> pl.DataFrame | None:
+    """
+    Reads the bars of an Aggregate (Bars) API request from the partition of the bar store of the Storage_Functions.py file.
+
+    Args:
+        symbol: The ticker symbol of the stock
+        timespan_multiplier: The size of the aggregate timespan multiplier
+        timespan: The size of the aggregate time window, e.g., day, minute, quarter, year
+        adjusted: Setting for whether the stock data is adjusted for splits
+        start_ms: The start of the range as a millisecond timestamp, inclusive
+        end_ms: The end of the range as a millisecond timestamp, exclusive
+
+    Returns:
+        A Polars DataFrame in the raw Polygon aggregate bars schema, sorted in ascending order for the "t" column
+        None if the bar store does not hold the partition
+    """
+    bar_files = Storage_Functions.list_store_files(Storage_Functions.bar_store_partition_directory(symbol, timespan, str(timespan_multiplier), adjusted))
+    if len(bar_files) == 0:
+        return None
+
+    return pl.scan_parquet(bar_files) \
+             .filter(pl.col("t").cast(pl.Int64).is_between(start_ms, end_ms, closed="left")) \
+             .unique(subset="t", keep="last", maintain_order=True) \
+             .sort(by="t") \
+             .collect()
+
+# --- Mock Server - Data - Deterministic synthetic news articles of a ticker ---
+@functools.lru_cache(maxsize=64)
+def generate_mock_news_articles(symbol: str,
+                                from_date: datetime.date,
+                                to_date: datetime.date,
+                                articles_per_day: int) -> list:
+    """
+    Generates synthetic articles in the shape of the Ticker News API results, seeded by the symbol and date.
+
+    Args:
+        symbol: The ticker symbol of the stock
+        from_date: The first date with articles, inclusive
+        to_date: The last date with articles, inclusive
+        articles_per_day: The amount of articles published on every date
+
+    Returns:
+        A list of the articles, in ascending order of the "published_utc" value
+    """
+    headlines = ["{symbol} shares move after quarterly earnings",
+                 "Analysts revisit their price targets for {symbol}",
+                 "{symbol} announces a new product line",
+                 "Institutional investors adjust {symbol} positions",
+                 "What the latest macro data means for {symbol}"]
+
+    articles = []
+    date = from_date
+    while date <= to_date:
+        random_generator = random.Random(f"{symbol}|{date.isoformat()}")
+        for article_number in range(articles_per_day):
+            article_id = f"mock-{symbol}-{date.isoformat()}-{article_number}"
+            sentiment = random_generator.choice(["positive", "neutral", "negative"])
+            published_utc = datetime.datetime.combine(date, datetime.time(13), datetime.timezone.utc) + datetime.timedelta(minutes=article_number * 480 // articles_per_day)
+            articles.append({"id": article_id,
+                             "publisher": {"name": "Mock Newswire",
+                                           "homepage_url": "https://mock.example.com/",
+                                           "logo_url": "https://mock.example.com/logo.png",
+                                           "favicon_url": "https://mock.example.com/favicon.ico"},
+                             "title": random_generator.choice(headlines).format(symbol=symbol),
+                             "author": random_generator.choice(["Mock Reporter", "Mock Analyst", "Mock Desk"]),
+                             "published_utc": published_utc.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                             "article_url": f"https://mock.example.com/articles/{article_id}",
+                             "tickers": [symbol],
+                             "image_url": f"https://mock.example.com/images/{article_id}.jpg",
+                             "description": f"Synthetic article {article_number + 1} of {articles_per_day} about {symbol} on {date.isoformat()}.",
+                             "keywords": [symbol, "mock"],
+                             "insights": [{"ticker": symbol,
+                                           "sentiment": sentiment,
+                                           "sentiment_reasoning": f"Synthetic {sentiment} sentiment for {symbol}."}]})
+        date += datetime.timedelta(days=1)
+
+    return articles
+
+# --- Mock Server - HTTP - Request handler of the Aggregate (Bars) and Ticker News endpoints ---
+class MockPolygonRequestHandler(http.server.BaseHTTPRequestHandler):
+    """
+    Routes a GET request to the MockPolygonServer, and writes its response.
+    Speaks HTTP/1.1, so that the pooled keep-alive connections of the clients are reused like with the real API.
+    """
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        url = urllib.parse.urlsplit(self.path)
+        status, headers, body = self.server.handle_polygon_request(url.path, dict(urllib.parse.parse_qsl(url.query)), self.headers.get("Host"))
+
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for header, value in headers.items():
+            self.send_header(header, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug(format, *args)
+
+# --- Mock Server - HTTP - Threaded stand-in for the Polygon API with injectable latency, pagination, and failures ---
+class MockPolygonServer(http.server.ThreadingHTTPServer):
+    """
+    Local stand-in for the Polygon Aggregate (Bars) and Ticker News APIs, serving generated or recorded data.
+    Every request is handled on its own thread, so that concurrent clients, caches, and retries can be load-tested without the network.
+
+    Args:
+        server_address: The (host, port) the server listens on, port 0 picks a free port
+        latency_seconds: The delay added to every response
+        latency_jitter_seconds: The upper bound of a uniformly distributed delay added on top of latency_seconds
+        requests_per_minute: The rate-limit budget of the API key, requests beyond it receive a 429 response. Unlimited if not specified
+        rate_limit_probability: The probability of a 429 response for any request, regardless of the budget
+        server_error_probability: The probability of a 500 response for any request
+        max_page_size: The maximum amount of bars per page, smaller limits of a request are honoured
+        news_articles_per_day: The amount of generated articles per ticker and day
+        serve_recorded_bars: Setting for whether the bars held by the local Parquet bar store are served instead of generated bars
+        recorded_news_path: The path of a JSON file mapping ticker symbols to a list of recorded articles, served instead of generated articles
+        seed: The seed of the random number generator of the injected latency and failures
+    """
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self,
+                 server_address: tuple = ("127.0.0.1", 0),
+                 latency_seconds: float = 0.0,
+                 latency_jitter_seconds: float = 0.0,
+                 requests_per_minute: float = None,
+                 rate_limit_probability: float = 0.0,
+                 server_error_probability: float = 0.0,
+                 max_page_size: int = MOCK_AGGREGATE_BARS_MAX_LIMIT,
+                 news_articles_per_day: int = 4,
+                 serve_recorded_bars: bool = False,
+                 recorded_news_path: str = None,
+                 seed: int = 0):
+        super().__init__(server_address, MockPolygonRequestHandler)
+        self.latency_seconds = latency_seconds
+        self.latency_jitter_seconds = latency_jitter_seconds
+        self.requests_per_minute = requests_per_minute
+        self.rate_limit_probability = rate_limit_probability
+        self.server_error_probability = server_error_probability
+        self.max_page_size = max_page_size
+        self.news_articles_per_day = news_articles_per_day
+        self.serve_recorded_bars = serve_recorded_bars
+
+        self.recorded_news = None
+        if recorded_news_path is not None:
+            with open(recorded_news_path, "r") as recorded_news_file:
+                self.recorded_news = {symbol.upper(): sorted(articles, key=lambda article: article["published_utc"])
+                                      for symbol, articles in json.load(recorded_news_file).items()}
+
+        # Shared between the handler threads
+        self.lock = threading.Lock()
+        self.random_generator = random.Random(seed)
+        self.accepted_request_times = collections.deque()
+        self.request_counts = collections.Counter()
+
+    def handle_error(self, request, client_address):
+        """ Clients that time out close the connection before the injected latency has passed, which is expected rather than an error """
+        if isinstance(sys.exc_info()[1], ConnectionError):
+            logger.debug("Client %s disconnected before the response was written", client_address)
+        else:
+            super().handle_error(request, client_address)
+
+    @property
+    def base_url(self) -> str:
+        """ The base URL of the server, for the POLYGON_API_BASE_URL environment variable """
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def admit_request(self) -> tuple | None:
+        """
+        Applies the injected failures and the requests-per-minute budget to a request.
+
+        Returns:
+            None if the request is admitted, otherwise the (status, headers, body) of the failure response
+        """
+        with self.lock:
+            now = time.monotonic()
+            while self.accepted_request_times and now - self.accepted_request_times[0] >= 60:
+                self.accepted_request_times.popleft()
+
+            if self.random_generator.random() < self.server_error_probability:
+                self.request_counts["server_error"] += 1
+                return 500, {}, json.dumps({"status": "ERROR", "request_id": "mock", "error": "Internal server error"}).encode()
+
+            retry_after = None
+            if self.random_generator.random() < self.rate_limit_probability:
+                retry_after = 1
+            elif self.requests_per_minute is not None and len(self.accepted_request_times) >= self.requests_per_minute:
+                retry_after = max(1, math.ceil(60 - (now - self.accepted_request_times[0])))
+            if retry_after is not None:
+                self.request_counts["rate_limited"] += 1
+                return 429, {"Retry-After": str(retry_after)}, json.dumps({"status": "ERROR",
+                                                                            "request_id": "mock",
+                                                                            "error": "You've exceeded the maximum requests per minute, please wait or upgrade your subscription to continue."}).encode()
+
+            self.accepted_request_times.append(now)
+
+        return None
+
+    def handle_polygon_request(self,
+                               path: str,
+                               query: dict,
+                               host: str) -> tuple:
+        """
+        Builds the response of a request after the injected latency, similar to the Polygon API.
+
+        Args:
+            path: The path of the request URL
+            query: The query parameters of the request URL
+            host: The Host header of the request, used for the next_url of a paginated response
+
+        Returns:
+            A tuple of the status code, a dictionary of extra headers, and the body bytes
+        """
+        time.sleep(self.latency_seconds + self.random_generator.uniform(0, self.latency_jitter_seconds))
+
+        if "apiKey" not in query:
+            with self.lock:
+                self.request_counts["unauthorized"] += 1
+            return 401, {}, json.dumps({"status": "ERROR", "request_id": "mock", "error": "API Key was not provided"}).encode()
+
+        failure_response = self.admit_request()
+        if failure_response is not None:
+            return failure_response
+
+        base_url = f"http://{host}" if host else self.base_url
+        path_segments = path.strip("/").split("/")
+        try:
+            if len(path_segments) == 9 and path_segments[:3] == ["v2", "aggs", "ticker"] and path_segments[4] == "range":
+                response = self.aggregate_bars_response(path_segments, query, base_url + path)
+                endpoint = "aggs"
+            elif path_segments == ["v2", "reference", "news"]:
+                response = self.ticker_news_response(query, base_url + path)
+                endpoint = "news"
+            else:
+                response = 404, {}, json.dumps({"status": "NOT_FOUND", "request_id": "mock", "message": "Route not found"}).encode()
+                endpoint = "not_found"
+        except (KeyError, ValueError) as error:
+            response = 400, {}, json.dumps({"status": "ERROR", "request_id": "mock", "error": f"Could not parse the request: {error}"}).encode()
+            endpoint = "bad_request"
+
+        with self.lock:
+            self.request_counts[endpoint] += 1
+
+        return response
+
+    def next_page_url(self,
+                      url: str,
+                      query: dict,
+                      cursor: int) -> str:
+        """ Builds the next_url of a paginated response, which does not include the API key similar to the Polygon API """
+        next_query = {key: value for key, value in query.items() if key != "apiKey"}
+        next_query["cursor"] = str(cursor)
+        return f"{url}?{urllib.parse.urlencode(next_query)}"
+
+    def aggregate_bars_response(self,
+                                path_segments: list,
+                                query: dict,
+                                url: str) -> tuple:
+        """ Builds a page of an /v2/aggs/ticker/{symbol}/range/{multiplier}/{timespan}/{from}/{to} response """
+        symbol, timespan_multiplier, timespan = path_segments[3].upper(), int(path_segments[5]), path_segments[6]
+        if timespan not in MOCK_TIMESPAN_INTERVALS:
+            raise ValueError(f"unknown timespan {timespan}")
+        adjusted = query.get("adjusted", "true")
+        start_ms = parse_mock_range_bound(path_segments[7], is_end=False)
+        end_ms = parse_mock_range_bound(path_segments[8], is_end=True)
+
+        bars = load_recorded_aggregate_bars(symbol, timespan_multiplier, timespan, adjusted, start_ms, end_ms) if self.serve_recorded_bars else None
+        if bars is None:
+            bars = generate_mock_aggregate_bars(symbol, timespan_multiplier, timespan, start_ms, end_ms)
+        if query.get("sort", "asc") == "desc":
+            bars = bars.reverse()
+
+        cursor = int(query.get("cursor", 0))
+        page_size = min(int(query.get("limit", 5000)), self.max_page_size)
+        page_bars = bars.slice(cursor, page_size)
+
+        metadata = {"ticker": symbol,
+                    "queryCount": page_bars.height,
+                    "resultsCount": page_bars.height,
+                    "adjusted": adjusted == "true",
+                    "status": "OK",
+                    "request_id": "mock"}
+        if cursor + page_size < bars.height:
+            metadata["next_url"] = self.next_page_url(url, query, cursor + page_size)
+
+        # Similar to the API, the "results" object is missing when the page does not contain any bars
+        if page_bars.height == 0:
+            return 200, {}, json.dumps(metadata).encode()
+
+        return 200, {}, Benchmark_Functions.serialize_aggregate_bars_payload(page_bars, metadata)
+
+    def ticker_news_response(self,
+                             query: dict,
+                             url: str) -> tuple:
+        """ Builds a page of a /v2/reference/news response, filtered on the published_utc.gte, .gt, .lte, and .lt parameters """
+        symbol = query["ticker"].upper()
+
+        # Dates cover the whole day, so that they compare correctly against the published_utc timestamps
+        published_bounds = {}
+        for operator in ("gte", "gt", "lte", "lt"):
+            value = query.get(f"published_utc.{operator}")
+            if value is not None and len(value) == 10:
+                value += "T00:00:00Z" if operator in ("gte", "lt") else "T23:59:59Z"
+            published_bounds[operator] = value
+
+        if self.recorded_news is not None:
+            articles = self.recorded_news.get(symbol, [])
+        else:
+            # Articles are only published up to the current time
+            now = datetime.datetime.now(datetime.timezone.utc)
+            published_bounds["lte"] = min(published_bounds["lte"] or "9999", now.strftime("%Y-%m-%dT%H:%M:%SZ"))
+            published_from = published_bounds["gte"] or published_bounds["gt"]
+            published_to = published_bounds["lt"] or published_bounds["lte"]
+            from_date = datetime.date.fromisoformat(published_from[:10]) if published_from else now.date() - datetime.timedelta(days=30)
+            to_date = min(datetime.date.fromisoformat(published_to[:10]), now.date())
+            articles = generate_mock_news_articles(symbol, from_date, to_date, self.news_articles_per_day)
+
+        articles = [article for article in articles
+                    if (published_bounds["gte"] is None or article["published_utc"] >= published_bounds["gte"])
+                    and (published_bounds["gt"] is None or article["published_utc"] > published_bounds["gt"])
+                    and (published_bounds["lte"] is None or article["published_utc"] <= published_bounds["lte"])
+                    and (published_bounds["lt"] is None or article["published_utc"] < published_bounds["lt"])]
+
+        if query.get("order", "desc") == "desc":
+            articles = articles[::-1]
+
+        cursor = int(query.get("cursor", 0))
+        page_size = min(int(query.get("limit", 10)), MOCK_NEWS_MAX_LIMIT)
+        response = {"results": articles[cursor:cursor + page_size],
+                    "status": "OK",
+                    "request_id": "mock",
+                    "count": len(articles[cursor:cursor + page_size])}
+        if cursor + page_size < len(articles):
+            response["next_url"] = self.next_page_url(url, query, cursor + page_size)
+
+        return 200, {}, json.dumps(response).encode()
+
+# --- Mock Server - Lifecycle - Serving from a background thread ---
+def start_mock_polygon_server(host: str = "127.0.0.1",
+                              port: int = 0,
+                              **server_settings) -> MockPolygonServer:
+    """
+    Starts a MockPolygonServer on a daemon thread.
+
+    Args:
+        host: The host the server listens on
+        port: The port the server listens on, 0 picks a free port
+        server_settings: The keyword arguments of the MockPolygonServer, e.g., latency_seconds or requests_per_minute
+
+    Returns:
+        The running MockPolygonServer, stopped through its shutdown() function
+    """
+    server = MockPolygonServer((host, port), **server_settings)
+    threading.Thread(target=server.serve_forever, name="mock-polygon-server", daemon=True).start()
+    logger.info("Mock Polygon server listening on %s", server.base_url)
+
+    return server
+
+@contextlib.contextmanager
+def mock_polygon_api(api_key: str = "mock",
+                     **server_settings):
+    """
+    Points the API_Functions.py file at a freshly started MockPolygonServer for the duration of the context.
+    The POLYGON_API_BASE_URL and POLYGON_API_KEY environment variables are restored afterwards.
+
+    Args:
+        api_key: The API key sent to the mock server
+        server_settings: The keyword arguments of the MockPolygonServer, e.g., latency_seconds or requests_per_minute
+
+    Yields:
+        The running MockPolygonServer, e.g., for its request_counts
+    """
+    previous_environment = {name: os.environ.get(name) for name in ("POLYGON_API_BASE_URL", "POLYGON_API_KEY")}
+    server = start_mock_polygon_server(**server_settings)
+    os.environ["POLYGON_API_BASE_URL"] = server.base_url
+    os.environ["POLYGON_API_KEY"] = api_key
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+        for name, value in previous_environment.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+if __name__ == "__main__":
+    argument_parser = argparse.ArgumentParser(description="Serves a local stand-in for the Polygon Aggregate (Bars) and Ticker News APIs")
+    argument_parser.add_argument("--host", default="127.0.0.1")
+    argument_parser.add_argument("--port", type=int, default=8000)
+    argument_parser.add_argument("--latency", type=float, default=0.0, help="Delay added to every response, in seconds")
+    argument_parser.add_argument("--latency-jitter", type=float, default=0.0, help="Upper bound of the random delay added on top, in seconds")
+    argument_parser.add_argument("--requests-per-minute", type=float, default=None, help="Rate-limit budget, requests beyond it receive a 429 response")
+    argument_parser.add_argument("--rate-limit-probability", type=float, default=0.0, help="Probability of a 429 response for any request")
+    argument_parser.add_argument("--server-error-probability", type=float, default=0.0, help="Probability of a 500 response for any request")
+    argument_parser.add_argument("--max-page-size", type=int, default=MOCK_AGGREGATE_BARS_MAX_LIMIT, help="Maximum amount of bars per page")
+    argument_parser.add_argument("--recorded-bars", action="store_true", help="Serve the bars held by the local Parquet bar store")
+    argument_parser.add_argument("--recorded-news", default=None, help="JSON file mapping ticker symbols to recorded articles")
+    arguments = argument_parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    server = MockPolygonServer((arguments.host, arguments.port),
+                               latency_seconds=arguments.latency,
+                               latency_jitter_seconds=arguments.latency_jitter,
+                               requests_per_minute=arguments.requests_per_minute,
+                               rate_limit_probability=arguments.rate_limit_probability,
+                               server_error_probability=arguments.server_error_probability,
+                               max_page_size=arguments.max_page_size,
+                               serve_recorded_bars=arguments.recorded_bars,
+                               recorded_news_path=arguments.recorded_news)
+    logger.info("Mock Polygon server listening on %s, run the app with POLYGON_API_BASE_URL=%s POLYGON_API_KEY=mock", server.base_url, server.base_url)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
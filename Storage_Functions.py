@@ -0,0 +1,604 @@
+# --- Imports ---
+# Core
+import os
+import json
+import time
+import threading
+import datetime
+from zoneinfo import ZoneInfo
+import polars as pl
+
+# Functions
+import API_Functions
+
+# --- Bar Store - Configs ---
+# Root directory of the local Parquet bar store, can be overridden through an environment variable
+BAR_STORE_DIRECTORY = os.environ.get("PROJECT_STONKS_BAR_STORE_DIRECTORY", ".bar_store")
+
+# Polygon aggregates interpret the from/to dates in the exchange timezone
+EXCHANGE_TIMEZONE = "America/New_York"
+
+# Number of Parquet files in a single partition before they are compacted into one file
+BAR_STORE_COMPACTION_THRESHOLD = 16
+
+# Minimum time between two retrievals of the bars of the current trading day, which are still being formed
+BAR_STORE_REFRESH_SECONDS = 900
+
+# Writes to a partition are serialized within the process, as multiple Streamlit sessions may be filling the same partition
+# Every partition has its own lock, so that a slow write of one partition never blocks the other partitions
+bar_store_partition_locks = {}
+bar_store_partition_locks_lock = threading.Lock()
+
+# Retries of a read of a partition whose files were removed by a concurrent compaction, the files are listed again before every retry
+STORE_READ_RETRIES = 3
+
+# --- Bar Store - Partitioning - Directory for a (symbol, timespan, multiplier, adjusted) key ---
+def bar_store_partition_directory(symbol: str,
+                                  timespan: str,
+                                  timespan_multiplier: str,
+                                  adjusted: str) -> str:
+    """
+    Builds the directory of the bar store partition for a specific set of aggregate settings.
+    Uses a hive-style layout so that the partitions are readable by any Parquet tooling.
+
+    Args:
+        symbol: The ticker symbol of the stock
+        timespan: The size of the aggregate time window, e.g., day, minute, quarter, year
+        timespan_multiplier: The size of the aggregate timespan multiplier
+        adjusted: Setting for whether the stock data is adjusted for splits
+
+    Returns:
+        The path of the partition directory
+    """
+    return os.path.join(BAR_STORE_DIRECTORY,
+                        f"symbol={symbol.upper()}",
+                        f"timespan={timespan}",
+                        f"multiplier={timespan_multiplier}",
+                        f"adjusted={str(adjusted).lower()}")
+
+# --- Bar Store - Partitioning - Write lock of a partition ---
+def bar_store_partition_lock(partition_directory: str) -> threading.Lock:
+    """
+    Gets the write lock of a bar store partition, creating it on first use.
+
+    Args:
+        partition_directory: The path of the partition directory
+
+    Returns:
+        The threading.Lock that serializes the writes to the partition within the process
+    """
+    with bar_store_partition_locks_lock:
+        return bar_store_partition_locks.setdefault(partition_directory, threading.Lock())
+
+# --- Bar Store - Coverage - Reading and writing the date ranges already held by a partition ---
+def read_bar_store_coverage(partition_directory: str) -> list:
+    """
+    Reads the coverage manifest of a partition.
+
+    Args:
+        partition_directory: The path of the partition directory
+
+    Returns:
+        A sorted list of inclusive (from_date, to_date) tuples of datetime.date objects that are held on disk
+    """
+    coverage_path = os.path.join(partition_directory, "_coverage.json")
+    if not os.path.exists(coverage_path):
+        return []
+
+    with open(coverage_path, "r") as coverage_file:
+        coverage = json.load(coverage_file)
+
+    return [(datetime.date.fromisoformat(start), datetime.date.fromisoformat(end)) for start, end in coverage]
+
+def merge_date_ranges(coverage: list) -> list:
+    """
+    Merges overlapping and adjacent date ranges.
+
+    Args:
+        coverage: A list of inclusive (from_date, to_date) tuples of datetime.date objects
+
+    Returns:
+        A sorted list of non-overlapping and non-adjacent inclusive (from_date, to_date) tuples
+    """
+    merged_coverage = []
+    for start, end in sorted(coverage):
+        if merged_coverage and start <= merged_coverage[-1][1] + datetime.timedelta(days=1):
+            merged_coverage[-1] = (merged_coverage[-1][0], max(merged_coverage[-1][1], end))
+        else:
+            merged_coverage.append((start, end))
+
+    return merged_coverage
+
+def write_bar_store_coverage(partition_directory: str,
+                             coverage: list):
+    """
+    Merges overlapping and adjacent date ranges, and writes the coverage manifest of a partition to disk.
+
+    Args:
+        partition_directory: The path of the partition directory
+        coverage: A list of inclusive (from_date, to_date) tuples of datetime.date objects
+    """
+    # Write to a temporary file first so that a crashed write never leaves a corrupted manifest behind
+    coverage_path = os.path.join(partition_directory, "_coverage.json")
+    with open(coverage_path + ".tmp", "w") as coverage_file:
+        json.dump([[start.isoformat(), end.isoformat()] for start, end in merge_date_ranges(coverage)], coverage_file)
+    os.replace(coverage_path + ".tmp", coverage_path)
+
+def read_bar_store_refreshed_at(partition_directory: str) -> float | None:
+    """
+    Reads the time of the last retrieval of the bars of the current trading day of a partition.
+
+    Args:
+        partition_directory: The path of the partition directory
+
+    Returns:
+        The time of the last retrieval in seconds since the epoch, or None if the current trading day was never retrieved
+    """
+    refresh_path = os.path.join(partition_directory, "_refresh.json")
+    if not os.path.exists(refresh_path):
+        return None
+
+    with open(refresh_path, "r") as refresh_file:
+        return json.load(refresh_file)["refreshed_at"]
+
+def write_bar_store_refreshed_at(partition_directory: str,
+                                 refreshed_at: float):
+    """
+    Writes the time of the last retrieval of the bars of the current trading day of a partition to disk.
+
+    Args:
+        partition_directory: The path of the partition directory
+        refreshed_at: The time of the retrieval in seconds since the epoch
+    """
+    refresh_path = os.path.join(partition_directory, "_refresh.json")
+    with open(refresh_path + ".tmp", "w") as refresh_file:
+        json.dump({"refreshed_at": refreshed_at}, refresh_file)
+    os.replace(refresh_path + ".tmp", refresh_path)
+
+def find_missing_date_ranges(coverage: list,
+                             from_date: datetime.date,
+                             to_date: datetime.date) -> list:
+    """
+    Finds the date gaps within the requested range that are not held by the bar or news store.
+
+    Args:
+        coverage: A sorted list of inclusive (from_date, to_date) tuples held on disk
+        from_date: The start date of the requested range, inclusive
+        to_date: The end date of the requested range, inclusive
+
+    Returns:
+        A list of inclusive (from_date, to_date) tuples that have to be retrieved from the API
+    """
+    missing_date_ranges = []
+    cursor = from_date
+    for start, end in coverage:
+        if end < cursor:
+            continue
+        if start > to_date:
+            break
+        if start > cursor:
+            missing_date_ranges.append((cursor, start - datetime.timedelta(days=1)))
+        cursor = max(cursor, end + datetime.timedelta(days=1))
+
+    if cursor <= to_date:
+        missing_date_ranges.append((cursor, to_date))
+
+    return missing_date_ranges
+
+# --- Bar Store - Files - Listing the Parquet files of a bar or news store partition in the order they were written ---
+def list_store_files(partition_directory: str) -> list:
+    """
+    Lists the Parquet files of a partition, oldest first.
+    File names are prefixed with the nanosecond timestamp of the write, so that a lexical sort is also a chronological sort.
+
+    Args:
+        partition_directory: The path of the partition directory
+
+    Returns:
+        A list of the paths of the Parquet files within the partition
+    """
+    if not os.path.isdir(partition_directory):
+        return []
+
+    return sorted(os.path.join(partition_directory, file_name) for file_name in os.listdir(partition_directory) if file_name.endswith(".parquet"))
+
+# --- Bar Store - Files - Reading a bar or news store partition while it may be compacted ---
+def retry_on_store_compaction(read_function):
+    """
+    Calls a function that lists and reads the Parquet files of a partition outside of the write lock, and calls it again if one of the files was removed in between.
+    A concurrent compaction removes every file it has merged, while the merged file already holds their rows, so listing the files again is enough.
+
+    Args:
+        read_function: A function without arguments that lists the files of the partition through list_store_files, and reads them
+
+    Returns:
+        The return value of read_function
+
+    Raises:
+        FileNotFoundError: If the files were removed on every one of the STORE_READ_RETRIES retries
+    """
+    for attempt in range(STORE_READ_RETRIES + 1):
+        try:
+            return read_function()
+        except FileNotFoundError:
+            if attempt == STORE_READ_RETRIES:
+                raise
+
+# --- Bar Store - Writing - Persisting the retrieved bars of a gap to the partition ---
+def write_bars_to_store(partition_directory: str,
+                        bars_dataframe: pl.DataFrame,
+                        from_date: datetime.date,
+                        to_date: datetime.date):
+    """
+    Writes a Polars DataFrame of raw aggregate bars to a new Parquet file in the partition.
+    Compacts the partition into a single de-duplicated file once it holds too many files.
+
+    Args:
+        partition_directory: The path of the partition directory
+        bars_dataframe: A Polars DataFrame in the raw Polygon aggregate bars schema
+        from_date: The start date of the range covered by the bars, inclusive
+        to_date: The end date of the range covered by the bars, inclusive
+    """
+    os.makedirs(partition_directory, exist_ok=True)
+
+    if bars_dataframe.height > 0:
+        bars_path = os.path.join(partition_directory, f"bars_{time.time_ns()}_{from_date.isoformat()}_{to_date.isoformat()}.parquet")
+        bars_dataframe.write_parquet(bars_path + ".tmp")
+        os.replace(bars_path + ".tmp", bars_path)
+
+    bar_files = list_store_files(partition_directory)
+    if len(bar_files) > BAR_STORE_COMPACTION_THRESHOLD:
+        compacted_bars = pl.scan_parquet(bar_files) \
+                           .unique(subset="t", keep="last", maintain_order=True) \
+                           .sort(by="t") \
+                           .collect()
+        compacted_path = os.path.join(partition_directory, f"bars_{time.time_ns()}_compacted.parquet")
+        compacted_bars.write_parquet(compacted_path + ".tmp")
+        os.replace(compacted_path + ".tmp", compacted_path)
+        for bar_file in bar_files:
+            os.remove(bar_file)
+
+# --- Bar Store - Reading - Serving the aggregate bars of a date range, retrieving only the missing gaps ---
+def load_aggregate_bars_from_store(symbol: str,
+                                   timespan: str,
+                                   timespan_multiplier: str,
+                                   from_date: str,
+                                   to_date: str,
+                                   adjusted: str,
+                                   limit: str,
+                                   lazy: bool = False,
+                                   refresh_seconds: float = BAR_STORE_REFRESH_SECONDS) -> pl.DataFrame | pl.LazyFrame:
+    """
+    Serves the aggregate bars for a user-specified stock from the local Parquet bar store.
+    Only the date gaps that are not yet held on disk are retrieved through the uncached fetch_aggregate_data_for_stock function of the API_Functions.py file.
+    The current trading day is never marked as covered, as its bars are still being formed, and it is retrieved at most once per refresh_seconds.
+    Only timespans whose aggregate windows stay within a single day are supported, as the windows of larger timespans depend on the start of the requested range.
+
+    Args:
+        symbol: The ticker symbol of the stock to download
+        timespan: The size of the aggregate time window, i.e., second, minute, hour, day
+        timespan_multiplier: The size of the aggregate timespan multiplier, which has to be 1 for the day timespan
+        from_date: The start date for the stock data that will be retrieved in YYYY-MM-DD format
+        to_date: The end date for the stock data that will be retrieved in YYYY-MM-DD format
+        adjusted: Setting for whether the stock data will be adjusted for splits
+        limit: The total amount (in rows) of data before aggregation that a single API call will be limited to, further pages are followed by the API call
+        lazy: Setting for whether the bars are returned as a lazy scan of the Parquet files, instead of being read into memory
+        refresh_seconds: The minimum time between two retrievals of the bars of the current trading day
+
+    Returns:
+        A Polars DataFrame in the raw Polygon aggregate bars schema, sorted in ascending order for the "t" column
+        A Polars LazyFrame of the same query if lazy is set, which is not checked for being empty.
+        Its files are only read once it is collected, so the caller collects it within retry_on_store_compaction
+
+    Raises:
+        ValueError: If the aggregate windows of the timespan do not stay within a single day
+        KeyError: If the API responds with an error, or no bars exist for the requested settings, similar to a missing "results" object
+    """
+    if not API_Functions.aggregate_window_fits_within_day(timespan, timespan_multiplier):
+        raise ValueError(f"The bar store does not support {timespan_multiplier} {timespan} bars, retrieve them directly from the API instead")
+
+    from_date = datetime.date.fromisoformat(from_date)
+    to_date = datetime.date.fromisoformat(to_date)
+    partition_directory = bar_store_partition_directory(symbol, timespan, timespan_multiplier, adjusted)
+    last_completed_date = datetime.datetime.now(ZoneInfo(EXCHANGE_TIMEZONE)).date() - datetime.timedelta(days=1)
+
+    # The gaps are retrieved outside of the partition lock, so a slow retrieval never blocks the readers and writers of the partition
+    for gap_from_date, gap_to_date in find_missing_date_ranges(read_bar_store_coverage(partition_directory), from_date, to_date):
+        refreshed_at = read_bar_store_refreshed_at(partition_directory)
+        if gap_from_date > last_completed_date and refreshed_at is not None and time.time() - refreshed_at < refresh_seconds:
+            continue
+
+        retrieved_at = time.time()
+        json_data = API_Functions.fetch_aggregate_data_for_stock(symbol, timespan, timespan_multiplier, gap_from_date.isoformat(), gap_to_date.isoformat(), adjusted, "asc", limit)
+        if json_data.get("status") not in ("OK", "DELAYED"):
+            raise KeyError("results")
+
+        gap_bars = json_data.get("results", pl.DataFrame(schema=API_Functions.POLYGON_AGGREGATE_BARS_SCHEMA))
+        covered_to_date = min(gap_to_date, last_completed_date)
+
+        with bar_store_partition_lock(partition_directory):
+            # Another session may have filled the gap, or refreshed the current trading day, while this one was retrieving it
+            coverage = read_bar_store_coverage(partition_directory)
+            refreshed_at = read_bar_store_refreshed_at(partition_directory)
+            if len(find_missing_date_ranges(coverage, gap_from_date, covered_to_date)) == 0 and \
+               (gap_to_date <= last_completed_date or (refreshed_at is not None and refreshed_at >= retrieved_at)):
+                continue
+
+            write_bars_to_store(partition_directory, gap_bars, gap_from_date, gap_to_date)
+            if covered_to_date >= gap_from_date:
+                coverage.append((gap_from_date, covered_to_date))
+                write_bar_store_coverage(partition_directory, coverage)
+            if gap_to_date > last_completed_date:
+                write_bar_store_refreshed_at(partition_directory, retrieved_at)
+
+    # Bars of a still-forming trading day may be held by more than one file, keep the latest retrieval
+    bars_date = pl.from_epoch(pl.col("t").cast(pl.Int64), time_unit="ms") \
+                  .dt.replace_time_zone("UTC") \
+                  .dt.convert_time_zone(EXCHANGE_TIMEZONE) \
+                  .dt.date()
+
+    def read_bars() -> pl.DataFrame | pl.LazyFrame:
+        bar_files = list_store_files(partition_directory)
+        if len(bar_files) == 0:
+            raise KeyError("results")
+
+        bars_lazyframe = pl.scan_parquet(bar_files) \
+                           .filter(bars_date.is_between(from_date, to_date)) \
+                           .unique(subset="t", keep="last", maintain_order=True) \
+                           .sort(by="t")
+        return bars_lazyframe if lazy else bars_lazyframe.collect()
+
+    # Files are read outside of the partition lock, so a concurrent compaction may remove a listed file before it is read
+    if lazy:
+        return read_bars()
+
+    bars_dataframe = retry_on_store_compaction(read_bars)
+    if bars_dataframe.height == 0:
+        raise KeyError("results")
+
+    return bars_dataframe
+
+# --- News Store - Configs ---
+# Root directory of the local Parquet news store, can be overridden through an environment variable
+NEWS_STORE_DIRECTORY = os.environ.get("PROJECT_STONKS_NEWS_STORE_DIRECTORY", ".news_store")
+
+# Minimum time between two retrievals of the articles of the current UTC day, which are still being published
+NEWS_STORE_REFRESH_SECONDS = 900
+
+# Number of Parquet files in a single partition before they are compacted into one file
+NEWS_STORE_COMPACTION_THRESHOLD = 16
+
+# Datatypes of the flattened articles, the nested publisher and insights objects are unpacked into columns at ingest time
+NEWS_ARTICLE_SCHEMA = {"id": pl.String,
+                       "ticker": pl.String,
+                       "published_utc": pl.Datetime("ms", "UTC"),
+                       "title": pl.String,
+                       "author": pl.String,
+                       "description": pl.String,
+                       "article_url": pl.String,
+                       "amp_url": pl.String,
+                       "image_url": pl.String,
+                       "publisher_name": pl.String,
+                       "publisher_homepage_url": pl.String,
+                       "publisher_logo_url": pl.String,
+                       "publisher_favicon_url": pl.String,
+                       "tickers": pl.List(pl.String),
+                       "keywords": pl.List(pl.String),
+                       "sentiment": pl.String,
+                       "sentiment_reasoning": pl.String}
+
+news_store_write_lock = threading.Lock()
+
+# --- News Store - Partitioning - Directory for a ticker ---
+def news_store_partition_directory(symbol: str) -> str:
+    """
+    Builds the directory of the news store partition of a ticker, in the same hive-style layout as the bar store.
+
+    Args:
+        symbol: The ticker symbol of the stock
+
+    Returns:
+        The path of the partition directory
+    """
+    return os.path.join(NEWS_STORE_DIRECTORY, f"ticker={symbol.upper()}")
+
+# --- News Store - State - Reading and writing the covered date ranges and the water mark of a partition ---
+def read_news_store_state(partition_directory: str) -> dict:
+    """
+    Reads the state manifest of a news store partition.
+
+    Args:
+        partition_directory: The path of the partition directory
+
+    Returns:
+        A dictionary with the "coverage" sorted list of inclusive (from_date, to_date) tuples of the completed UTC days of which every article is held,
+        the "high_water_mark" published_utc of the newest article held, and the "refreshed_at" unix time of the last retrieval of the articles of the current UTC day.
+        The coverage is empty, and every other value is None, for a new partition
+    """
+    state_path = os.path.join(partition_directory, "_state.json")
+    if not os.path.exists(state_path):
+        return {"coverage": [], "high_water_mark": None, "refreshed_at": None}
+
+    with open(state_path, "r") as state_file:
+        state = json.load(state_file)
+
+    # Manifests written before the coverage was tracked hold no coverage, their articles are retrieved again and de-duplicated on their id
+    return {"coverage": [(datetime.date.fromisoformat(start), datetime.date.fromisoformat(end)) for start, end in state.get("coverage", [])],
+            "high_water_mark": state.get("high_water_mark"),
+            "refreshed_at": state.get("refreshed_at")}
+
+def write_news_store_state(partition_directory: str,
+                           state: dict):
+    """
+    Merges the overlapping and adjacent covered date ranges, and writes the state manifest of a news store partition to disk.
+
+    Args:
+        partition_directory: The path of the partition directory
+        state: A dictionary in the format of the read_news_store_state function
+    """
+    os.makedirs(partition_directory, exist_ok=True)
+
+    # Write to a temporary file first so that a crashed write never leaves a corrupted manifest behind
+    state_path = os.path.join(partition_directory, "_state.json")
+    with open(state_path + ".tmp", "w") as state_file:
+        json.dump({**state, "coverage": [[start.isoformat(), end.isoformat()] for start, end in merge_date_ranges(state["coverage"])]}, state_file)
+    os.replace(state_path + ".tmp", state_path)
+
+# --- News Store - Ingest - Flattening the nested articles of the Ticker News API ---
+def flatten_news_articles(symbol: str,
+                          articles: list) -> pl.DataFrame:
+    """
+    Flattens the nested articles of the Ticker News API into the NEWS_ARTICLE_SCHEMA columns.
+    Only the insight about the ticker itself is kept, as an article may hold insights about several tickers.
+
+    Args:
+        symbol: The ticker symbol the articles were retrieved for
+        articles: A list of the articles in the nested JSON format of the API
+
+    Returns:
+        A Polars DataFrame in the NEWS_ARTICLE_SCHEMA datatypes
+    """
+    symbol = symbol.upper()
+
+    flattened_articles = []
+    for article in articles:
+        publisher = article.get("publisher") or {}
+        insight = next((insight for insight in article.get("insights") or [] if insight.get("ticker") == symbol), {})
+        flattened_articles.append({"id": article["id"],
+                                   "ticker": symbol,
+                                   "published_utc": article["published_utc"],
+                                   "title": article.get("title"),
+                                   "author": article.get("author"),
+                                   "description": article.get("description"),
+                                   "article_url": article.get("article_url"),
+                                   "amp_url": article.get("amp_url"),
+                                   "image_url": article.get("image_url"),
+                                   "publisher_name": publisher.get("name"),
+                                   "publisher_homepage_url": publisher.get("homepage_url"),
+                                   "publisher_logo_url": publisher.get("logo_url"),
+                                   "publisher_favicon_url": publisher.get("favicon_url"),
+                                   "tickers": article.get("tickers"),
+                                   "keywords": article.get("keywords"),
+                                   "sentiment": insight.get("sentiment"),
+                                   "sentiment_reasoning": insight.get("sentiment_reasoning")})
+
+    return pl.DataFrame(flattened_articles, schema={**NEWS_ARTICLE_SCHEMA, "published_utc": pl.String}) \
+             .with_columns(pl.col("published_utc").str.to_datetime(time_unit="ms", time_zone="UTC"))
+
+# --- News Store - Writing - Persisting the retrieved articles to the partition ---
+def write_news_articles_to_store(partition_directory: str,
+                                 articles_dataframe: pl.DataFrame):
+    """
+    Writes a Polars DataFrame of flattened articles to a new Parquet file in the partition.
+    Compacts the partition into a single de-duplicated file once it holds too many files.
+
+    Args:
+        partition_directory: The path of the partition directory
+        articles_dataframe: A Polars DataFrame in the NEWS_ARTICLE_SCHEMA datatypes
+    """
+    os.makedirs(partition_directory, exist_ok=True)
+
+    if articles_dataframe.height > 0:
+        articles_path = os.path.join(partition_directory, f"articles_{time.time_ns()}.parquet")
+        articles_dataframe.write_parquet(articles_path + ".tmp")
+        os.replace(articles_path + ".tmp", articles_path)
+
+    article_files = list_store_files(partition_directory)
+    if len(article_files) > NEWS_STORE_COMPACTION_THRESHOLD:
+        compacted_articles = pl.scan_parquet(article_files) \
+                               .unique(subset="id", keep="last", maintain_order=True) \
+                               .sort(by=["published_utc", "id"]) \
+                               .collect()
+        compacted_path = os.path.join(partition_directory, f"articles_{time.time_ns()}_compacted.parquet")
+        compacted_articles.write_parquet(compacted_path + ".tmp")
+        os.replace(compacted_path + ".tmp", compacted_path)
+        for article_file in article_files:
+            os.remove(article_file)
+
+def ingest_news_articles(symbol: str,
+                         partition_directory: str,
+                         state: dict,
+                         published_utc_gte: str = None,
+                         published_utc_lt: str = None):
+    """
+    Retrieves the articles of a published_utc range through the retrieve_news_pages_for_stock function of the API_Functions.py file, and writes them to the partition.
+    Raises the high-water mark of the state to the newest article retrieved, the state is not written to disk.
+
+    Args:
+        symbol: The ticker symbol of the stock
+        partition_directory: The path of the partition directory
+        state: A dictionary in the format of the read_news_store_state function
+        published_utc_gte: The earliest published_utc of the articles, inclusive. Unbounded if not specified
+        published_utc_lt: The latest published_utc of the articles, exclusive. Unbounded if not specified
+    """
+    articles = API_Functions.retrieve_news_pages_for_stock(symbol, published_utc_gte, published_utc_lt)
+    write_news_articles_to_store(partition_directory, flatten_news_articles(symbol, articles))
+
+    if len(articles) > 0:
+        newest_published_utc = max(article["published_utc"] for article in articles)
+        state["high_water_mark"] = max(state["high_water_mark"] or newest_published_utc, newest_published_utc)
+
+# --- News Store - Reading - Serving the articles of a date range, retrieving only the days that are not held yet ---
+def load_news_from_store(symbol: str,
+                         from_date: str,
+                         to_date: str,
+                         article_limit: int = 10,
+                         refresh_seconds: float = NEWS_STORE_REFRESH_SECONDS) -> pl.DataFrame:
+    """
+    Serves the news articles of a stock from the local Parquet news store, indexed by (ticker, published_utc, id).
+    Only the UTC days of the requested range that are not covered by the store yet are retrieved, each gap bounded by its own from and to dates, similar to the bar store.
+    The current UTC day is never marked as covered, as articles are still being published, and its articles newer than the high-water mark are retrieved at most once per refresh_seconds.
+    Every other call is a local query, so that Streamlit reruns do not call the API.
+
+    Args:
+        symbol: The ticker symbol of the stock news articles that will be retrieved
+        from_date: The start date of the articles in YYYY-MM-DD format, inclusive
+        to_date: The end date of the articles in YYYY-MM-DD format, inclusive
+        article_limit: The maximum amount of articles returned, the most recent first
+        refresh_seconds: The minimum time between two retrievals of the articles of the current UTC day
+
+    Returns:
+        A Polars DataFrame in the NEWS_ARTICLE_SCHEMA datatypes, sorted in descending order for the "published_utc" column
+
+    Raises:
+        KeyError: If the API responds with an error, similar to a missing "results" object
+    """
+    from_date = datetime.date.fromisoformat(from_date)
+    to_date = datetime.date.fromisoformat(to_date)
+    partition_directory = news_store_partition_directory(symbol)
+    current_date = datetime.datetime.now(datetime.timezone.utc).date()
+
+    with news_store_write_lock:
+        state = read_news_store_state(partition_directory)
+        for gap_from_date, gap_to_date in find_missing_date_ranges(state["coverage"], from_date, to_date):
+            if gap_to_date >= current_date:
+                if gap_from_date >= current_date and state["refreshed_at"] is not None and time.time() - state["refreshed_at"] < refresh_seconds:
+                    continue
+                state["refreshed_at"] = time.time()
+
+            # Articles of the current UTC day that are held already are skipped through the high-water mark,
+            # articles published within the same second as it are retrieved again, and de-duplicated on their id
+            published_utc_gte = gap_from_date.isoformat()
+            if gap_from_date >= current_date and state["high_water_mark"] is not None and state["high_water_mark"] > published_utc_gte:
+                published_utc_gte = state["high_water_mark"]
+
+            ingest_news_articles(symbol, partition_directory, state, published_utc_gte, (gap_to_date + datetime.timedelta(days=1)).isoformat())
+            covered_to_date = min(gap_to_date, current_date - datetime.timedelta(days=1))
+            if covered_to_date >= gap_from_date:
+                state["coverage"].append((gap_from_date, covered_to_date))
+            write_news_store_state(partition_directory, state)
+
+    def read_articles() -> pl.DataFrame:
+        article_files = list_store_files(partition_directory)
+        if len(article_files) == 0:
+            return pl.DataFrame(schema=NEWS_ARTICLE_SCHEMA)
+
+        return pl.scan_parquet(article_files) \
+                 .filter(pl.col("published_utc").dt.date().is_between(from_date, to_date)) \
+                 .unique(subset="id", keep="last") \
+                 .sort(by=["published_utc", "id"], descending=True) \
+                 .head(article_limit) \
+                 .collect()
+
+    # Files are read outside of the write lock, so a concurrent compaction may remove a listed file before it is read
+    return retry_on_store_compaction(read_articles)
@@ -2,6 +2,56 @@
 # Core
 import polars as pl
 import numpy as np
+import math
+
+# --- Polars - Technical Indicator (TI) - Expressions - Composable building blocks for a single lazy query plan ---
+def ti_returns_expression(column_name: str = "close") -> pl.Expr:
+    """
+    Percentage change over one time period, as a Polars expression.
+
+    Args:
+        column_name: The column whose values will be used to calculate the percentage change
+    Returns:
+        A Polars expression in Float32 dtype named "ti_returns"
+    """
+    return pl.col(column_name).pct_change(n=1) \
+                              .cast(pl.Float32) \
+                              .fill_nan(None) \
+                              .alias("ti_returns")
+
+def ti_volatility_expression(time_period: int = 5,
+                             column_name: str = "close") -> pl.Expr:
+    """
+    Volatility over a user-specified amount of time periods, as a Polars expression.
+    See ti_daily_return_and_volatility for the definition.
+
+    Args:
+        time_period: An integer holding the time period value that we will use to calculate the volatility over
+        column_name: The column whose values will be used to calculate the volatility
+    Returns:
+        A Polars expression in Float32 dtype named after the user-specified period
+    """
+    return (pl.col(column_name).rolling_std(window_size=time_period) * np.sqrt(time_period)) \
+                              .cast(pl.Float32) \
+                              .fill_nan(None) \
+                              .alias(f"ti_volatility_over_{time_period}_period")
+
+def ti_simple_moving_average_expression(time_period: int = 5,
+                                        column_name: str = "close") -> pl.Expr:
+    """
+    Simple moving average over a user-specified amount of time periods, as a Polars expression.
+    See ti_variable_day_simple_moving_average for the definition.
+
+    Args:
+        time_period: An integer holding the time period value that we will use to calculate the average over
+        column_name: The column whose values will be used to calculate the average over across the specified time periods
+    Returns:
+        A Polars expression in Float64 dtype named after the user-specified period
+    """
+    return pl.col(column_name).rolling_mean(window_size=time_period) \
+                              .cast(pl.Float64) \
+                              .fill_nan(None) \
+                              .alias(f"ti_simple_moving_average_over_{time_period}_period")
 
 # --- Polars - Technical Indicator (TI) - Variable volatility period based on user-specified settings ---
 def ti_daily_return_and_volatility(stock_dataframe: pl.DataFrame,
@@ -27,18 +77,8 @@ def ti_daily_return_and_volatility(stock_dataframe: pl.DataFrame,
     Returns:
         A two column Polars DataFrame in both Float32 dtype based on the percentage change over one time period, and the volatility of the stock based on the "close" column over a user-specified time period
     """
-    daily_return = pl.Series(name=f"ti_returns",
-                             values=stock_dataframe["close"].pct_change(n=1),
-                             dtype=pl.Float32,
-                             nan_to_null=True).to_frame()
-    
-    volatility = pl.Series(name=f"ti_volatility_over_{time_period}_period",
-                           values=(stock_dataframe["close"].rolling_std(window_size=time_period) * np.sqrt(time_period)),
-                           dtype=pl.Float32,
-                           nan_to_null=True).to_frame()
-    
-    daily_return_volatility_final_output = pl.concat([daily_return, volatility],
-                                                     how="horizontal")
+    daily_return_volatility_final_output = stock_dataframe.select([ti_returns_expression(),
+                                                                   ti_volatility_expression(time_period=time_period)])
 
     return daily_return_volatility_final_output
 
@@ -69,9 +109,637 @@ def ti_variable_day_simple_moving_average(stock_dataframe: pl.DataFrame,
     Returns:
         A single column Polars DataFrame in Float64 dtype with the user-specified period as its column name, alongside the SMA values at every time period
     """
-    variable_sma_final_output = pl.Series(name=f"ti_simple_moving_average_over_{time_period}_period",
-                                          values=stock_dataframe[f"{column_name}"].rolling_mean(window_size=time_period),
-                                          dtype=pl.Float64,
-                                          nan_to_null=True).to_frame()
+    variable_sma_final_output = stock_dataframe.select(ti_simple_moving_average_expression(time_period=time_period,
+                                                                                           column_name=column_name))
+
+    return variable_sma_final_output
+
+# --- NumPy - Technical Indicator (TI) - Multi-window SMA, standard deviation, and volatility from shared prefix sums ---
+# Window lengths of the sweep if none are specified
+MULTI_WINDOW_SWEEP_TIME_PERIODS = [5, 10, 20, 50, 100, 200]
+
+# Multiple of the machine epsilon times the sum of squares of a block, below which the sum of squared deviations of a window is rounding error of the prefix sums
+MULTI_WINDOW_SWEEP_VARIANCE_TOLERANCE = 32
+
+def ti_multi_window_sweep(stock_dataframe: pl.DataFrame,
+                          time_periods: list | None = None,
+                          column_name: str = "close") -> pl.DataFrame:
+    """
+    Multi-Window Sweep
+    Computes the simple moving average, standard deviation, and volatility for a list of window lengths from shared prefix sums.
+    The prefix sum and the prefix sum of squares are built once in a single O(n) pass, after which every window is a vectorized difference of prefix values.
+
+    where:
+    S(t)     = A1 + A2 + ... + At
+    Q(t)     = A1² + A2² + ... + At²
+    SMA(t)   = (S(t) - S(t-n)) / n
+    σ(t)²    = (Q(t) - Q(t-n) - (S(t) - S(t-n))² / n) / (n - 1)
+
+    The rows are split into blocks at least as long as the largest window, and the prefix sums restart at every block on values centered on the block mean.
+    This keeps the magnitude of the prefix sums local, avoiding the catastrophic cancellation of the sum of squares for long and trending histories.
+    A window spans at most two blocks, and the part in the previous block is shifted onto the center of the current block.
+    The remaining rounding error is bounded by the sum of squares of the blocks, and a sum of squared deviations below it is zero, so that flat windows have a standard deviation of exactly 0.
+    Windows containing a null value are null, and so is the standard deviation of a window of length 1, similar to the Polars rolling functions.
+
+    Args:
+        stock_dataframe: A Polars dataframe containing the OHLC data and sorted in ascending order for the column timestamp
+        time_periods: A list of the window lengths to compute the columns for, duplicates are computed once. MULTI_WINDOW_SWEEP_TIME_PERIODS if not specified
+        column_name: The column whose values will be used for every window
+    Returns:
+        A Polars DataFrame with the SMA (Float64), standard deviation (Float64), and volatility (Float32) columns of every window, named similar to the single-window functions
+
+    Raises:
+        ValueError: If a window length is not a positive integer
+    """
+    time_periods = list(dict.fromkeys(time_periods if time_periods is not None else MULTI_WINDOW_SWEEP_TIME_PERIODS))
+    if any(time_period <= 0 for time_period in time_periods):
+        raise ValueError(f"The window lengths of the sweep have to be positive, got {time_periods}")
+    values = stock_dataframe[column_name].cast(pl.Float64).fill_nan(None).to_numpy()
+    number_of_rows = len(values)
+    is_valid = ~np.isnan(values)
+
+    # Block centers, with a block being at least as long as the largest window
+    block_size = max(4096, max(time_periods))
+    number_of_blocks = max(1, -(-number_of_rows // block_size))
+    block_index = np.arange(number_of_rows) // block_size
+    block_valid_count = np.bincount(block_index, weights=is_valid, minlength=number_of_blocks)
+    block_center = np.bincount(block_index, weights=np.where(is_valid, values, 0.0), minlength=number_of_blocks) / np.maximum(block_valid_count, 1)
+    centered_values = np.where(is_valid, values - block_center[block_index], 0.0)
+
+    # Exclusive prefix sums restarting at every block, i.e., the sum of the rows [block start, i), alongside the total of every block
+    def block_prefix_sums(block_values: np.ndarray) -> tuple:
+        padded_values = np.zeros(number_of_blocks * block_size)
+        padded_values[:number_of_rows] = block_values
+        inclusive_prefix = np.cumsum(padded_values.reshape(number_of_blocks, block_size), axis=1)
+        exclusive_prefix = np.hstack([np.zeros((number_of_blocks, 1)), inclusive_prefix[:, :-1]])
+
+        return np.append(exclusive_prefix.ravel(), 0.0), inclusive_prefix[:, -1]
+
+    prefix_sum, block_sum = block_prefix_sums(centered_values)
+    prefix_sum_of_squares, block_sum_of_squares = block_prefix_sums(centered_values ** 2)
+    prefix_count, block_count = block_prefix_sums(is_valid.astype(np.float64))
+
+    sweep_columns = []
+    for time_period in time_periods:
+        last_row = np.arange(time_period - 1, number_of_rows)
+        first_row = last_row - time_period + 1
+        row_block_index = block_index[last_row]
+        split = np.maximum(first_row, row_block_index * block_size)
+        has_previous_block_part = first_row < split
+
+        # Part of the window within the current block, i.e., the rows [split, last row]
+        current_block_sum = prefix_sum[last_row] + centered_values[last_row] - prefix_sum[split]
+        current_block_sum_of_squares = prefix_sum_of_squares[last_row] + centered_values[last_row] ** 2 - prefix_sum_of_squares[split]
+        current_block_count = prefix_count[last_row] + is_valid[last_row] - prefix_count[split]
+
+        # Part of the window within the previous block, i.e., the rows [first row, split), shifted onto the center of the current block
+        previous_block_index = np.maximum(row_block_index - 1, 0)
+        previous_block_sum = np.where(has_previous_block_part, block_sum[previous_block_index] - prefix_sum[first_row], 0.0)
+        previous_block_sum_of_squares = np.where(has_previous_block_part, block_sum_of_squares[previous_block_index] - prefix_sum_of_squares[first_row], 0.0)
+        previous_block_count = np.where(has_previous_block_part, block_count[previous_block_index] - prefix_count[first_row], 0.0)
+        center_shift = block_center[previous_block_index] - block_center[row_block_index]
+
+        window_sum = current_block_sum + previous_block_sum + previous_block_count * center_shift
+        window_sum_of_squares = current_block_sum_of_squares + previous_block_sum_of_squares + 2 * center_shift * previous_block_sum + previous_block_count * center_shift ** 2
+        is_full_window = np.rint(current_block_count + previous_block_count) == time_period
+
+        window_mean = np.full(number_of_rows, np.nan)
+        window_standard_deviation = np.full(number_of_rows, np.nan)
+        window_mean[time_period - 1:] = np.where(is_full_window, block_center[row_block_index] + window_sum / time_period, np.nan)
+        # Sums of squared deviations within the rounding error of the prefix sums of the blocks are zero, e.g., for flat windows of cent-rounded prices
+        window_squared_deviations = window_sum_of_squares - window_sum ** 2 / time_period
+        rounding_tolerance = MULTI_WINDOW_SWEEP_VARIANCE_TOLERANCE * np.finfo(np.float64).eps \
+                             * (block_sum_of_squares[row_block_index] + np.where(has_previous_block_part, previous_block_sum_of_squares + previous_block_count * center_shift ** 2, 0.0))
+        window_squared_deviations = np.where(window_squared_deviations <= rounding_tolerance, 0.0, window_squared_deviations)
+
+        # A single value has no sample standard deviation
+        if time_period > 1:
+            window_standard_deviation[time_period - 1:] = np.where(is_full_window, np.sqrt(window_squared_deviations / (time_period - 1)), np.nan)
+
+        sweep_columns.extend([pl.Series(name=f"ti_simple_moving_average_over_{time_period}_period",
+                                        values=window_mean,
+                                        dtype=pl.Float64,
+                                        nan_to_null=True),
+                              pl.Series(name=f"ti_{column_name}_standard_deviation_over_{time_period}_period",
+                                        values=window_standard_deviation,
+                                        dtype=pl.Float64,
+                                        nan_to_null=True),
+                              pl.Series(name=f"ti_volatility_over_{time_period}_period",
+                                        values=window_standard_deviation * np.sqrt(time_period),
+                                        dtype=pl.Float32,
+                                        nan_to_null=True)])
+
+    return pl.DataFrame(sweep_columns)
+
+# --- Polars - Technical Indicator (TI) - Expressions - Wilder's smoothing shared by the RSI, ATR, and ADX ---
+def wilder_smoothing_expression(expression: pl.Expr,
+                                time_period: int) -> pl.Expr:
+    """
+    Wilder's smoothing, an exponential moving average with a smoothing factor of 1 / n.
+    Used by the indicators originally defined by J. Welles Wilder, i.e., the RSI, ATR, and ADX.
+
+    Args:
+        expression: The Polars expression that will be smoothed
+        time_period: An integer holding the time period value that we will use to smooth over
+    Returns:
+        A Polars expression of the smoothed values, which are null until the first full time period
+    """
+    return expression.ewm_mean(alpha=1 / time_period, adjust=False, min_samples=time_period)
+
+# --- Polars - Technical Indicator (TI) - Expressions - Exponential Moving Average (EMA) ---
+def ti_exponential_moving_average_expression(time_period: int = 20,
+                                             column_name: str = "close") -> list:
+    """
+    Exponential Moving Average (EMA)
+    A moving average that places a greater weight on the most recent observations
+
+    Based on https://www.investopedia.com/terms/e/ema.asp
+    EMA(t) = A(t) * k + EMA(t-1) * (1 - k)
+    where:
+    k  : Smoothing factor of 2 / (n + 1)
+    n  : Number of time periods
+
+    Args:
+        time_period: An integer holding the time period value that we will use to calculate the average over
+        column_name: The column whose values will be used to calculate the average
+    Returns:
+        A list with a single Polars expression in Float64 dtype
+    """
+    return [pl.col(column_name).ewm_mean(span=time_period, adjust=False, min_samples=time_period)
+                               .alias(f"ti_exponential_moving_average_over_{time_period}_period")]
+
+# --- Polars - Technical Indicator (TI) - Expressions - Weighted Moving Average (WMA) ---
+def ti_weighted_moving_average_expression(time_period: int = 20,
+                                          column_name: str = "close") -> list:
+    """
+    Weighted Moving Average (WMA)
+    A moving average where the weights decrease linearly from the most recent observation to the oldest one
+
+    WMA = (n * A(t) + (n - 1) * A(t-1) + ... + 1 * A(t-n+1)) / (n * (n + 1) / 2)
+
+    Args:
+        time_period: An integer holding the time period value that we will use to calculate the average over
+        column_name: The column whose values will be used to calculate the average
+    Returns:
+        A list with a single Polars expression in Float64 dtype
+    """
+    return [pl.col(column_name).cast(pl.Float64)
+                               .rolling_mean(window_size=time_period, weights=[float(weight) for weight in range(1, time_period + 1)])
+                               .alias(f"ti_weighted_moving_average_over_{time_period}_period")]
+
+# --- Polars - Technical Indicator (TI) - Expressions - Relative Strength Index (RSI) ---
+def ti_relative_strength_index_expression(time_period: int = 14,
+                                          column_name: str = "close") -> list:
+    """
+    Relative Strength Index (RSI)
+    A momentum oscillator measuring the speed and magnitude of recent price changes, between 0 and 100
+
+    Based on https://www.investopedia.com/terms/r/rsi.asp
+    RSI = 100 - 100 / (1 + RS)
+    where:
+    RS : Wilder-smoothed average gain divided by the Wilder-smoothed average loss over n time periods
+
+    Args:
+        time_period: An integer holding the time period value that we will use to smooth the gains and losses over
+        column_name: The column whose values will be used to calculate the price changes
+    Returns:
+        A list with a single Polars expression in Float64 dtype
+    """
+    price_change = pl.col(column_name).cast(pl.Float64).diff()
+    average_gain = wilder_smoothing_expression(price_change.clip(lower_bound=0), time_period)
+    average_loss = wilder_smoothing_expression(-price_change.clip(upper_bound=0), time_period)
+
+    return [(100 - 100 / (1 + average_gain / average_loss)).fill_nan(None)
+                                                           .alias(f"ti_relative_strength_index_over_{time_period}_period")]
+
+# --- Polars - Technical Indicator (TI) - Expressions - Moving Average Convergence Divergence (MACD) ---
+def ti_moving_average_convergence_divergence_expression(fast_time_period: int = 12,
+                                                        slow_time_period: int = 26,
+                                                        signal_time_period: int = 9,
+                                                        column_name: str = "close") -> list:
+    """
+    Moving Average Convergence Divergence (MACD)
+    A trend-following momentum indicator showing the relationship between two EMAs of the price
+
+    Based on https://www.investopedia.com/terms/m/macd.asp
+    MACD = EMA(fast) - EMA(slow)
+    Signal = EMA(MACD, signal)
+    Histogram = MACD - Signal
+
+    Args:
+        fast_time_period: The time period of the fast EMA
+        slow_time_period: The time period of the slow EMA
+        signal_time_period: The time period of the EMA of the MACD line
+        column_name: The column whose values will be used to calculate the EMAs
+    Returns:
+        A list of the MACD line, signal line, and histogram Polars expressions in Float64 dtype
+    """
+    macd_line = pl.col(column_name).ewm_mean(span=fast_time_period, adjust=False, min_samples=slow_time_period) \
+                - pl.col(column_name).ewm_mean(span=slow_time_period, adjust=False, min_samples=slow_time_period)
+    signal_line = macd_line.ewm_mean(span=signal_time_period, adjust=False, min_samples=signal_time_period)
+    suffix = f"{fast_time_period}_{slow_time_period}_{signal_time_period}"
+
+    return [macd_line.alias(f"ti_macd_line_{suffix}"),
+            signal_line.alias(f"ti_macd_signal_{suffix}"),
+            (macd_line - signal_line).alias(f"ti_macd_histogram_{suffix}")]
+
+# --- Polars - Technical Indicator (TI) - Expressions - Bollinger Bands ---
+def ti_bollinger_bands_expression(time_period: int = 20,
+                                  number_of_standard_deviations: float = 2.0,
+                                  column_name: str = "close") -> list:
+    """
+    Bollinger Bands
+    An SMA envelope placed a number of standard deviations above and below the SMA
+
+    Based on https://www.investopedia.com/terms/b/bollingerbands.asp
+    Upper Band = SMA + k * σ
+    Lower Band = SMA - k * σ
+
+    Args:
+        time_period: An integer holding the time period value that we will use to calculate the SMA and standard deviation over
+        number_of_standard_deviations: The amount of standard deviations (k) between the SMA and each band
+        column_name: The column whose values will be used to calculate the bands
+    Returns:
+        A list of the upper band, lower band, and percent-b Polars expressions in Float64 dtype
+    """
+    middle_band = pl.col(column_name).cast(pl.Float64).rolling_mean(window_size=time_period)
+    band_width = number_of_standard_deviations * pl.col(column_name).cast(pl.Float64).rolling_std(window_size=time_period)
+
+    return [(middle_band + band_width).alias(f"ti_bollinger_upper_band_over_{time_period}_period"),
+            (middle_band - band_width).alias(f"ti_bollinger_lower_band_over_{time_period}_period"),
+            ((pl.col(column_name) - (middle_band - band_width)) / (2 * band_width)).fill_nan(None)
+                                                                                  .alias(f"ti_bollinger_percent_b_over_{time_period}_period")]
+
+# --- Polars - Technical Indicator (TI) - Expressions - Average True Range (ATR) ---
+def true_range_expression() -> pl.Expr:
+    """
+    True Range, the greatest of the current high-low range and the gaps from the previous close.
+
+    Returns:
+        A Polars expression of the true range, using the high, low, and previous close of each time period
+    """
+    previous_close = pl.col("close").shift(1)
+
+    return pl.max_horizontal(pl.col("high") - pl.col("low"),
+                             (pl.col("high") - previous_close).abs(),
+                             (pl.col("low") - previous_close).abs())
+
+def ti_average_true_range_expression(time_period: int = 14) -> list:
+    """
+    Average True Range (ATR)
+    A volatility indicator measuring the Wilder-smoothed true range, which accounts for gaps between time periods
+
+    Based on https://www.investopedia.com/terms/a/atr.asp
+
+    Args:
+        time_period: An integer holding the time period value that we will use to smooth the true range over
+    Returns:
+        A list with a single Polars expression in Float64 dtype
+    """
+    return [wilder_smoothing_expression(true_range_expression(), time_period).alias(f"ti_average_true_range_over_{time_period}_period")]
+
+# --- Polars - Technical Indicator (TI) - Expressions - On-Balance Volume (OBV) ---
+def ti_on_balance_volume_expression() -> list:
+    """
+    On-Balance Volume (OBV)
+    A cumulative volume indicator, adding the volume on up periods and subtracting it on down periods
+
+    Based on https://www.investopedia.com/terms/o/onbalancevolume.asp
+
+    Returns:
+        A list with a single Polars expression in Float64 dtype
+    """
+    return [(pl.col("close").diff().sign().fill_null(0) * pl.col("trading_volume").cast(pl.Float64)).cum_sum()
+                                                                                                     .alias("ti_on_balance_volume")]
+
+# --- Polars - Technical Indicator (TI) - Expressions - Volume-Weighted Average Price (VWAP) ---
+def ti_volume_weighted_average_price_expression(reset_daily: bool = True) -> list:
+    """
+    Volume-Weighted Average Price (VWAP)
+    The cumulative average of the typical price weighted by volume, which is usually reset at the start of every trading day
+
+    Based on https://www.investopedia.com/terms/v/vwap.asp
+    VWAP = Σ (Typical Price * Volume) / Σ Volume
+    where:
+    Typical Price = (High + Low + Close) / 3
+
+    Args:
+        reset_daily: Setting for whether the cumulative sums are reset at the start of every day
+    Returns:
+        A list with a single Polars expression in Float64 dtype
+    """
+    typical_price_volume = ((pl.col("high") + pl.col("low") + pl.col("close")) / 3) * pl.col("trading_volume").cast(pl.Float64)
+    cumulative_volume = pl.col("trading_volume").cast(pl.Float64).cum_sum()
+    volume_weighted_average_price = typical_price_volume.cum_sum() / cumulative_volume
+
+    if reset_daily:
+        volume_weighted_average_price = volume_weighted_average_price.over(pl.col("timestamp").dt.date())
+
+    return [volume_weighted_average_price.fill_nan(None).alias("ti_volume_weighted_average_price")]
+
+# --- Polars - Technical Indicator (TI) - Expressions - Stochastic Oscillator ---
+def ti_stochastic_oscillator_expression(time_period: int = 14,
+                                        smoothing_time_period: int = 3) -> list:
+    """
+    Stochastic Oscillator
+    A momentum indicator comparing the close to its high-low range over a number of time periods, between 0 and 100
+
+    Based on https://www.investopedia.com/terms/s/stochasticoscillator.asp
+    %K = 100 * (C - L(n)) / (H(n) - L(n))
+    %D = SMA(%K, smoothing period)
+
+    Args:
+        time_period: An integer holding the time period value of the high-low range
+        smoothing_time_period: An integer holding the time period value of the %D moving average
+    Returns:
+        A list of the %K and %D Polars expressions in Float64 dtype
+    """
+    lowest_low = pl.col("low").rolling_min(window_size=time_period)
+    highest_high = pl.col("high").rolling_max(window_size=time_period)
+    percent_k = (100 * (pl.col("close") - lowest_low) / (highest_high - lowest_low)).fill_nan(None)
+
+    return [percent_k.alias(f"ti_stochastic_percent_k_over_{time_period}_period"),
+            percent_k.rolling_mean(window_size=smoothing_time_period).alias(f"ti_stochastic_percent_d_over_{time_period}_period")]
+
+# --- Polars - Technical Indicator (TI) - Expressions - Average Directional Index (ADX) ---
+def ti_average_directional_index_expression(time_period: int = 14) -> list:
+    """
+    Average Directional Index (ADX)
+    A trend-strength indicator derived from the positive and negative Directional Indicators (DI), between 0 and 100
+
+    Based on https://www.investopedia.com/terms/a/adx.asp
+    +DI = 100 * Smoothed(+DM) / ATR
+    -DI = 100 * Smoothed(-DM) / ATR
+    ADX = Smoothed(100 * |+DI - -DI| / (+DI + -DI))
+
+    Args:
+        time_period: An integer holding the time period value that we will use to smooth over
+    Returns:
+        A list of the +DI, -DI, and ADX Polars expressions in Float64 dtype
+    """
+    up_move = pl.col("high").diff()
+    down_move = -pl.col("low").diff()
+    positive_directional_movement = pl.when((up_move > down_move) & (up_move > 0)).then(up_move).otherwise(0.0)
+    negative_directional_movement = pl.when((down_move > up_move) & (down_move > 0)).then(down_move).otherwise(0.0)
+
+    # The first time period has no previous close, so the smoothing starts from the second time period
+    average_true_range = wilder_smoothing_expression(pl.when(up_move.is_not_null()).then(true_range_expression()), time_period)
+    positive_directional_indicator = 100 * wilder_smoothing_expression(pl.when(up_move.is_not_null()).then(positive_directional_movement), time_period) / average_true_range
+    negative_directional_indicator = 100 * wilder_smoothing_expression(pl.when(up_move.is_not_null()).then(negative_directional_movement), time_period) / average_true_range
+    directional_index = (100 * (positive_directional_indicator - negative_directional_indicator).abs() / (positive_directional_indicator + negative_directional_indicator)).fill_nan(None)
+
+    return [positive_directional_indicator.fill_nan(None).alias(f"ti_positive_directional_indicator_over_{time_period}_period"),
+            negative_directional_indicator.fill_nan(None).alias(f"ti_negative_directional_indicator_over_{time_period}_period"),
+            wilder_smoothing_expression(directional_index, time_period).alias(f"ti_average_directional_index_over_{time_period}_period")]
+
+# --- Polars - Technical Indicator (TI) - Expressions - Rolling Z-Score ---
+def ti_rolling_z_score_expression(time_period: int = 20,
+                                  column_name: str = "close") -> list:
+    """
+    Rolling Z-Score
+    The amount of standard deviations between the current value and its moving average over a number of time periods
+
+    Z = (A - SMA(n)) / σ(n)
+
+    Args:
+        time_period: An integer holding the time period value that we will use to calculate the average and standard deviation over
+        column_name: The column whose values will be standardized
+    Returns:
+        A list with a single Polars expression in Float64 dtype
+    """
+    column = pl.col(column_name).cast(pl.Float64)
+
+    return [((column - column.rolling_mean(window_size=time_period)) / column.rolling_std(window_size=time_period)).fill_nan(None)
+                                                                                                                .alias(f"ti_{column_name}_z_score_over_{time_period}_period")]
+
+# --- Polars - Technical Indicator (TI) - Registry - Indicators requested by name and parameters ---
+TECHNICAL_INDICATOR_REGISTRY = {"returns": lambda column_name="close": [ti_returns_expression(column_name=column_name)],
+                                "volatility": lambda time_period=5, column_name="close": [ti_volatility_expression(time_period=time_period, column_name=column_name)],
+                                "sma": lambda time_period=20, column_name="close": [ti_simple_moving_average_expression(time_period=time_period, column_name=column_name)],
+                                "ema": ti_exponential_moving_average_expression,
+                                "wma": ti_weighted_moving_average_expression,
+                                "rsi": ti_relative_strength_index_expression,
+                                "macd": ti_moving_average_convergence_divergence_expression,
+                                "bollinger_bands": ti_bollinger_bands_expression,
+                                "atr": ti_average_true_range_expression,
+                                "obv": ti_on_balance_volume_expression,
+                                "vwap": ti_volume_weighted_average_price_expression,
+                                "stochastic": ti_stochastic_oscillator_expression,
+                                "adx": ti_average_directional_index_expression,
+                                "z_score": ti_rolling_z_score_expression}
+
+# Feature set for the financial modelling page, 50+ columns over several horizons
+MODELLING_TECHNICAL_INDICATORS = [("returns", {})] \
+                                 + [(name, {"time_period": time_period}) for name in ("sma", "ema", "wma", "volatility", "z_score") for time_period in (5, 10, 20, 50, 100, 200)] \
+                                 + [(name, {"time_period": time_period}) for name in ("rsi", "atr", "stochastic", "adx") for time_period in (7, 14, 21)] \
+                                 + [("macd", {}),
+                                    ("bollinger_bands", {"time_period": 20}),
+                                    ("obv", {}),
+                                    ("vwap", {})]
+
+def ti_indicator_expressions(indicators: list,
+                             group_by_column: str = None) -> list:
+    """
+    Resolves a list of indicators requested by name and parameters into Polars expressions through the TECHNICAL_INDICATOR_REGISTRY.
+
+    Args:
+        indicators: A list of indicator names, or (name, parameters dictionary) tuples, e.g., ["obv", ("rsi", {"time_period": 14})]
+        group_by_column: An optional column, e.g., "stock_code", over which every indicator is computed independently for long-format dataframes
+    Returns:
+        A list of Polars expressions for every requested indicator
+
+    Raises:
+        KeyError: If an indicator name is not within the TECHNICAL_INDICATOR_REGISTRY
+    """
+    expressions = []
+    for indicator in indicators:
+        name, parameters = (indicator, {}) if isinstance(indicator, str) else indicator
+        expressions.extend(TECHNICAL_INDICATOR_REGISTRY[name](**parameters))
+
+    if group_by_column is not None:
+        expressions = [expression.over(group_by_column) for expression in expressions]
+
+    return expressions
+
+def compute_technical_indicators(stock_dataframe: pl.DataFrame | pl.LazyFrame,
+                                 indicators: list,
+                                 group_by_column: str = None) -> pl.DataFrame | pl.LazyFrame:
+    """
+    Computes every requested indicator in a single vectorized pass, by adding all of their expressions within one with_columns().
+
+    Args:
+        stock_dataframe: A Polars DataFrame or LazyFrame containing the OHLC data and sorted in ascending order for the column timestamp
+        indicators: A list of indicator names, or (name, parameters dictionary) tuples, e.g., ["obv", ("rsi", {"time_period": 14})]
+        group_by_column: An optional column, e.g., "stock_code", over which every indicator is computed independently for long-format dataframes
+    Returns:
+        The input dataframe, alongside a column for every indicator output
+    """
+    return stock_dataframe.with_columns(ti_indicator_expressions(indicators, group_by_column=group_by_column))
+
+
+# --- Incremental Technical Indicator (TI) - Rolling window state updated in O(1) per appended bar ---
+class IncrementalRollingWindow:
+    """
+    Rolling Window State
+    Holds the last n values of a column in a ring buffer, alongside their running sum and Welford sum of squared deviations.
+    Every appended (or revised) value updates the state in O(1), and the running sums are recomputed once per full rotation of the ring buffer to bound the floating point drift.
+    """
+    def __init__(self, time_period: int):
+        self.time_period = time_period
+        self.buffer = np.zeros(time_period, dtype=np.float64)
+        self.index = 0
+        self.count = 0
+        self.mean = 0.0
+        self.sum_of_squared_deviations = 0.0
+
+    def append(self, value: float):
+        """ Appends a new value, dropping the oldest one once the window is full """
+        if self.count < self.time_period:
+            # Welford's online algorithm while the window is filling up
+            self.count += 1
+            delta = value - self.mean
+            self.mean += delta / self.count
+            self.sum_of_squared_deviations += delta * (value - self.mean)
+        else:
+            self.replace(self.buffer[self.index], value)
+
+        self.buffer[self.index] = value
+        self.index = (self.index + 1) % self.time_period
+
+        if self.index == 0 and self.count == self.time_period:
+            self.recompute()
+
+    def revise(self, value: float):
+        """ Replaces the newest value, e.g., when the current bar is still being formed """
+        newest_index = (self.index - 1) % self.time_period
+        self.replace(self.buffer[newest_index], value)
+        self.buffer[newest_index] = value
+
+    def replace(self, old_value: float, new_value: float):
+        """ Sliding-window Welford update, replacing one value of the window with another """
+        old_mean = self.mean
+        self.mean += (new_value - old_value) / self.count
+        self.sum_of_squared_deviations += (new_value - old_value) * (new_value - self.mean + old_value - old_mean)
+
+    def recompute(self):
+        """ Recomputes the running sums from the ring buffer """
+        self.mean = float(np.mean(self.buffer[:self.count]))
+        self.sum_of_squared_deviations = float(np.sum((self.buffer[:self.count] - self.mean) ** 2))
+
+    def rolling_mean(self) -> float | None:
+        """ Mean of the full window, or None while the window is filling up, similar to Polars rolling_mean """
+        if self.count < self.time_period:
+            return None
+        return self.mean
+
+    def rolling_std(self) -> float | None:
+        """ Sample standard deviation of the full window, or None while the window is filling up, similar to Polars rolling_std """
+        if self.count < self.time_period or self.time_period < 2:
+            return None
+        return math.sqrt(max(self.sum_of_squared_deviations, 0.0) / (self.time_period - 1))
+
+# --- Incremental Technical Indicator (TI) - The technical indicators of the aggregate transform, updated per appended bar ---
+# Number of chunks of a stock dataframe grown by appended bars before it is rechunked into contiguous memory
+INCREMENTAL_INDICATORS_MAX_CHUNKS = 64
+
+class IncrementalTechnicalIndicators:
+    """
+    Incremental Technical Indicators
+    Streaming counterpart of the ti_returns, ti_volatility_over_n_period, and ti_simple_moving_average_over_n_period columns of the aggregate transform.
+    Produces the same values as the batch expressions, up to floating point rounding and with the same datatypes, without recomputing the full history on every new bar.
+    """
+    def __init__(self,
+                 volatility_time_period: int = 5,
+                 sma_time_period: int = 20,
+                 column_name: str = "close"):
+        self.volatility_time_period = volatility_time_period
+        self.sma_time_period = sma_time_period
+        self.column_name = column_name
+        self.volatility_window = IncrementalRollingWindow(volatility_time_period)
+        self.sma_window = IncrementalRollingWindow(sma_time_period)
+        self.previous_value = None
+        self.last_value = None
+
+    @classmethod
+    def from_dataframe(cls,
+                       stock_dataframe: pl.DataFrame,
+                       volatility_time_period: int = 5,
+                       sma_time_period: int = 20,
+                       column_name: str = "close"):
+        """
+        Warms up the state from the history of a stock dataframe, only reading the bars that are still within the largest window.
+
+        Args:
+            stock_dataframe: A Polars dataframe containing the OHLC data and sorted in ascending order for the column timestamp
+            volatility_time_period: The time period of the volatility column
+            sma_time_period: The time period of the simple moving average column
+            column_name: The column whose values the indicators are calculated from
+        Returns:
+            An IncrementalTechnicalIndicators object, ready for the next bar
+        """
+        incremental_indicators = cls(volatility_time_period, sma_time_period, column_name)
+        for value in stock_dataframe[column_name].tail(max(volatility_time_period, sma_time_period) + 1).to_list():
+            incremental_indicators.update(value)
+
+        return incremental_indicators
+
+    def update(self, value: float, revise_last_bar: bool = False) -> dict:
+        """
+        Updates the state with the value of a new bar, or revises the value of the last bar.
+
+        Args:
+            value: The value of the indicator column, e.g., the close, of the bar
+            revise_last_bar: Setting for whether the value replaces the last bar instead of appending a new bar
+        Returns:
+            A dictionary of the indicator column names and their values for the bar, with None for the nulls of the batch expressions
+        """
+        if revise_last_bar and self.last_value is not None:
+            self.volatility_window.revise(value)
+            self.sma_window.revise(value)
+        else:
+            self.previous_value = self.last_value
+            self.volatility_window.append(value)
+            self.sma_window.append(value)
+        self.last_value = value
+
+        # Division by a zero value follows the IEEE 754 semantics of the batch expressions, where NaN becomes a null
+        daily_return = None
+        if self.previous_value is not None and self.previous_value != 0:
+            daily_return = (value - self.previous_value) / self.previous_value
+        elif self.previous_value is not None and value != 0:
+            daily_return = math.copysign(math.inf, value)
+
+        volatility = self.volatility_window.rolling_std()
+        if volatility is not None:
+            volatility = volatility * np.sqrt(self.volatility_time_period)
+
+        # Round-trip through float32 for the columns which are stored in Float32 dtype by the batch expressions
+        return {"ti_returns": float(np.float32(daily_return)) if daily_return is not None else None,
+                f"ti_volatility_over_{self.volatility_time_period}_period": float(np.float32(volatility)) if volatility is not None else None,
+                f"ti_simple_moving_average_over_{self.sma_time_period}_period": self.sma_window.rolling_mean()}
+
+    def append_bar(self,
+                   stock_dataframe: pl.DataFrame,
+                   bar: dict,
+                   revise_last_bar: bool = False) -> pl.DataFrame:
+        """
+        Appends (or revises) a bar at the end of a stock dataframe, alongside its indicator columns, without recomputing the history.
+
+        Args:
+            stock_dataframe: The stock dataframe the state was warmed up from
+            bar: A dictionary of the base columns of the new bar, e.g., timestamp, open, high, low, close
+            revise_last_bar: Setting for whether the bar replaces the last row instead of being appended
+        Returns:
+            The stock dataframe with the new bar as its last row
+        """
+        new_row = pl.DataFrame([{**bar, **self.update(bar[self.column_name], revise_last_bar=revise_last_bar)}],
+                               schema=stock_dataframe.schema)
+        if revise_last_bar:
+            stock_dataframe = stock_dataframe.slice(0, stock_dataframe.height - 1)
+
+        # Every appended bar adds a chunk, so the chunks are merged once in a while instead of copying the full history on every bar
+        stock_dataframe = pl.concat([stock_dataframe, new_row], how="vertical", rechunk=False)
+        if stock_dataframe.n_chunks() > INCREMENTAL_INDICATORS_MAX_CHUNKS:
+            stock_dataframe = stock_dataframe.rechunk()
 
-    return variable_sma_final_output
\ No newline at end of file
+        return stock_dataframe
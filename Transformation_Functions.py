@@ -1,10 +1,11 @@
 # --- Imports ---
 # Core
+import asyncio
 import polars as pl
 import plotly.graph_objects as go
 
 # Functions
-import API_Functions, Technical_Indicators_Functions
+import API_Functions, Storage_Functions, Technical_Indicators_Functions
 
 # --- Polars - ETL - JSON Conversion for Polygon Aggregate Bars API Data ---
 def transform_aggregate_stock_json_to_dataframe(symbol: str = "AAPL",
@@ -14,9 +15,13 @@ def transform_aggregate_stock_json_to_dataframe(symbol: str = "AAPL",
                                                 to_date: str = "2024-12-31",
                                                 adjusted: str = "true",
                                                 sort_order: str = "desc",
-                                                limit: str = "50000") -> pl.DataFrame:
+                                                limit: str = "50000",
+                                                use_bar_store: bool = True,
+                                                streaming: bool = False,
+                                                sweep_time_periods: list = None) -> pl.DataFrame:
     """
     Retrieves the stock data from the retrieve_aggregate_data_for_stock of the API_Functions.py file
+    By default, the stock data is served from the local Parquet bar store of the Storage_Functions.py file, which only calls the API for the date ranges that are not yet held on disk
 
     Performs several transformation tasks:
         - Datatype conversions for the base columns from the API
@@ -35,7 +40,10 @@ def transform_aggregate_stock_json_to_dataframe(symbol: str = "AAPL",
         to_date: The end date for the stock data that will be retrieved
         adjusted: Setting for whether the stock data will be adjusted for splits
         sort_order: The sorting order for the stock data will be retrieved can be ascending or descending based on time
-        limit: The total amount (in rows) of data before aggregation that the data will be limited to
+        limit: The total amount (in rows) of data before aggregation that a single API call will be limited to
+        use_bar_store: Setting for whether the stock data will be served from the local Parquet bar store, or directly from the API
+        streaming: Setting for whether the transformation is executed by the Polars streaming engine, straight from the Parquet files of the bar store for inputs larger than memory
+        sweep_time_periods: An optional list of window lengths, e.g., [5, 10, 20, 50, 100, 200], for which the SMA, standard deviation, and volatility columns are added in a single pass
 
     Returns:
         mean_open: The mean value of the "open" column
@@ -44,18 +52,52 @@ def transform_aggregate_stock_json_to_dataframe(symbol: str = "AAPL",
         standard_deviation_close: The standard deviation value of the "close" column
         pl_dataframe_data: The transformed stock data in a Polars DataFrame format
     """
-    json_data = API_Functions.retrieve_aggregate_data_for_stock(symbol, timespan, timespan_multiplier, from_date, to_date, adjusted, sort_order, limit)
+    # Bars whose aggregate windows span more than a day depend on the start of the requested range, so they cannot be served from the bar store
+    if use_bar_store and API_Functions.aggregate_window_fits_within_day(timespan, timespan_multiplier):
+        def transform_bars_from_store() -> pl.DataFrame:
+            raw_pl_dataframe_data = Storage_Functions.load_aggregate_bars_from_store(symbol, timespan, timespan_multiplier, from_date, to_date, adjusted, limit,
+                                                                                     lazy=streaming)
+            return transform_aggregate_bars_to_dataframe(symbol, raw_pl_dataframe_data,
+                                                         streaming=streaming)
+
+        # A lazy scan of the bar store only reads its files once the plan is executed, so the whole transformation is retried if a concurrent compaction removed one of them
+        final_pl_dataframe = Storage_Functions.retry_on_store_compaction(transform_bars_from_store)
+    else:
+        json_data = API_Functions.retrieve_aggregate_data_for_stock(symbol, timespan, timespan_multiplier, from_date, to_date, adjusted, sort_order, limit)
+        raw_pl_dataframe_data = json_data[f"results"]
     
-    # Conversion to Polars DataFrame for learning reasons
+        final_pl_dataframe = transform_aggregate_bars_to_dataframe(symbol, raw_pl_dataframe_data,
+                                                                   streaming=streaming)
+
+    # A lazily scanned bar store can only be found to be empty once the plan is executed
+    if final_pl_dataframe.height == 0:
+        raise KeyError("results")
+
+    # Multi-window columns replace the single-window columns of the same name, which hold the same values
+    if sweep_time_periods is not None:
+        final_pl_dataframe = final_pl_dataframe.with_columns(Technical_Indicators_Functions.ti_multi_window_sweep(final_pl_dataframe,
+                                                                                                                 time_periods=sweep_time_periods,
+                                                                                                                 column_name="close"))
+
+    return final_pl_dataframe
+
+# --- Polars - ETL - Lazy query plan from the raw Polygon Aggregate Bars to the stock dataframe with technical indicators ---
+def build_aggregate_bars_query_plan(symbol: str,
+                                    raw_pl_dataframe_data: pl.DataFrame | pl.LazyFrame) -> pl.LazyFrame:
+    """
+    Builds the lazy query plan that transforms the raw bars of the Polygon Aggregate Bars API into the stock dataframe used throughout the application.
+    The casts, renames, sort, and every technical indicator are expressions of a single plan, so that Polars can optimize and parallelize them within one collect().
+    Shared by the single stock and the multiple stocks transformations.
+
+    Args:
+        symbol: The ticker symbol of the stock, stored as a literal value in the "stock_code" column
+        raw_pl_dataframe_data: A Polars DataFrame or LazyFrame in the raw Polygon aggregate bars schema
+
+    Returns:
+        The lazy query plan of the transformed stock data, alongside its technical indicator columns, in a Polars LazyFrame format
+    """
     # KEY: Sort the dataframe in ascending order for timestamp as the results will be used for generating technical indicators, and some are dependent on the data sequentially increasing by a time period
-    pl_dataframe_data = pl.DataFrame(json_data[f"results"], schema={"t":pl.UInt64,
-                                     "o":pl.Float64,
-                                     "h":pl.Float64,
-                                     "l":pl.Float64,
-                                     "c":pl.Float64,
-                                     "n":pl.Int64,
-                                     "v":pl.UInt64,
-                                     "vw":pl.UInt64}) \
+    pl_lazyframe_data = raw_pl_dataframe_data.lazy() \
                             .select([pl.lit(symbol).alias("stock_code"),
                                      pl.from_epoch(pl.col("t"), time_unit="ms").alias("timestamp"),
                                      pl.col("o").alias("open"),
@@ -67,17 +109,14 @@ def transform_aggregate_stock_json_to_dataframe(symbol: str = "AAPL",
                                      pl.col("vw").alias("volume_weighted_average_price")]) \
                             .sort(by=pl.col("timestamp"),
                                   descending=False)
-    
-    # --- Technical Indicators - Column Concatting ---
-    # Daily Return and Volatility
-    ti_daily_return_volatility = Technical_Indicators_Functions.ti_daily_return_and_volatility(pl_dataframe_data,
-                                                                                               time_period=5)
-
-    # Variable Simple Moving Average (SMA)
-    ti_variable_sma_column = Technical_Indicators_Functions.ti_variable_day_simple_moving_average(pl_dataframe_data,
-                                                                                                  time_period=20,
-                                                                                                  column_name="close")
-    
+
+    # --- Technical Indicators - Column Expressions ---
+    # Daily Return, Volatility, and Variable Simple Moving Average (SMA)
+    pl_lazyframe_data = pl_lazyframe_data.with_columns([Technical_Indicators_Functions.ti_returns_expression(),
+                                                        Technical_Indicators_Functions.ti_volatility_expression(time_period=5),
+                                                        Technical_Indicators_Functions.ti_simple_moving_average_expression(time_period=20,
+                                                                                                                           column_name="close")])
+
     # --- Statistical Aggregations - Printing values in description of section ---
     # mean_pl_dataframe_data = pl_dataframe_data.mean()
     # standard_deviation_pl_dataframe_data = pl_dataframe_data.std()
@@ -90,76 +129,229 @@ def transform_aggregate_stock_json_to_dataframe(symbol: str = "AAPL",
     # mean_close = mean_pl_dataframe_data.item(0, "close")
     # standard_deviation_close = standard_deviation_pl_dataframe_data.item(0, "close")
 
-    # --- Final Polars Stock Dataframe with concatted technical indicator columns ---
-    final_pl_dataframe = pl.concat(items=[pl_dataframe_data, ti_daily_return_volatility, ti_variable_sma_column],
-                                   how="horizontal")
+    return pl_lazyframe_data
 
-    return final_pl_dataframe
+# --- Polars - ETL - Raw Polygon Aggregate Bars to the stock dataframe with technical indicators ---
+def transform_aggregate_bars_to_dataframe(symbol: str,
+                                          raw_pl_dataframe_data: pl.DataFrame | pl.LazyFrame,
+                                          streaming: bool = False) -> pl.DataFrame:
+    """
+    Executes the lazy query plan of build_aggregate_bars_query_plan in a single optimized collect().
+
+    Args:
+        symbol: The ticker symbol of the stock, stored as a literal value in the "stock_code" column
+        raw_pl_dataframe_data: A Polars DataFrame or LazyFrame in the raw Polygon aggregate bars schema
+        streaming: Setting for whether the plan is executed by the Polars streaming engine, for inputs larger than memory
+
+    Returns:
+        The transformed stock data, alongside its technical indicator columns, in a Polars DataFrame format
+    """
+    return build_aggregate_bars_query_plan(symbol, raw_pl_dataframe_data) \
+               .collect(engine="streaming" if streaming else "auto")
+
+# --- Polars - ETL - JSON Conversion for Polygon Aggregate Bars API Data of multiple stocks ---
+def transform_aggregate_multiple_stocks_json_to_dataframe(symbols: list,
+                                                          timespan: str = "day",
+                                                          timespan_multiplier: str = "1",
+                                                          from_date: str = "2024-01-01",
+                                                          to_date: str = "2024-12-31",
+                                                          adjusted: str = "true",
+                                                          sort_order: str = "desc",
+                                                          limit: str = "50000",
+                                                          max_concurrency: int = 16,
+                                                          requests_per_minute: float = None) -> pl.DataFrame:
+    """
+    Batch counterpart of transform_aggregate_stock_json_to_dataframe for a watchlist of stocks.
+    Retrieves the stock data of every stock concurrently through the retrieve_aggregate_data_for_stocks_async function of the API_Functions.py file
+
+    Performs the same transformation tasks per stock, including the technical indicators, so that the indicators never cross from one stock to the next.
+    Stocks without any data for the user-specified settings are left out of the result, while a stock whose retrieval failed fails the whole batch, so that a partial result is never returned silently.
+
+    Args:
+        symbols: A list of the ticker symbols of the stocks to download
+        timespan: The size of the aggregate time window, e.g., day, minute, quarter, year
+        timespan_multiplier: The size of the aggregate timespan multiplier, e.g., a value of 3 and day denotes an aggreggate timespan of 3 days
+        from_date: The start date for the stock data that will be retrieved
+        to_date: The end date for the stock data that will be retrieved
+        adjusted: Setting for whether the stock data will be adjusted for splits
+        sort_order: The sorting order for the stock data will be retrieved can be ascending or descending based on time
+        limit: The total amount (in rows) of data before aggregation that a single API call will be limited to
+        max_concurrency: The maximum amount of in-flight requests at any single point in time
+        requests_per_minute: A separate rate-limit budget for this retrieval only. The budget of the shared polygon_request_scheduler if not specified
+
+    Returns:
+        The transformed stock data of every stock in a long-format Polars DataFrame, partitioned into contiguous blocks by the "stock_code" column and sorted by "timestamp" within each block
+
+    Raises:
+        KeyError: If the API responds with an error for any of the stocks, e.g., after exhausting the retries of a 429 response, with the list of the failed ticker symbols as its second argument.
+                  Also if none of the stocks have data, similar to a missing "results" object
+    """
+    symbols = list(dict.fromkeys(symbol.upper() for symbol in symbols))
+    json_data_per_symbol = asyncio.run(API_Functions.retrieve_aggregate_data_for_stocks_async(symbols, timespan, timespan_multiplier, from_date, to_date, adjusted, sort_order, limit,
+                                                                                               max_concurrency=max_concurrency,
+                                                                                               requests_per_minute=requests_per_minute))
+
+    # Similar to the single stock transformation, an error response is surfaced as a missing "results" object, alongside every stock it happened for
+    failed_symbols = [symbol for symbol, json_data in json_data_per_symbol.items() if json_data.get("status") not in ("OK", "DELAYED")]
+    if len(failed_symbols) > 0:
+        raise KeyError("results", failed_symbols)
+
+    pl_lazyframes = [build_aggregate_bars_query_plan(symbol, json_data["results"])
+                     for symbol, json_data in json_data_per_symbol.items()
+                     if "results" in json_data]
+
+    # Similar to the single stock transformation, none of the stocks having data is surfaced as a missing "results" object
+    if len(pl_lazyframes) == 0:
+        raise KeyError("results")
+
+    # The plans of every stock are executed together, so that Polars can process the stocks in parallel
+    return pl.concat(items=pl_lazyframes,
+                     how="vertical") \
+             .collect()
 
 # --- Polars - ETL - JSON Conversion for Polygon Ticker News API Data ---
 def transform_ticker_news_json_to_dataframe(symbol: str,
                                             from_date: str,
-                                            to_date: str) -> pl.DataFrame:
+                                            to_date: str,
+                                            article_limit: int = 10) -> pl.DataFrame:
     """
-    Retrieves the ticker news data from the retrieve_news_for_stock of the API_Functions.py file
+    Retrieves the ticker news data from the local Parquet news store of the Storage_Functions.py file, which only calls the API for articles it does not hold yet
 
-    Performs several transformation tasks:
-        - Retrieving of key information from the results JSON object
-
-    As of now, details that are pulled and utilized are:
+    The nested JSON objects of the Ticker News API are flattened into typed columns once at ingest time, e.g.:
         - title
         - article_url
         - author
         - published_utc
         - image_url
         - description
+        - publisher_name
+        - sentiment, and sentiment_reasoning from the insights about the queried stock
 
     Args:
         symbol: The ticker symbol of the stock news articles that will be retrieved
         from_date: The start date for the stock news articles that will be retrieved. Date entered here is inclusive.
         to_date: The end date for the stock news articles that will be retrieved. Date entered here is inclusive.
+        article_limit: The maximum amount of news articles that will be returned, the most recent first
 
     Returns:
-        The information from the JSON object transformed into a Polars DataFrame object
+        The news articles in a Polars DataFrame object, sorted in descending order for the "published_utc" column
     """
-    json_data = API_Functions.retrieve_news_for_stock(symbol=symbol,
-                                                      from_date=from_date,
-                                                      to_date=to_date)
-    
-    # Conversion from JSON API Data to a Polars Dataframe for easier processing in frontend
-    # TODO: Extract the insights objects inside the Ticker News API. Nested JSON object structure from the API call.
-    pl_dataframe_data = pl.DataFrame(json_data[f"results"])
+    return Storage_Functions.load_news_from_store(symbol=symbol,
+                                                  from_date=from_date,
+                                                  to_date=to_date,
+                                                  article_limit=article_limit)
 
-    return pl_dataframe_data
+# --- Polars - Level of Detail - Candle resolutions available for downsampling ---
+# Ordered from the finest to the coarsest, as Polars duration strings alongside their length in milliseconds
+CANDLESTICK_RESOLUTIONS = [("1s", 1000),
+                           ("5s", 5000),
+                           ("15s", 15000),
+                           ("30s", 30000),
+                           ("1m", 60000),
+                           ("5m", 300000),
+                           ("15m", 900000),
+                           ("30m", 1800000),
+                           ("1h", 3600000),
+                           ("2h", 7200000),
+                           ("4h", 14400000),
+                           ("1d", 86400000),
+                           ("1w", 604800000),
+                           ("1mo", 2678400000),
+                           ("1q", 7948800000),
+                           ("1y", 31622400000)]
+
+# Maximum amount of candles sent to the browser for a single chart
+CANDLESTICK_MAX_VISIBLE_CANDLES = 2000
+
+# --- Polars - Level of Detail - OHLC-aware downsampling of the stock dataframe ---
+def downsample_ohlc_bars(dataframe: pl.DataFrame,
+                         max_candles: int = CANDLESTICK_MAX_VISIBLE_CANDLES) -> tuple:
+    """
+    Aggregates the bars of a stock dataframe into at most max_candles candles, using the finest resolution of CANDLESTICK_RESOLUTIONS that fits.
+    Keeps the OHLCV semantics of every candle: first open, highest high, lowest low, last close, and summed volume and transactions.
+    The volume weighted average price is re-weighted by the volume of every bar within the candle.
+
+    Args:
+        dataframe: A Polars dataframe containing the timestamp, open, high, low, close, and trading volume data, sorted in ascending order for the column timestamp
+        max_candles: The maximum amount of candles that will be returned
+    Returns:
+        The downsampled Polars dataframe, which is the input dataframe itself when it already fits
+        The Polars duration string of the candle resolution, or None when the input dataframe is returned as is
+    """
+    if dataframe.height <= max_candles:
+        return dataframe, None
+
+    time_span_ms = (dataframe["timestamp"].max() - dataframe["timestamp"].min()).total_seconds() * 1000
+    resolution = next((duration for duration, duration_ms in CANDLESTICK_RESOLUTIONS if time_span_ms / duration_ms < max_candles),
+                      CANDLESTICK_RESOLUTIONS[-1][0])
+
+    downsampled_dataframe = dataframe.group_by_dynamic(index_column="timestamp",
+                                                       every=resolution,
+                                                       closed="left",
+                                                       label="left") \
+                                     .agg([pl.col("stock_code").first(),
+                                           pl.col("open").first(),
+                                           pl.col("high").max(),
+                                           pl.col("low").min(),
+                                           pl.col("close").last(),
+                                           pl.col("trading_volume").sum(),
+                                           pl.col("number_of_transactions_in_aggregate_window").sum(),
+                                           ((pl.col("volume_weighted_average_price") * pl.col("trading_volume")).sum() / pl.col("trading_volume").sum())
+                                               .cast(dataframe.schema["volume_weighted_average_price"])
+                                               .alias("volume_weighted_average_price")]) \
+                                     .select(["stock_code", "timestamp", "open", "high", "low", "close", "trading_volume",
+                                              "number_of_transactions_in_aggregate_window", "volume_weighted_average_price"])
+
+    return downsampled_dataframe, resolution
 
 # --- Plotly - Figure Generation - Candlestick graph figure generation with Polars DataFrame
-def candlestick_plotly_graph(dataframe: pl.DataFrame) -> go.Figure:
+def candlestick_plotly_graph(dataframe: pl.DataFrame,
+                             max_candles: int = CANDLESTICK_MAX_VISIBLE_CANDLES,
+                             visible_range: tuple = None) -> go.Figure:
     """
     Create a candlestick graph figure using the Plotly library and the dataframe input argument which should contain the open, high, low, and close (OHLC) data.
     Also create the hovertext that will be attached to each datapoint in the figure.
 
+    Large dataframes are downsampled through downsample_ohlc_bars, which keeps the payload size and render latency bounded.
+    Narrowing the visible_range re-resolves the chart to finer candles, down to the original bars.
+
     Args:
         dataframe: A Polars dataframe containing the date, open, high, low, and close data
+        max_candles: The maximum amount of candles that will be drawn. Downsampling is disabled if set to None
+        visible_range: An optional (start, end) tuple of datetimes, both inclusive, to which the chart is zoomed in
     Returns:
         A candlestick figure in Plotly Graph Object format
     """
+    if visible_range is not None:
+        dataframe = dataframe.filter(pl.col("timestamp").is_between(visible_range[0], visible_range[1]))
+
+    resolution = None
+    if max_candles is not None:
+        dataframe, resolution = downsample_ohlc_bars(dataframe, max_candles=max_candles)
+
     # Text creation when hovering over individual datapoints in the graph
-    hovertext = []
-    for i in range(len(dataframe["timestamp"])):
-        hovertext.append(
-            f"Period: {dataframe["timestamp"][i]}" +
-            f"<br>Open: {str(round(dataframe["open"][i], 2))}" +
-            f"<br>High: {str(round(dataframe["high"][i], 2))}" +
-            f"<br>Low: {str(round(dataframe["low"][i], 2))}" + 
-            f"<br>Close: {str(round(dataframe["close"][i], 2))}")
-        
+    # Built as a single Polars string expression over the whole dataframe, instead of indexing every row in Python
+    hovertext = dataframe.select(pl.concat_str([pl.lit("Period: "),
+                                                pl.col("timestamp").dt.to_string("%Y-%m-%d %H:%M:%S"),
+                                                pl.lit("<br>Open: "),
+                                                pl.col("open").round(2).cast(pl.String),
+                                                pl.lit("<br>High: "),
+                                                pl.col("high").round(2).cast(pl.String),
+                                                pl.lit("<br>Low: "),
+                                                pl.col("low").round(2).cast(pl.String),
+                                                pl.lit("<br>Close: "),
+                                                pl.col("close").round(2).cast(pl.String)])) \
+                         .to_series() \
+                         .to_numpy()
+
     # Candlestick graph figure initialization using the dataframe from the input
+    # NumPy buffers are passed straight to Plotly, which serializes them as typed arrays rather than lists of Python objects
     candlestick_graph_figure = go.Figure(data=go.Candlestick(
-        x=dataframe["timestamp"],
-        open=dataframe["open"],
-        high=dataframe["high"],
-        low=dataframe["low"],
-        close=dataframe["close"],
+        x=dataframe["timestamp"].to_numpy(),
+        open=dataframe["open"].to_numpy(),
+        high=dataframe["high"].to_numpy(),
+        low=dataframe["low"].to_numpy(),
+        close=dataframe["close"].to_numpy(),
         text=hovertext,
         hoverinfo="text"))
     
@@ -170,7 +362,7 @@ def candlestick_plotly_graph(dataframe: pl.DataFrame) -> go.Figure:
             )),
         xaxis=dict(
             title=dict(
-                text="Time"))
+                text="Time" if resolution is None else f"Time ({resolution} candles)"))
     )
 
     return candlestick_graph_figure
\ No newline at end of file
@@ -6,7 +6,7 @@ import streamlit as st
 from langchain_core.messages import AIMessage, HumanMessage
 
 # Functions
-import Transformation_Functions, API_Functions
+import Transformation_Functions, API_Functions, LLM_Functions
 
 # --- Session States ---
 if "data_loaded" not in st.session_state:
@@ -17,6 +17,10 @@ if "chat_history" not in st.session_state:
         AIMessage(content="Hello! I am a helpful chatbot here to answer any questions related to stocks. Keep in mind that this is not financial advice, and please do your own personal research before making any financial decisions.")
     ]
 
+# The full chat history is only displayed, the prompt receives the rolling summarized memory
+if "chat_memory" not in st.session_state:
+    st.session_state.chat_memory = LLM_Functions.ConversationMemory()
+
 # --- Streamlit - Frontend - Configs ---
 st.set_page_config(page_title="Chat with Mistral",
                    page_icon="💬")
@@ -52,8 +56,11 @@ with st.sidebar:
                             to_date=end_date_input)
                         
                         st.session_state["Stock_Dataframe"] = data_call
+                        st.session_state["Stock_Query"] = {"symbol": stock_symbol_input,
+                                                           "from_date": start_date_input,
+                                                           "to_date": end_date_input}
                         st.session_state.data_loaded = 1
-                    except KeyError as StockDataCallError:
+                    except (KeyError, ValueError) as StockDataCallError:
                         st.error("**You have entered stock data that does not exist**. Please enter a ticker symbol for stocks traded in the US, with a realistic set of settings.\n\nAlso please refer to the question mark symbols for example data that can be entered.")
 
         if st.session_state.data_loaded == 1:
@@ -91,10 +98,36 @@ else:
         with st.chat_message("Human"):
             st.markdown(user_message)
 
+        # The data context is built once per loaded stock dataframe, rather than once per question
+        if st.session_state.get("Stock_Data_Context_Source") is not st.session_state["Stock_Dataframe"]:
+            st.session_state["Stock_Data_Context"] = LLM_Functions.build_stock_data_context(st.session_state["Stock_Dataframe"])
+            st.session_state["Stock_Data_Context_Fingerprint"] = LLM_Functions.data_context_fingerprint(st.session_state["Stock_Data_Context"])
+            st.session_state["Stock_Data_Context_Source"] = st.session_state["Stock_Dataframe"]
+
+        # Repeated or near-duplicate questions on the same data and conversation are answered from the shared response cache, without calling the LLM
+        conversation_history = st.session_state.chat_memory.render()
+        response_cache = LLM_Functions.llm_response_cache()
+        response = response_cache.get(st.session_state["Stock_Data_Context_Fingerprint"], user_message, conversation_history)
+
         with st.chat_message("AI"):
-            response_init = API_Functions.query_llm_with_question()
-            response = response_init.invoke(input={"dataframe":st.session_state["Stock_Dataframe"],
-                                                "conversation_history":st.session_state.chat_history,
-                                                "user_question":user_message})
-            st.markdown(response)
-        st.session_state.chat_history.append(AIMessage(content=response))
\ No newline at end of file
+            if response is not None:
+                st.markdown(response)
+                st.caption("Answered from the response cache")
+            else:
+                # The response is rendered token by token as the LLM streams it
+                response_init = API_Functions.query_llm_with_question()
+                stream_metrics = {}
+                st.write_stream(LLM_Functions.stream_llm_response(response_init,
+                                                                  {"data_context":st.session_state["Stock_Data_Context"],
+                                                                   "conversation_history":conversation_history,
+                                                                   "user_question":user_message},
+                                                                  stream_metrics))
+                response = stream_metrics["response"]
+                if stream_metrics["time_to_first_token_seconds"] is not None:
+                    st.caption(f"First token after {stream_metrics['time_to_first_token_seconds']:.2f}s"
+                               + (f" · {stream_metrics['tokens_per_second']:.1f} tokens/s" if stream_metrics["tokens_per_second"] is not None else ""))
+                if response:
+                    response_cache.put(st.session_state["Stock_Data_Context_Fingerprint"], user_message, response, conversation_history)
+        st.session_state.chat_history.append(AIMessage(content=response))
+        st.session_state.chat_memory.add(HumanMessage(content=user_message))
+        st.session_state.chat_memory.add(AIMessage(content=response))
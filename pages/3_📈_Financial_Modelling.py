@@ -45,8 +45,11 @@ with st.sidebar:
                             to_date=end_date_input)
                         
                         st.session_state["Stock_Dataframe"] = data_call
+                        st.session_state["Stock_Query"] = {"symbol": stock_symbol_input,
+                                                           "from_date": start_date_input,
+                                                           "to_date": end_date_input}
                         st.session_state.data_loaded = 1
-                    except KeyError as StockDataCallError:
+                    except (KeyError, ValueError) as StockDataCallError:
                         st.error("**You have entered stock data that does not exist**. Please enter a ticker symbol for stocks traded in the US, with a realistic set of settings.\n\nAlso please refer to the question mark symbols for example data that can be entered.")
 
         if st.session_state.data_loaded == 1: